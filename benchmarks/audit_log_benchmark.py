@@ -0,0 +1,158 @@
+# Query benchmark for the moderation audit log behind /modlog
+# Fills a temporary database with millions of actions, then times the page queries /modlog makes
+#
+# Usage (from the repository root):
+#   python benchmarks/audit_log_benchmark.py --rows 2000000
+
+import os
+import sys
+import time
+import random
+import typing
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import quiet_loggers, summarize, write_report  # noqa: E402
+
+GUILDS = 200
+TARGETS = 50_000
+ACTORS = 100
+BIG_GUILD_SHARE = 0.5
+# ^^ Guild 0 gets half of the rows, so long time ranges are measured over a million rows
+
+
+async def fill(audit_log: typing.Any, rows: int, generator: random.Random) -> float:
+    """Inserts random actions spread over two years through the log's batch writer,
+    on its worker thread since that thread owns the connection
+
+    Returns:
+        float: Seconds taken to insert them
+    """
+    from models.audit_log import ACTIONS
+
+    now = time.time()
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    for offset in range(0, rows, 100_000):
+        batch = [
+            (
+                (
+                    0
+                    if generator.random() < BIG_GUILD_SHARE
+                    else generator.randrange(GUILDS)
+                ),
+                generator.choice(ACTIONS),
+                generator.randrange(ACTORS),
+                generator.randrange(TARGETS),
+                "benchmark",
+                None,
+                now - (rows - offset - index) * 63_072_000 / rows,
+            )  # ^^ Inserted oldest first, like a real log
+            for index in range(min(100_000, rows - offset))
+        ]
+        await loop.run_in_executor(audit_log._executor, audit_log._write, batch)
+
+    return time.perf_counter() - start
+
+
+async def time_queries(
+    audit_log: typing.Any, iterations: int, rows: int, generator: random.Random
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    def any_guild() -> int:
+        return 1 + generator.randrange(GUILDS - 1)
+
+    cases: typing.Dict[
+        str, typing.Callable[[], typing.Tuple[int, typing.Dict[str, typing.Any]]]
+    ] = {
+        "newest_page": lambda: (any_guild(), {}),
+        "by_target": lambda: (any_guild(), {"target_id": generator.randrange(TARGETS)}),
+        "by_actor": lambda: (any_guild(), {"actor_id": generator.randrange(ACTORS)}),
+        "by_action": lambda: (any_guild(), {"action": "ban"}),
+        "last_30_days": lambda: (any_guild(), {"since": time.time() - 30 * 86400}),
+        "deep_older_page": lambda: (
+            any_guild(),
+            {"before_id": generator.randrange(rows)},
+        ),
+        "deep_newer_page": lambda: (
+            any_guild(),
+            {"after_id": generator.randrange(rows)},
+        ),
+        "big_guild_newest_page": lambda: (0, {}),
+        "big_guild_365_days": lambda: (0, {"since": time.time() - 365 * 86400}),
+        "big_guild_3650_days": lambda: (0, {"since": time.time() - 3650 * 86400}),
+        "big_guild_target_365_days": lambda: (
+            0,
+            {
+                "target_id": generator.randrange(TARGETS),
+                "since": time.time() - 365 * 86400,
+            },
+        ),
+        "big_guild_ban_365_days_older_page": lambda: (
+            0,
+            {
+                "action": "ban",
+                "since": time.time() - 365 * 86400,
+                "before_id": rows - generator.randrange(rows // 4),
+            },
+        ),
+    }
+
+    results = []
+    for name, make_filters in cases.items():
+        samples = []
+        for _ in range(iterations):
+            guild_id, filters = make_filters()
+            start = time.perf_counter_ns()
+            await audit_log.query(guild_id, limit=11, **filters)
+            samples.append((time.perf_counter_ns() - start) / 1000)
+
+        results.append(summarize(f"audit_log.query.{name}", samples, rows))
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Latency of /modlog queries against a large audit log"
+    )
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    from models.audit_log import AuditLog
+
+    quiet_loggers()
+    generator = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        audit_log = AuditLog(os.path.join(directory, "audit.sqlite3"))
+
+        async def run() -> (
+            typing.Tuple[float, typing.List[typing.Dict[str, typing.Any]]]
+        ):
+            try:
+                fill_seconds = await fill(audit_log, args.rows, generator)
+                return fill_seconds, await time_queries(
+                    audit_log, args.iterations, args.rows, generator
+                )
+            finally:
+                await audit_log.close()
+
+        fill_seconds, results = asyncio.run(run())
+
+    results.append(
+        {
+            "name": "audit_log.fill",
+            "size": args.rows,
+            "seconds": round(fill_seconds, 2),
+            "rows_per_s": round(args.rows / fill_seconds),
+        }
+    )
+    write_report("audit_log", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# Shared helpers for the offline benchmarks
+# Loads the recorded API fixtures and handles timing and result output
+
+import os
+import sys
+import copy
+import json
+import time
+import typing
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(REPO_ROOT, "benchmarks", "fixtures")
+
+os.chdir(REPO_ROOT)  # Config reads config.json relative to the working directory
+sys.path.insert(0, REPO_ROOT)
+
+
+def load_fixture(name: str) -> typing.Any:
+    """Loads a recorded API response from benchmarks/fixtures
+
+    Args:
+        name (str): The fixture file name. Ex: "mihomo_profile.json"
+
+    Returns:
+        typing.Any: The decoded JSON
+    """
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_profile_json(
+    character_count: int, uid: int | None = None
+) -> typing.Dict[str, typing.Any]:
+    """Builds a raw Mihomo response with any amount of characters,
+    by repeating the recorded characters under new names
+
+    Args:
+        character_count (int): Amount of characters on the profile
+        uid (int | None, optional): Replaces the recorded UID. Defaults to None.
+
+    Returns:
+        typing.Dict[str, typing.Any]: The raw response, parseable with StarrailInfoParsed.parse_obj
+    """
+    data = load_fixture("mihomo_profile.json")
+    recorded = data["characters"]
+
+    characters = []
+    for i in range(character_count):
+        character = copy.deepcopy(recorded[i % len(recorded)])
+        if i >= len(recorded):
+            character["name"] += f" #{i // len(recorded) + 1}"
+        characters.append(character)
+
+    data["characters"] = characters
+    if uid is not None:
+        data["player"]["uid"] = str(uid)
+
+    return data
+
+
+def make_profile(character_count: int, uid: int | None = None) -> typing.Any:
+    """Same as make_profile_json, but parsed into a mihomo StarrailInfoParsed
+
+    Args:
+        character_count (int): Amount of characters on the profile
+        uid (int | None, optional): Replaces the recorded UID. Defaults to None.
+
+    Returns:
+        StarrailInfoParsed: The parsed profile
+    """
+    from mihomo.models import StarrailInfoParsed
+
+    return StarrailInfoParsed.parse_obj(make_profile_json(character_count, uid))
+
+
+def quiet_loggers(level: str = "error") -> None:
+    """Raises the level of every QueuedLogger already created by the bot's modules,
+    so benchmarks measure the code and not the console
+
+    Args:
+        level (str, optional): The minimum level that still gets written. Defaults to "error".
+    """
+    from logger_help import LOG_LEVELS, QueuedLogger
+
+    for module in list(sys.modules.values()):
+        module_logger = getattr(module, "logger", None)
+        if isinstance(module_logger, QueuedLogger):
+            module_logger.level = LOG_LEVELS[level]
+
+
+def time_function(
+    name: str,
+    func: typing.Callable[[], typing.Any],
+    iterations: int,
+    size: int | None = None,
+    warmup: int = 10,
+) -> typing.Dict[str, typing.Any]:
+    """Times a function over many iterations
+
+    Args:
+        name (str): The benchmark name
+        func (typing.Callable[[], typing.Any]): The function to time, called without arguments
+        iterations (int): Amount of timed calls
+        size (int | None, optional): The input size, reported alongside the timings. Defaults to None.
+        warmup (int, optional): Amount of untimed calls made first. Defaults to 10.
+
+    Returns:
+        typing.Dict[str, typing.Any]: The result, timings in microseconds
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        func()
+        samples.append((time.perf_counter_ns() - start) / 1000)
+
+    return summarize(name, samples, size)
+
+
+def summarize(
+    name: str, samples: typing.List[float], size: int | None = None
+) -> typing.Dict[str, typing.Any]:
+    """Summarizes timing samples taken in microseconds
+
+    Args:
+        name (str): The benchmark name
+        samples (typing.List[float]): The samples, in microseconds
+        size (int | None, optional): The input size. Defaults to None.
+
+    Returns:
+        typing.Dict[str, typing.Any]: {"name", "size", "iterations", "mean_us", "median_us", "p95_us", "min_us", "stdev_us"}
+    """
+    ordered = sorted(samples)
+    return {
+        "name": name,
+        "size": size,
+        "iterations": len(samples),
+        "mean_us": round(statistics.fmean(samples), 3),
+        "median_us": round(statistics.median(ordered), 3),
+        "p95_us": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "min_us": round(ordered[0], 3),
+        "stdev_us": round(statistics.pstdev(samples), 3),
+    }
+
+
+def git_commit() -> str:
+    """Returns the current commit hash, or "unknown" outside of a git checkout"""
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=REPO_ROOT,
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except Exception:
+        return "unknown"
+
+
+def write_report(
+    suite: str, results: typing.List[typing.Dict[str, typing.Any]], output: str | None
+) -> typing.Dict[str, typing.Any]:
+    """Writes results as a JSON report, to a file or stdout
+
+    Args:
+        suite (str): The benchmark suite name
+        results (typing.List[typing.Dict[str, typing.Any]]): The benchmark results
+        output (str | None): File to write to, stdout if None
+
+    Returns:
+        typing.Dict[str, typing.Any]: The report
+    """
+    report = {
+        "suite": suite,
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if output is None:
+        print(text)
+    else:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    return report
+
+
+def compare_reports(
+    baseline_path: str, report: typing.Dict[str, typing.Any], threshold: float = 0.1
+) -> int:
+    """Prints how every benchmark moved against a baseline report
+
+    Args:
+        baseline_path (str): A report written by a previous run
+        report (typing.Dict[str, typing.Any]): The current report
+        threshold (float, optional): Relative slowdown of the median counted as a regression. Defaults to 0.1.
+
+    Returns:
+        int: Amount of regressions found
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    previous = {(r["name"], r["size"]): r for r in baseline["results"]}
+    regressions = 0
+    print(f"Comparing {report['commit']} against {baseline['commit']}", file=sys.stderr)
+
+    for result in report["results"]:
+        old = previous.get((result["name"], result["size"]))
+        if old is None or not old.get("median_us") or "median_us" not in result:
+            continue  # New benchmark, or a summary entry without timings
+
+        change = result["median_us"] / old["median_us"] - 1
+        marker = ""
+        if change > threshold:
+            marker = "  <-- regression"
+            regressions += 1
+
+        print(
+            f"{result['name']:40} size={str(result['size']):5} "
+            f"{old['median_us']:10.1f}us -> {result['median_us']:10.1f}us ({change:+.1%}){marker}",
+            file=sys.stderr,
+        )
+
+    return regressions
@@ -0,0 +1,694 @@
+# End-to-end load harness for the bot's slash commands
+# Loads the real cogs into a bot that talks to local stub servers instead of Discord, Mihomo,
+# RetroAchievements and otakugifs, then feeds it synthetic interactions at a fixed arrival rate.
+# Reports throughput, tail latency and outbound HTTP calls for every command.
+#
+# Usage (from the repository root):
+#   python benchmarks/load_harness.py --rate 300 --duration 20
+#   python benchmarks/load_harness.py --commands hsr hug --mihomo-latency 0.5 --error-rate 0.05
+#   python benchmarks/load_harness.py --output load.json
+#   python benchmarks/load_harness.py --compare load.json
+
+import os
+import sys
+import time
+import yarl
+import random
+import typing
+import asyncio
+import aiohttp
+import argparse
+import tempfile
+import contextvars
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import compare_reports, quiet_loggers, write_report  # noqa: E402
+from stubs import (  # noqa: E402
+    APPLICATION_ID,
+    DiscordStub,
+    MihomoStub,
+    ReactionStub,
+    RetroAchievementsStub,
+    StubServer,
+)
+
+import discord  # noqa: E402
+from discord import app_commands  # noqa: E402
+from discord.ext import commands  # noqa: E402
+from mihomo import MihomoAPI  # noqa: E402
+from models.Config import Config  # noqa: E402
+from models.audit_log import audit_log  # noqa: E402
+from models.client_options import client_options  # noqa: E402
+from models.command_metrics import LatencyHistogram, command_metrics  # noqa: E402
+from models.profile_store import profile_store, settings_store  # noqa: E402
+from models.reaction_client import ReactionClient  # noqa: E402
+from models.shared_caches import mihomo_limiter  # noqa: E402
+from models.retroachievements_client import RetroAchievementsClient  # noqa: E402
+
+config = Config()
+
+COGS: typing.List[str] = [
+    "cogs.hsr",
+    "cogs.hsr_leaderboard",
+    "cogs.retroachievements",
+    "cogs.entertainment",
+    "cogs.utilities",
+    "cogs.moderation",
+]
+
+GUILD_ID = 1100000000000000001
+CHANNEL_ID = 1100000000000000002
+BOT_ROLE_ID = 1100000000000000003
+MEMBER_ROLE_ID = 1100000000000000004
+FIRST_USER_ID = 1200000000000000000
+
+STRING, INTEGER, USER, ROLE = 3, 4, 6, 8
+# ^^ Application command option types used by the bot's commands
+ALL_PERMISSIONS = discord.Permissions.all().value
+# ^^ Discord resolves administrators to every permission bit in interaction payloads
+
+current_command: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "current_command", default="(background)"
+)  # ^^ The command whose task made an outbound request, copied into any task it creates
+
+DEFAULT_MIX: typing.Dict[str, int] = {
+    "hsr": 25,
+    "hsr-compare": 5,
+    "hsr-register": 3,
+    "hsr-leaderboard": 5,
+    "retro-profile": 10,
+    "hug": 15,
+    "flip": 10,
+    "ping": 10,
+    "avatar": 8,
+    "base64": 8,
+    "about": 3,
+    "invite": 3,
+    "stats": 1,
+    "kick": 2,
+    "ban": 2,
+    "role": 3,
+    "mass-ban": 1,
+    "mass-kick": 1,
+}  # ^^ command -> relative share of the generated interactions
+
+
+class OutboundCounter:
+    """Counts every aiohttp request made in the process, by command and upstream service.
+
+    The command comes from `current_command`, so requests made by tasks a command started
+    (like a shared profile fetch) count towards that command, and requests from background
+    tasks (like the reaction buffer refill) count as "(background)".
+    """
+
+    def __init__(self, services: typing.Dict[int, str]) -> None:
+        """
+        Args:
+            services (typing.Dict[int, str]): stub port -> service name
+        """
+        self.services: typing.Dict[int, str] = services
+        self.calls: typing.Dict[str, typing.Dict[str, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )  # ^^ command -> service -> amount of requests
+        self._original_request: typing.Callable | None = None
+
+    def install(self) -> None:
+        original_request = aiohttp.ClientSession._request
+        counter = self
+
+        async def counting_request(
+            session: aiohttp.ClientSession,
+            method: str,
+            str_or_url: typing.Any,
+            *args: typing.Any,
+            **kwargs: typing.Any,
+        ) -> aiohttp.ClientResponse:
+            port = yarl.URL(str(str_or_url)).port
+            service = counter.services.get(port, "unknown")  # type: ignore
+            counter.calls[current_command.get()][service] += 1
+            return await original_request(session, method, str_or_url, *args, **kwargs)
+
+        self._original_request = original_request
+        aiohttp.ClientSession._request = counting_request  # type: ignore
+
+    def uninstall(self) -> None:
+        if self._original_request is not None:
+            aiohttp.ClientSession._request = self._original_request  # type: ignore
+            self._original_request = None
+
+
+def user_payload(user_id: int) -> typing.Dict[str, typing.Any]:
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id - FIRST_USER_ID}",
+        "discriminator": "0",
+        "global_name": None,
+        "avatar": f"{user_id:032x}"[-32:],
+    }
+
+
+def member_payload(
+    user_id: int,
+    roles: typing.List[int] | None = None,
+    permissions: int = ALL_PERMISSIONS,
+) -> typing.Dict[str, typing.Any]:
+    return {
+        "user": user_payload(user_id),
+        "roles": [str(role) for role in roles or []],
+        "joined_at": "2024-01-01T00:00:00+00:00",
+        "nick": None,
+        "avatar": None,
+        "deaf": False,
+        "mute": False,
+        "pending": False,
+        "flags": 0,
+        "permissions": str(permissions),
+    }
+
+
+def role_payload(
+    role_id: int, name: str, position: int
+) -> typing.Dict[str, typing.Any]:
+    return {
+        "id": str(role_id),
+        "name": name,
+        "color": 0,
+        "hoist": False,
+        "position": position,
+        "permissions": "8" if role_id == BOT_ROLE_ID else "0",
+        "managed": False,
+        "mentionable": False,
+        "flags": 0,
+    }
+
+
+def guild_payload() -> typing.Dict[str, typing.Any]:
+    """The test guild, with the bot as a member so moderation role checks have a top role to compare against"""
+    return {
+        "id": str(GUILD_ID),
+        "name": "Load Harness",
+        "owner_id": str(FIRST_USER_ID),
+        "member_count": 2,
+        "features": [],
+        "emojis": [],
+        "stickers": [],
+        "roles": [
+            role_payload(GUILD_ID, "@everyone", 0),
+            role_payload(MEMBER_ROLE_ID, "member", 1),
+            role_payload(BOT_ROLE_ID, "koi", 2),
+        ],
+        "channels": [
+            {
+                "id": str(CHANNEL_ID),
+                "type": 0,
+                "name": "general",
+                "position": 0,
+                "permission_overwrites": [],
+            }
+        ],
+        "members": [member_payload(APPLICATION_ID, [BOT_ROLE_ID])],
+    }
+
+
+class LoadHarness:
+    """Runs the real cogs against the stub servers and records what every command costs"""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args: argparse.Namespace = args
+        self.random = random.Random(args.seed)
+
+        def stub_options(
+            service: str, error_rate: float
+        ) -> typing.Dict[str, typing.Any]:
+            latency = getattr(args, f"{service}_latency")
+            return {
+                "latency": latency,
+                "jitter": latency * args.jitter,
+                "error_rate": error_rate,
+                "seed": args.seed,
+            }
+
+        self.stubs: typing.Dict[str, StubServer] = {
+            "discord": DiscordStub(**stub_options("discord", args.discord_error_rate)),
+            "mihomo": MihomoStub(
+                character_count=args.characters,
+                **stub_options("mihomo", args.error_rate),
+            ),
+            "retroachievements": RetroAchievementsStub(
+                **stub_options("retro", args.error_rate)
+            ),
+            "reactions": ReactionStub(**stub_options("reactions", args.error_rate)),
+        }
+
+        self.bot: commands.Bot = commands.Bot(
+            command_prefix=config.PREFIX,
+            help_command=None,
+            **client_options(),  # Same intents and caches as main.py
+        )
+        self.outbound: OutboundCounter | None = None
+        self.store_directory = tempfile.TemporaryDirectory()
+        self.uids: typing.List[int] = [600000000 + i for i in range(args.uids)]
+        self.users: typing.List[int] = [FIRST_USER_ID + i for i in range(1, 1001)]
+        self.interactions: int = 0
+
+        self.latencies: typing.Dict[str, LatencyHistogram] = defaultdict(
+            LatencyHistogram
+        )
+        self.failed: typing.Dict[str, int] = defaultdict(int)
+        self.loop_lag: LatencyHistogram = LatencyHistogram()
+
+    async def start(self) -> None:
+        """Starts the stubs, points every client at them and loads the cogs"""
+        for stub in self.stubs.values():
+            await stub.start()
+
+        discord.http.Route.BASE = f"{self.stubs['discord'].url}/api/v10"
+        MihomoAPI.BASE_URL = f"{self.stubs['mihomo'].url}/sr_info_parsed"
+        RetroAchievementsClient.BASE_URL = f"{self.stubs['retroachievements'].url}/API"
+        ReactionClient.BASE_URL = f"{self.stubs['reactions'].url}/gif"
+        # ^^ Class attributes, so they are in place before any cog creates a client
+        profile_store.path = os.path.join(self.store_directory.name, "profiles.sqlite3")
+        # ^^ A fresh store for every run, so earlier runs don't turn fetches into store hits
+        settings_store.path = os.path.join(
+            self.store_directory.name, "settings.sqlite3"
+        )
+        audit_log.path = os.path.join(self.store_directory.name, "audit.sqlite3")
+        # ^^ Keeps the stub guild's kicks and bans out of the real audit log
+        mihomo_limiter.rate = self.args.mihomo_rate
+        mihomo_limiter.burst = self.args.mihomo_burst
+
+        self.outbound = OutboundCounter(
+            {stub.port: name for name, stub in self.stubs.items()}
+        )
+        self.outbound.install()
+
+        await self.bot.login("load-harness-token")
+        self.bot._connection._add_guild_from_data(guild_payload())  # type: ignore
+        for cog in COGS:
+            await self.bot.load_extension(cog)
+
+        quiet_loggers(self.args.log_level)
+
+    async def stop(self) -> None:
+        for extension in list(self.bot.extensions):
+            await self.bot.unload_extension(extension)
+
+        await self.bot.close()
+        await profile_store.close()
+        await settings_store.close()
+        await audit_log.close()
+        self.store_directory.cleanup()
+        for stub in self.stubs.values():
+            await stub.stop()
+
+        if self.outbound is not None:
+            self.outbound.uninstall()
+
+    def command_options(
+        self, command: str
+    ) -> typing.Tuple[
+        typing.List[typing.Dict[str, typing.Any]], typing.Dict[str, typing.Any]
+    ]:
+        """Builds the options and resolved objects discord would send for a command
+
+        Args:
+            command (str): The command name. Ex: "hsr"
+
+        Returns:
+            typing.Tuple[typing.List[typing.Dict[str, typing.Any]], typing.Dict[str, typing.Any]]: (options, resolved)
+        """
+        target = self.random.choice(self.users)
+        resolved_target = {
+            "users": {str(target): user_payload(target)},
+            "members": {
+                str(target): {
+                    key: value
+                    for key, value in member_payload(target, permissions=0).items()
+                    if key != "user"
+                }
+            },
+        }
+
+        if command == "hsr":
+            uid = self.random.choice(self.uids)
+            return [{"name": "uid", "type": INTEGER, "value": uid}], {}
+        if command == "hsr-compare":
+            uids = self.random.sample(self.uids, min(3, len(self.uids)))
+            return [
+                {"name": "uids", "type": STRING, "value": " ".join(map(str, uids))}
+            ], {}
+        if command == "hsr-register":
+            uid = self.random.choice(self.uids)
+            return [{"name": "uid", "type": INTEGER, "value": uid}], {}
+        if command == "hsr-leaderboard":
+            metric = self.random.choice(["achievements", "level", "characters"])
+            return [{"name": "metric", "type": STRING, "value": metric}], {}
+        if command == "retro-profile":
+            return [{"name": "username", "type": STRING, "value": "vfk4083"}], {}
+        if command in ("hug", "avatar"):
+            return [
+                {"name": "user", "type": USER, "value": str(target)}
+            ], resolved_target
+        if command == "base64":
+            return [
+                {"name": "type", "type": STRING, "value": "Encode"},
+                {"name": "text", "type": STRING, "value": f"load harness {target}"},
+            ], {}
+        if command in ("kick", "ban"):
+            return [
+                {"name": "member", "type": USER, "value": str(target)},
+                {"name": "reason", "type": STRING, "value": "load test"},
+            ], resolved_target
+        if command in ("mass-ban", "mass-kick"):
+            targets = self.random.sample(self.users, min(5, len(self.users)))
+            return [
+                {
+                    "name": "targets",
+                    "type": STRING,
+                    "value": " ".join(f"<@{user}>" for user in targets),
+                },
+                {"name": "reason", "type": STRING, "value": "load test"},
+            ], {}
+        if command == "role":
+            return [
+                {"name": "member", "type": USER, "value": str(target)},
+                {"name": "role", "type": ROLE, "value": str(MEMBER_ROLE_ID)},
+            ], {
+                **resolved_target,
+                "roles": {
+                    str(MEMBER_ROLE_ID): role_payload(MEMBER_ROLE_ID, "member", 1)
+                },
+            }
+
+        return [], {}
+
+    def interaction_payload(self, command: str) -> typing.Dict[str, typing.Any]:
+        """Builds an INTERACTION_CREATE payload for a slash command, created right now
+
+        Args:
+            command (str): The command name. Ex: "hsr"
+
+        Returns:
+            typing.Dict[str, typing.Any]: The payload, accepted by discord.Interaction
+        """
+        self.interactions += 1
+        options, resolved = self.command_options(command)
+        user_id = self.random.choice(self.users)
+        if command == "stats":
+            user_id = config.OWNER_ID  # Exercise the full report instead of the refusal
+
+        snowflake = discord.utils.time_snowflake(discord.utils.utcnow())
+        return {
+            "id": str(snowflake + self.interactions % (1 << 22)),
+            "application_id": str(APPLICATION_ID),
+            "type": 2,  # Application command
+            "token": f"interaction-token-{self.interactions}",
+            "version": 1,
+            "guild_id": str(GUILD_ID),
+            "channel": {"id": str(CHANNEL_ID), "type": 0},
+            "channel_id": str(CHANNEL_ID),
+            "member": member_payload(user_id),
+            "app_permissions": str(ALL_PERMISSIONS),
+            "locale": "en-US",
+            "data": {
+                "id": str(snowflake),
+                "name": command,
+                "type": 1,
+                "options": options,
+                "resolved": resolved,
+            },
+        }
+
+    async def invoke(self, command: str) -> None:
+        """Runs one synthetic interaction through the command tree, like discord.py does for gateway events
+
+        Args:
+            command (str): The command name. Ex: "hsr"
+        """
+        current_command.set(command)
+        interaction = discord.Interaction(
+            data=self.interaction_payload(command),  # type: ignore
+            state=self.bot._connection,
+        )
+
+        tree = self.bot.tree
+        start = time.perf_counter()
+        try:
+            await tree._call(interaction)
+        except app_commands.AppCommandError as e:
+            await tree._dispatch_error(interaction, e)
+        except Exception:
+            interaction.command_failed = True
+        # ^^ Same handling as CommandTree._from_interaction, but awaited so the task ends with the command
+
+        self.latencies[command].record(time.perf_counter() - start)
+        if interaction.command_failed:
+            self.failed[command] += 1
+
+    async def measure_loop_lag(self, interval: float = 0.01) -> None:
+        """Records how late the event loop wakes up a sleeping task, a direct measure of loop saturation"""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag.record(max(0.0, time.perf_counter() - start - interval))
+
+    async def run(self, mix: typing.Dict[str, int]) -> float:
+        """Starts interactions with exponentially distributed gaps (open loop),
+        so slow commands pile up instead of slowing the arrival rate down
+
+        Args:
+            mix (typing.Dict[str, int]): command -> relative weight
+
+        Returns:
+            float: Seconds from the first interaction until the last one finished
+        """
+        loop = asyncio.get_running_loop()
+        names, weights = list(mix), list(mix.values())
+        tasks: typing.Set[asyncio.Task] = set()
+        lag_task = asyncio.create_task(self.measure_loop_lag())
+
+        start = loop.time()
+        next_arrival = start
+        while next_arrival - start < self.args.duration:
+            command = self.random.choices(names, weights)[0]
+            task = asyncio.create_task(self.invoke(command))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+            next_arrival += self.random.expovariate(self.args.rate)
+            await asyncio.sleep(max(0.0, next_arrival - loop.time()))
+
+        if tasks:
+            await asyncio.wait(tasks, timeout=self.args.drain_timeout)
+
+        lag_task.cancel()
+        return loop.time() - start
+
+    def report(self, elapsed: float) -> typing.List[typing.Dict[str, typing.Any]]:
+        """Collects one result per command, plus the background requests and stub totals"""
+        assert self.outbound is not None
+        errors = {
+            command: data["errors"]
+            for command, data in command_metrics.snapshot().items()
+        }
+        results = []
+
+        for command, histogram in sorted(self.latencies.items()):
+            outbound = self.outbound.calls.get(command, {})
+            results.append(
+                {
+                    "name": command,
+                    "size": None,
+                    "iterations": histogram.count,
+                    "throughput_per_s": round(histogram.count / elapsed, 2),
+                    "failed": self.failed.get(command, 0),
+                    "handled_errors": errors.get(command, 0),
+                    "mean_us": round(histogram.total / histogram.count * 1e6, 1),
+                    "median_us": round(histogram.percentile(50) * 1e6, 1),
+                    "p95_us": round(histogram.percentile(95) * 1e6, 1),
+                    "p99_us": round(histogram.percentile(99) * 1e6, 1),
+                    "max_us": round(histogram.max * 1e6, 1),
+                    "outbound_per_call": {
+                        service: round(calls / histogram.count, 3)
+                        for service, calls in sorted(outbound.items())
+                    },
+                }
+            )
+
+        results.append(
+            {
+                "name": "(background)",
+                "size": None,
+                "outbound": dict(self.outbound.calls.get("(background)", {})),
+            }
+        )
+        results.append(
+            {
+                "name": "(event loop lag)",
+                "size": None,
+                "iterations": self.loop_lag.count,
+                "median_us": round(self.loop_lag.percentile(50) * 1e6, 1),
+                "p99_us": round(self.loop_lag.percentile(99) * 1e6, 1),
+                "max_us": round(self.loop_lag.max * 1e6, 1),
+            }
+        )
+        results.append(
+            {
+                "name": "(totals)",
+                "size": None,
+                "offered_rate_per_s": self.args.rate,
+                "interactions": self.interactions,
+                "elapsed_s": round(elapsed, 3),
+                "throughput_per_s": round(
+                    sum(h.count for h in self.latencies.values()) / elapsed, 2
+                ),
+                "stubs": {name: stub.stats() for name, stub in self.stubs.items()},
+                "gauges": {
+                    name: source() for name, source in command_metrics.gauges.items()
+                },
+            }
+        )
+
+        return results
+
+
+def print_table(results: typing.List[typing.Dict[str, typing.Any]]) -> None:
+    print(
+        f"{'command':16} {'n':>6} {'rps':>8} {'fail':>5} {'err':>5} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}  outbound/call",
+        file=sys.stderr,
+    )
+    for result in results:
+        if "throughput_per_s" not in result or "failed" not in result:
+            continue
+
+        outbound = " ".join(
+            f"{service}={calls}"
+            for service, calls in result["outbound_per_call"].items()
+        )
+        print(
+            f"{result['name']:16} {result['iterations']:6} {result['throughput_per_s']:8.1f} "
+            f"{result['failed']:5} {result['handled_errors']:5} "
+            + " ".join(
+                f"{result[key] / 1000:8.1f}"
+                for key in ("median_us", "p95_us", "p99_us", "max_us")
+            )
+            + f"  {outbound}",
+            file=sys.stderr,
+        )
+
+    for result in results[-3:]:
+        print(
+            f"{result['name']}: "
+            + ", ".join(
+                f"{key}={value}"
+                for key, value in result.items()
+                if key not in ("name", "size")
+            ),
+            file=sys.stderr,
+        )
+
+
+async def run_harness(
+    args: argparse.Namespace,
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    mix = {
+        command: weight
+        for command, weight in DEFAULT_MIX.items()
+        if not args.commands or command in args.commands
+    }
+    if not mix:
+        raise SystemExit(
+            f"No known commands in {args.commands}, pick from {list(DEFAULT_MIX)}"
+        )
+
+    harness = LoadHarness(args)
+    try:
+        await harness.start()
+        elapsed = await harness.run(mix)
+        return harness.report(elapsed)
+    finally:
+        await harness.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Drives the real cogs with synthetic interactions against local stub APIs"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=200, help="Interactions per second"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10, help="Seconds to generate load for"
+    )
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=30,
+        help="Seconds to wait for unfinished interactions after the load stops",
+    )
+    parser.add_argument(
+        "--commands",
+        nargs="+",
+        help=f"Only run these commands, from {list(DEFAULT_MIX)}",
+    )
+    parser.add_argument(
+        "--uids", type=int, default=50, help="Distinct HSR UIDs to look up"
+    )
+    parser.add_argument(
+        "--characters", type=int, default=4, help="Characters per HSR profile"
+    )
+    parser.add_argument("--discord-latency", type=float, default=0.05)
+    parser.add_argument("--mihomo-latency", type=float, default=0.3)
+    parser.add_argument("--retro-latency", type=float, default=0.2)
+    parser.add_argument("--reactions-latency", type=float, default=0.1)
+    parser.add_argument(
+        "--mihomo-rate",
+        type=float,
+        default=config.MIHOMO_RATE,
+        help="Requests per second the bot lets through to Mihomo",
+    )
+    parser.add_argument(
+        "--mihomo-burst",
+        type=int,
+        default=config.MIHOMO_BURST,
+        help="Requests the bot lets through to Mihomo at once",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.5,
+        help="Extra random latency, as a fraction of each stub's latency",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Share of Mihomo, RetroAchievements and otakugifs requests answered with a 500",
+    )
+    parser.add_argument(
+        "--discord-error-rate",
+        type=float,
+        default=0.0,
+        help="Share of Discord requests answered with a 500, discord.py retries these with backoff",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--log-level", default="error", help="Minimum level the bot still logs"
+    )
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="A previous report to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_harness(args))
+    print_table(results)
+    report = write_report("load", results, args.output)
+
+    if args.compare:
+        sys.exit(1 if compare_reports(args.compare, report) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Memory benchmark for cached HSR profiles
+# Compares mihomo's pydantic StarrailInfoParsed against the CompactProfile the profile cache holds
+#
+# Usage (from the repository root):
+#   python benchmarks/memory_benchmark.py --profiles 10000
+
+import os
+import gc
+import sys
+import json
+import typing
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import make_profile_json, write_report  # noqa: E402
+
+
+def measure(
+    name: str, build: typing.Callable[[int], typing.Any], profiles: int
+) -> typing.Dict[str, typing.Any]:
+    """Builds many profiles, keeps all of them alive, and measures the memory they hold
+
+    Args:
+        name (str): The benchmark name
+        build (typing.Callable[[int], typing.Any]): Builds the profile for a UID
+        profiles (int): Amount of profiles to keep alive
+
+    Returns:
+        typing.Dict[str, typing.Any]: {"name", "profiles", "total_mb", "bytes_per_profile"}
+    """
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    cache = [build(uid) for uid in range(profiles)]
+    gc.collect()  # Only what the cache keeps alive is counted
+    held = tracemalloc.get_traced_memory()[0] - baseline
+
+    tracemalloc.stop()
+    del cache
+    return {
+        "name": name,
+        "profiles": profiles,
+        "total_mb": round(held / 1024 / 1024, 2),
+        "bytes_per_profile": round(held / profiles),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Memory held by cached HSR profiles, pydantic against compact"
+    )
+    parser.add_argument("--profiles", type=int, default=10_000)
+    parser.add_argument(
+        "--characters", type=int, default=4, help="Characters on every profile"
+    )
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    from mihomo.models import StarrailInfoParsed
+    from models.compact_profile import CompactProfile
+
+    responses = [
+        json.dumps(make_profile_json(args.characters, uid=uid))
+        for uid in range(min(args.profiles, 100))
+    ]  # ^^ Decoded again for every profile, like responses from the API, so no strings are shared by accident
+
+    def response(uid: int) -> typing.Dict[str, typing.Any]:
+        return json.loads(responses[uid % len(responses)])
+
+    def pydantic_profile(uid: int) -> "StarrailInfoParsed":
+        return StarrailInfoParsed.parse_obj(response(uid))
+
+    def compact_profile(uid: int) -> CompactProfile:
+        return CompactProfile.from_model(pydantic_profile(uid))
+
+    stored = CompactProfile.from_model(pydantic_profile(0)).to_json()
+
+    def stored_profile(uid: int) -> CompactProfile:
+        return CompactProfile.from_json(stored)
+
+    results = [
+        measure("pydantic", pydantic_profile, args.profiles),
+        measure("compact", compact_profile, args.profiles),
+        measure("compact_from_store", stored_profile, args.profiles),
+    ]
+    for result in results[1:]:
+        result["ratio_to_pydantic"] = round(
+            result["bytes_per_profile"] / results[0]["bytes_per_profile"], 3
+        )
+
+    write_report("memory", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+# Offline micro-benchmarks for the HSR and RetroAchievements rendering paths, the stat percentiles and the automod filter
+# No discord connection or network access is needed, every input comes from benchmarks/fixtures
+#
+# Usage (from the repository root):
+#   python benchmarks/run_benchmarks.py --output before.json
+#   python benchmarks/run_benchmarks.py --compare before.json
+
+import os
+import sys
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import (  # noqa: E402
+    compare_reports,
+    load_fixture,
+    make_profile,
+    quiet_loggers,
+    summarize,
+    time_function,
+    write_report,
+)
+
+
+def bench_hsr(iterations: int, sizes: list[int]) -> list[dict]:
+    from cogs.hsr import HSR
+
+    hsr = HSR(None)  # type: ignore # The client is never used by the card builders
+    quiet_loggers()
+    results = []
+
+    for size in sizes:
+        profile = make_profile(size)
+        first_character = profile.characters[0]
+
+        results.append(
+            time_function(
+                "make_player_card",
+                lambda: hsr.make_player_card(profile),
+                iterations,
+                size,
+            )
+        )
+        results.append(
+            time_function(
+                "calculate_total_character_stats",
+                lambda: hsr.calculate_total_character_stats(first_character),
+                iterations,
+                size,
+            )
+        )
+        results.append(
+            time_function(
+                "make_character_cards",
+                lambda: hsr.make_character_cards(profile),
+                iterations,
+                size,
+            )
+        )
+        results.append(
+            time_function(
+                "make_lightcone_cards",
+                lambda: hsr.make_lightcone_cards(profile),
+                iterations,
+                size,
+            )
+        )
+        results.append(
+            time_function(
+                "parse_data",
+                lambda: hsr.parse_data(profile).player_card,
+                iterations,
+                size,
+            )
+        )  # ^^ What /hsr renders before answering
+        results.append(
+            time_function(
+                "parse_data+all_cards",
+                lambda: render_everything(hsr.parse_data(profile)),
+                iterations,
+                size,
+            )
+        )  # ^^ Worst case, a user opening every character and lightcone
+
+        parsed_profile = hsr.parse_data(profile)
+        render_everything(parsed_profile)
+        results.append(
+            time_function(
+                "cached_character_card+footer",
+                lambda: parsed_profile.character_card(
+                    first_character.name, footer={"text": "Requested by: koi"}
+                ),
+                iterations,
+                size,
+            )
+        )  # ^^ Every selection after the first, a copy of the pre-rendered card with the requester's footer
+
+    return results
+
+
+def render_everything(parsed_profile) -> None:
+    parsed_profile.player_card
+    for name in parsed_profile.character_names:
+        parsed_profile.character_card(name)
+        parsed_profile.lightcone_card(name)
+
+
+def bench_stat_percentiles(iterations: int, builds: int) -> list[dict]:
+    import random
+    import itertools
+    from cogs.hsr import HSR
+    from models.stat_percentiles import StatPercentiles
+
+    hsr = HSR(None)  # type: ignore
+    quiet_loggers()
+    engine = StatPercentiles()
+    generator = random.Random(0)
+    stats = hsr.calculate_total_character_stats(make_profile(1).characters[0])
+    totals = {stat: total["value"] for stat, total in stats.items()}
+
+    def random_build() -> dict:
+        return {
+            stat: value * generator.uniform(0.5, 1.5) for stat, value in totals.items()
+        }
+
+    for uid in range(builds):
+        engine.update("Kafka", uid, random_build())
+
+    uids = itertools.count(builds)
+    return [
+        time_function(
+            "stat_percentiles.update",
+            lambda: engine.update("Kafka", next(uids), random_build()),
+            iterations,
+            builds,
+        ),
+        time_function(
+            "stat_percentiles.rank",
+            lambda: engine.rank("Kafka", totals),
+            iterations,
+            builds,
+        ),
+    ]
+
+
+def bench_automod(iterations: int, sizes: list[int]) -> list[dict]:
+    import random
+    import itertools
+    from models.word_filter import Blocklist
+
+    generator = random.Random(0)
+
+    def word() -> str:
+        return "".join(
+            generator.choice("abcdefghijklmnopqrstuvwxyz")
+            for _ in range(generator.randint(3, 10))
+        )
+
+    messages = [
+        " ".join(word() for _ in range(generator.randint(5, 30))).capitalize() + "!"
+        for _ in range(1000)
+    ]  # ^^ Mostly clean, like real traffic, a clean message is scanned to the end
+    results = []
+    for size in sizes:
+        blocklist = Blocklist(word() + generator.choice(["", "*"]) for _ in range(size))
+        cycle = itertools.cycle(messages)
+        result = time_function(
+            "automod.find", lambda: blocklist.find(next(cycle)), iterations, size
+        )
+        result["messages_per_s"] = round(1_000_000 / result["mean_us"])
+        results.append(result)
+
+    return results
+
+
+def bench_codecs(iterations: int, size: int) -> list[dict]:
+    import os
+    from models.codec_stream import CODECS, transcode
+
+    data = os.urandom(size)
+    results = []
+    for codec in CODECS:
+        encoded = transcode(data, codec, False, 4 * size).getvalue()
+        for direction, source in (("encode", data), ("decode", encoded)):
+            result = time_function(
+                f"codec.{codec}.{direction}",
+                lambda: transcode(source, codec, direction == "decode", 4 * size),
+                iterations,
+                size,
+                warmup=1,
+            )
+            result["mb_per_s"] = round(size / result["mean_us"], 1)
+            results.append(result)
+
+    return results
+
+
+def bench_retro(iterations: int) -> list[dict]:
+    from models.retro_game_info_view import make_game_info_embed
+
+    quiet_loggers()
+    game_info = load_fixture("retro_game_info.json")
+
+    return [
+        time_function(
+            "make_game_info_embed",
+            lambda: make_game_info_embed(game_info),
+            iterations,
+        )
+    ]
+
+
+def bench_logger(iterations: int) -> list[dict]:
+    import logger_help
+    from pythondebuglogger.Logger import Logger
+
+    results = []
+    queued = logger_help.QueuedLogger(enable_timestamps=True, level="debug")
+    gated = logger_help.QueuedLogger(enable_timestamps=True, level="error")
+    direct = Logger(enable_timestamps=True)
+    sink = logger_help.get_log_sink()
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results.append(
+            time_function(
+                "logger.direct_fstring",
+                lambda: direct.display_notice(f"[User {123456789}] is calling /hsr"),
+                iterations,
+            )
+        )  # ^^ The pythondebuglogger Logger writing synchronously, like before the log sink
+
+        dropped_before = sink.dropped
+        results.append(
+            time_function(
+                "logger.queued",
+                lambda: queued.display_notice("[User %s] is calling /hsr", 123456789),
+                iterations,
+            )
+        )
+        results[-1]["dropped"] = sink.dropped - dropped_before
+        sink.flush()
+
+        results.append(
+            time_function(
+                "logger.gated",
+                lambda: gated.display_notice("[User %s] is calling /hsr", 123456789),
+                iterations,
+            )
+        )
+        sink.flush()
+
+    return results
+
+
+def bench_logger_drain(records: int) -> dict:
+    """Measures how long the sink thread takes to write out a burst of records"""
+    import time
+    import logger_help
+
+    queued = logger_help.QueuedLogger(enable_timestamps=True, level="debug")
+    sink = logger_help.get_log_sink()
+    records = min(records, logger_help.config.LOG_QUEUE_SIZE)  # Nothing gets dropped
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter_ns()
+        for i in range(records):
+            queued.display_notice("[User %s] is calling /hsr", i)
+        sink.flush()
+        elapsed = (time.perf_counter_ns() - start) / 1000
+
+    return summarize("logger.drain_per_record", [elapsed / records], records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Offline micro-benchmarks for the rendering paths"
+    )
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1, 4, 8],
+        help="Profile sizes, as amount of characters",
+    )
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="A previous report to compare against")
+    args = parser.parse_args()
+
+    results = bench_hsr(args.iterations, args.sizes)
+    results += bench_stat_percentiles(args.iterations, 10_000)
+    results += bench_automod(args.iterations * 10, [1_000, 10_000])
+    results += bench_codecs(max(1, args.iterations // 50), 1024 * 1024)
+    results += bench_retro(args.iterations)
+    results += bench_logger(args.iterations * 10)
+    results.append(bench_logger_drain(args.iterations * 10))
+
+    report = write_report("rendering", results, args.output)
+
+    if args.compare:
+        sys.exit(1 if compare_reports(args.compare, report) else 0)
+
+
+if __name__ == "__main__":
+    main()
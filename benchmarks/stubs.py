@@ -0,0 +1,245 @@
+# Local stand-ins for the Discord, Mihomo, RetroAchievements and otakugifs HTTP APIs
+# Each stub listens on its own loopback port, with configurable latency and error injection
+
+import json
+import random
+import socket
+import typing
+import asyncio
+import datetime
+from aiohttp import web
+
+from common import load_fixture, make_profile_json
+
+APPLICATION_ID = 1025477778428133379
+BOT_USER: typing.Dict[str, typing.Any] = {
+    "id": str(APPLICATION_ID),
+    "username": "Koi",
+    "discriminator": "0",
+    "global_name": None,
+    "avatar": "0" * 32,
+    "bot": True,
+}
+
+
+def json_response(data: typing.Any, status: int = 200) -> web.Response:
+    """Encodes a JSON response with a bare "application/json" content type, like the real APIs.
+    discord.py only decodes bodies whose content type is exactly that.
+    """
+    return web.Response(
+        body=json.dumps(data).encode(), status=status, content_type="application/json"
+    )
+
+
+class StubServer:
+    """A loopback aiohttp server that delays every response and fails a share of them.
+
+    Handlers are registered by subclasses, the latency and error injection are applied
+    to every request by a middleware so they behave the same for every stub.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: int | None = None,
+    ) -> None:
+        """
+        Args:
+            name (str): The service name, used in reports. Ex: "mihomo"
+            latency (float, optional): Base delay added to every response, in seconds. Defaults to 0.0.
+            jitter (float, optional): Extra random delay of up to this many seconds. Defaults to 0.0.
+            error_rate (float, optional): Share of requests answered with error_status, 0 to 1. Defaults to 0.0.
+            error_status (int, optional): The status code used for injected errors. Defaults to 500.
+            seed (int | None, optional): Seed for the latency and error randomness. Defaults to None.
+        """
+        self.name: str = name
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.error_rate: float = error_rate
+        self.error_status: int = error_status
+        self.random = random.Random(seed)
+
+        self.requests: int = 0
+        self.injected_errors: int = 0
+        self.port: int = 0
+        self.app = web.Application(middlewares=[self._inject])
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @web.middleware
+    async def _inject(
+        self,
+        request: web.Request,
+        handler: typing.Callable[[web.Request], typing.Awaitable[web.StreamResponse]],
+    ) -> web.StreamResponse:
+        self.requests += 1
+        delay = self.latency + self.random.random() * self.jitter
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.injected_errors += 1
+            return json_response({"message": "injected error"}, self.error_status)
+
+        return await handler(request)
+
+    async def start(self) -> None:
+        """Binds to a free loopback port and starts serving"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        self.port = sock.getsockname()[1]
+
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.SockSite(self._runner, sock).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "requests": self.requests,
+            "injected_errors": self.injected_errors,
+        }
+
+
+class DiscordStub(StubServer):
+    """Answers the REST routes the bot uses while handling interactions.
+    Interaction callbacks and webhook followups get a minimal message back,
+    moderation routes (kick, ban, role changes) and anything else get 204 No Content.
+    """
+
+    def __init__(self, **kwargs: typing.Any) -> None:
+        super().__init__("discord", **kwargs)
+        self._message_ids: int = 0
+        self.app.router.add_get("/api/v10/users/@me", self.current_user)
+        self.app.router.add_get(
+            "/api/v10/oauth2/applications/@me", self.application_info
+        )
+        self.app.router.add_post(
+            "/api/v10/webhooks/{application_id}/{token}", self.message
+        )
+        self.app.router.add_route(
+            "*",
+            "/api/v10/webhooks/{application_id}/{token}/messages/{id}",
+            self.message,
+        )
+        self.app.router.add_route("*", "/{tail:.*}", self.no_content)
+
+    async def current_user(self, request: web.Request) -> web.Response:
+        return json_response(BOT_USER)
+
+    async def application_info(self, request: web.Request) -> web.Response:
+        return json_response(
+            {
+                "id": str(APPLICATION_ID),
+                "name": "Koi",
+                "description": "",
+                "icon": None,
+                "bot_public": True,
+                "bot_require_code_grant": False,
+                "owner": BOT_USER,
+                "verify_key": "",
+                "flags": 0,
+            }
+        )
+
+    async def message(self, request: web.Request) -> web.Response:
+        await request.read()  # Drain json or multipart bodies, like attachments from /stats
+        self._message_ids += 1
+        return json_response(
+            {
+                "id": str(self._message_ids),
+                "channel_id": "0",
+                "author": BOT_USER,
+                "content": "",
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "edited_timestamp": None,
+                "tts": False,
+                "mention_everyone": False,
+                "mentions": [],
+                "mention_roles": [],
+                "attachments": [],
+                "embeds": [],
+                "pinned": False,
+                "type": 0,
+                "flags": 0,
+                "components": [],
+            }
+        )
+
+    async def no_content(self, request: web.Request) -> web.Response:
+        await request.read()
+        return web.Response(status=204)
+
+
+class MihomoStub(StubServer):
+    """Serves /sr_info_parsed/{uid} from the recorded profile, rewritten with the requested UID"""
+
+    def __init__(self, character_count: int = 4, **kwargs: typing.Any) -> None:
+        super().__init__("mihomo", **kwargs)
+        self.character_count: int = character_count
+        self._bodies: typing.Dict[str, bytes] = {}
+        # ^^ uid -> encoded response, built once per UID
+        self.app.router.add_get("/sr_info_parsed/{uid}", self.profile)
+
+    async def profile(self, request: web.Request) -> web.Response:
+        uid = request.match_info["uid"]
+        if not uid.isdigit():
+            return json_response({"detail": "Invalid uid"}, 400)
+
+        if uid not in self._bodies:
+            self._bodies[uid] = json.dumps(
+                make_profile_json(self.character_count, int(uid))
+            ).encode()
+
+        return web.Response(body=self._bodies[uid], content_type="application/json")
+
+
+class RetroAchievementsStub(StubServer):
+    """Serves the two RetroAchievements endpoints the bot calls from the recorded responses.
+    The fixtures already use camelCase keys, which the client's key conversion leaves unchanged.
+    """
+
+    def __init__(self, **kwargs: typing.Any) -> None:
+        super().__init__("retroachievements", **kwargs)
+        self._profile: bytes = json.dumps(
+            load_fixture("retro_user_profile.json")
+        ).encode()
+        self._game_info: bytes = json.dumps(
+            load_fixture("retro_game_info.json")
+        ).encode()
+        self.app.router.add_get("/API/API_GetUserProfile.php", self.user_profile)
+        self.app.router.add_get(
+            "/API/API_GetGameInfoAndUserProgress.php", self.game_info
+        )
+
+    async def user_profile(self, request: web.Request) -> web.Response:
+        return web.Response(body=self._profile, content_type="application/json")
+
+    async def game_info(self, request: web.Request) -> web.Response:
+        return web.Response(body=self._game_info, content_type="application/json")
+
+
+class ReactionStub(StubServer):
+    """Serves otakugifs /gif?reaction= lookups with a made up gif URL"""
+
+    def __init__(self, **kwargs: typing.Any) -> None:
+        super().__init__("reactions", **kwargs)
+        self._served: int = 0
+        self.app.router.add_get("/gif", self.gif)
+
+    async def gif(self, request: web.Request) -> web.Response:
+        self._served += 1
+        reaction = request.query.get("reaction", "hug")
+        return json_response(
+            {"url": f"https://cdn.otakugifs.xyz/gifs/{reaction}/{self._served}.gif"}
+        )
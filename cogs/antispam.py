@@ -0,0 +1,288 @@
+import math
+import time
+import typing
+import asyncio
+import discord
+from discord import app_commands
+from discord.ext import commands
+from models.Config import Config
+from models.audit_log import audit_log
+from models.bulk_action import BulkAction
+from models.command_metrics import command_metrics
+from models.profile_store import profile_store, settings_store
+from models.spam_detector import SpamDetector
+from logger_help import QueuedLogger, send_response_message_with_logs
+
+config = Config()
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
+
+ACTIONS = {
+    "kick": "Kick them",
+    "ban": "Ban them, deleting their last hour of messages",
+    "role": "Give them a role, like a muted or quarantine role",
+}  # ^^ Action -> description shown on /antispam
+
+
+class AntiSpam(commands.Cog):
+    """
+    Anti-Spam Cog
+    Watches the messages and joins of the guilds that turned it on with /antispam, and kicks, bans
+    or assigns a role to members who flood a channel or join as part of a raid.
+    See models/spam_detector.py for how activity is counted.
+    """
+
+    def __init__(self, client: commands.Bot) -> None:
+        self.client: commands.Bot = client
+        # ^^ Sets the client to be an attribute of the class
+        self.settings: typing.Dict[int, typing.Dict[str, typing.Any]] = {}
+        # ^^ Guild ID -> {"action", "role_id"}, loaded from the settings store in cog_load
+        self.detector: SpamDetector = SpamDetector(
+            config.SPAM_MESSAGE_LIMIT,
+            config.SPAM_MESSAGE_WINDOW,
+            config.SPAM_DUPLICATE_LIMIT,
+            config.SPAM_DUPLICATE_WINDOW,
+            config.RAID_JOIN_LIMIT,
+            config.RAID_JOIN_WINDOW,
+            config.SPAM_IDLE_SECONDS,
+        )
+        self.actions_taken: int = 0
+        self.action_errors: int = 0
+        # ^^ Counters exposed through stats()
+        self._eviction_task: asyncio.Task | None = None
+        command_metrics.register_gauges("antispam", self.stats)
+        self.STORE_NAMESPACE = "antispam"
+        self.ANTISPAM_HEX = 0x73BCF8
+        self.ERROR_HEX = 0xFF5733
+        # ^^ Constant variables used multiple times in the class
+
+    async def cog_load(self) -> None:
+        await settings_store.move_namespace(profile_store, self.STORE_NAMESPACE)
+        # ^^ Older versions kept these in the profile cache
+        stored = await settings_store.load_namespace(self.STORE_NAMESPACE)
+        self.settings = {int(guild_id): entry for guild_id, entry in stored.items()}
+        logger.display_notice(
+            "[AntiSpam.cog_load()] enabled in %s guilds", len(self.settings)
+        )
+        self._eviction_task = asyncio.create_task(self._eviction_loop())
+
+    async def cog_unload(self) -> None:
+        if self._eviction_task is not None:
+            self._eviction_task.cancel()
+            self._eviction_task = None
+
+        await settings_store.flush()  # Keep the last settings change
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Returns the detector and action counters, "guilds" counts the guilds the detector is tracking
+
+        Returns:
+            typing.Dict[str, int]: {"guilds", "members", "flagged_messages", "flagged_raids", "evicted", "enabled_guilds", "actions", "action_errors"}
+        """
+        stats = self.detector.stats()
+        stats["enabled_guilds"] = len(self.settings)
+        stats["actions"] = self.actions_taken
+        stats["action_errors"] = self.action_errors
+        return stats
+
+    async def _eviction_loop(self) -> None:
+        """Forgets members and guilds that went quiet, so tracking only costs memory for active ones"""
+        interval = max(1.0, config.SPAM_IDLE_SECONDS / 2)
+        while True:
+            await asyncio.sleep(interval)
+            evicted = self.detector.evict(time.monotonic())
+            if evicted:
+                logger.display_debug(
+                    "[_eviction_loop()] forgot %s idle entries", evicted
+                )
+
+    def is_exempt(self, member: discord.abc.User) -> bool:
+        """Bots and members who can manage messages are never acted on"""
+        return member.bot or (
+            isinstance(member, discord.Member)
+            and member.guild_permissions.manage_messages
+        )
+
+    def make_action(
+        self, guild: discord.Guild, reason: str
+    ) -> typing.Callable[[int], typing.Awaitable[typing.Any]] | None:
+        """Builds the guild's configured action, the same requests /kick, /ban and /role make
+
+        Args:
+            guild (discord.Guild): The guild
+            reason (str): The reason written to the audit log
+
+        Returns:
+            typing.Callable[[int], typing.Awaitable[typing.Any]] | None: Acts on a user ID, None if the guild turned detection off
+        """
+        settings = self.settings.get(guild.id)
+        if settings is None:
+            return None
+
+        async def action(user_id: int) -> None:
+            if settings["action"] == "ban":
+                await guild.ban(
+                    discord.Object(id=user_id),
+                    reason=reason,
+                    delete_message_seconds=3600,
+                )
+            elif settings["action"] == "role":
+                await self.client.http.add_role(
+                    guild.id, user_id, settings["role_id"], reason=reason
+                )  # ^^ Raw request, so it works for members missing from the member cache
+            else:
+                await guild.kick(discord.Object(id=user_id), reason=reason)
+
+            audit_log.record(
+                guild.id,
+                settings["action"],
+                self.client.user.id,  # type: ignore
+                user_id,
+                reason,
+                details=(
+                    str(settings["role_id"]) if settings["action"] == "role" else None
+                ),
+            )  # ^^ Automatic actions are recorded as done by the bot
+
+        return action
+
+    async def act(
+        self, guild: discord.Guild, user_ids: typing.List[int], reason: str
+    ) -> None:
+        """Runs the guild's configured action on members, at most bulk-action-concurrency at once
+
+        Args:
+            guild (discord.Guild): The guild
+            user_ids (typing.List[int]): The members to act on
+            reason (str): Why they were flagged. Ex: "sending the same message 4 times"
+        """
+        action = self.make_action(guild, f"Automatic: {reason}")
+        if action is None:
+            return
+
+        bulk = BulkAction(user_ids, action, config.BULK_ACTION_CONCURRENCY)
+
+        async def on_progress(bulk: BulkAction) -> None:
+            if not bulk.finished:
+                return
+
+            self.actions_taken += len(bulk.succeeded)
+            self.action_errors += len(bulk.failed)
+            logger.display_notice(
+                "[AntiSpam] [Guild %s] %s: acted on %s members, %s failed %s",
+                guild.id,
+                reason,
+                len(bulk.succeeded),
+                len(bulk.failed),
+                bulk.failed or "",
+            )
+
+        await bulk.run(on_progress, config.BULK_ACTION_PROGRESS_INTERVAL)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message) -> None:
+        """Counts the message towards its author's rate and duplicate limits"""
+        if message.guild is None or message.guild.id not in self.settings:
+            return
+        if self.is_exempt(message.author):
+            return
+
+        reason = self.detector.record_message(
+            message.guild.id, message.author.id, message.content, time.monotonic()
+        )
+        if reason is not None:
+            await self.act(message.guild, [message.author.id], reason)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member) -> None:
+        """Counts the join towards the guild's join burst limit, needs the members intent"""
+        if member.guild.id not in self.settings or member.bot:
+            return
+
+        user_ids = self.detector.record_join(
+            member.guild.id, member.id, time.monotonic()
+        )
+        if user_ids:
+            await self.act(
+                member.guild,
+                user_ids,
+                f"joining during a raid, {self.detector.join_limit}+ joins within {self.detector.join_window:g}s",
+            )
+
+    @app_commands.command(
+        name="antispam",
+        description="Choose what happens to members who spam or join during a raid",
+    )
+    @app_commands.describe(
+        action="What to do with flagged members, or turn detection off",
+        role="The role to assign, for the role action",
+    )
+    @app_commands.choices(
+        action=[
+            app_commands.Choice(name=description, value=action)
+            for action, description in ACTIONS.items()
+        ]
+        + [app_commands.Choice(name="Turn detection off", value="off")]
+    )
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def antispam(
+        self,
+        interaction: discord.Interaction,
+        action: app_commands.Choice[str],
+        role: discord.Role | None = None,
+    ):
+        logger.display_notice("[User %s] is calling /antispam", interaction.user.id)
+        guild: discord.Guild = interaction.guild  # type: ignore
+
+        problem = None
+        bot_member = guild.me or await guild.fetch_member(self.client.user.id)  # type: ignore
+        if action.value == "role" and role is None:
+            problem = "Pick the role to assign with the `role` option."
+        elif action.value == "role" and role >= bot_member.top_role:  # type: ignore
+            problem = "I can't assign this role as it is higher than my highest role."
+
+        if problem is not None:
+            embed = discord.Embed(color=self.ERROR_HEX, description=problem)
+        elif action.value == "off":
+            self.settings.pop(guild.id, None)
+            self.detector.forget_guild(guild.id)
+            settings_store.delete(self.STORE_NAMESPACE, guild.id)
+            embed = discord.Embed(
+                color=self.ANTISPAM_HEX, description="Spam and raid detection is off."
+            )
+        else:
+            self.settings[guild.id] = {
+                "action": action.value,
+                "role_id": role.id if action.value == "role" else None,  # type: ignore
+            }
+            settings_store.put(
+                self.STORE_NAMESPACE, guild.id, self.settings[guild.id], math.inf
+            )  # ^^ Settings never expire, they are deleted when detection is turned off
+
+            detector = self.detector
+            embed = discord.Embed(
+                color=self.ANTISPAM_HEX,
+                title="Spam and raid detection is on",
+                description=(
+                    f"Members who send {detector.message_limit} messages within {detector.message_window:g}s, "
+                    f"or the same message {detector.duplicate_limit} times within {detector.duplicate_window:g}s, "
+                    f"and members who join while {detector.join_limit}+ join within {detector.join_window:g}s "
+                    f"will be handled with: **{action.name}**"
+                    + (f" ({role.mention})" if action.value == "role" else "")  # type: ignore
+                    + ".\nMembers who can manage messages are never affected."
+                ),
+            )
+            if not self.client.intents.members:
+                embed.set_footer(
+                    text="Raid detection needs the members intent, only spam is detected for now."
+                )
+
+        await send_response_message_with_logs(
+            interaction, logger, "antispam", embed=embed, ephemeral=True
+        )
+
+
+async def setup(client: commands.Bot) -> None:
+    """Cog Setup Function, required for every cog that needs to be loaded.
+    Adds all the commands in the cog to the client and loads them"""
+    await client.add_cog(AntiSpam(client))
@@ -0,0 +1,310 @@
+import math
+import typing
+import discord
+from discord import app_commands
+from discord.ext import commands
+from models.Config import Config
+from models.command_metrics import command_metrics
+from models.profile_store import profile_store, settings_store
+from models.word_filter import Blocklist, parse_pattern
+from logger_help import (
+    QueuedLogger,
+    defer_with_logs,
+    send_followup_message_with_logs,
+)
+
+config = Config()
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
+
+
+class Automod(commands.Cog):
+    """
+    Automod Cog
+    Deletes messages containing a pattern from their guild's blocklist.
+    Every guild's blocklist is compiled into an Aho-Corasick automaton, see models/word_filter.py,
+    so checking a message doesn't get slower as the list grows.
+    """
+
+    def __init__(self, client: commands.Bot) -> None:
+        self.client: commands.Bot = client
+        # ^^ Sets the client to be an attribute of the class
+        self.blocklists: typing.Dict[int, Blocklist] = {}
+        # ^^ Guild ID -> blocklist, loaded from the settings store in cog_load
+        self.checked: int = 0
+        self.matched: int = 0
+        self.delete_errors: int = 0
+        # ^^ Counters exposed through stats()
+        command_metrics.register_gauges("automod", self.stats)
+        self.STORE_NAMESPACE = "automod"
+        self.MAX_PATTERN_LENGTH = 100
+        self.NOTICE_SECONDS = 5
+        self.AUTOMOD_HEX = 0x73BCF8
+        self.ERROR_HEX = 0xFF5733
+        # ^^ Constant variables used multiple times in the class
+
+    async def cog_load(self) -> None:
+        await settings_store.move_namespace(profile_store, self.STORE_NAMESPACE)
+        # ^^ Older versions kept these in the profile cache
+        stored = await settings_store.load_namespace(self.STORE_NAMESPACE)
+        for guild_id, patterns in stored.items():
+            self.blocklists[int(guild_id)] = Blocklist(patterns)
+
+        logger.display_notice(
+            "[Automod.cog_load()] loaded %s patterns for %s guilds",
+            sum(map(len, self.blocklists.values())),
+            len(self.blocklists),
+        )
+
+    async def cog_unload(self) -> None:
+        await settings_store.flush()  # Keep the last edits
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Returns the automod counters
+
+        Returns:
+            typing.Dict[str, int]: {"guilds", "patterns", "checked", "matched", "delete_errors", "compactions"}
+        """
+        return {
+            "guilds": len(self.blocklists),
+            "patterns": sum(map(len, self.blocklists.values())),
+            "checked": self.checked,
+            "matched": self.matched,
+            "delete_errors": self.delete_errors,
+            "compactions": sum(
+                blocklist.compactions for blocklist in self.blocklists.values()
+            ),
+        }
+
+    def save(self, guild_id: int) -> None:
+        """Queues a guild's blocklist to be written to the settings store, or deleted if it is empty"""
+        blocklist = self.blocklists.get(guild_id)
+        if not blocklist:
+            self.blocklists.pop(guild_id, None)
+            settings_store.delete(self.STORE_NAMESPACE, guild_id)
+            return
+
+        settings_store.put(
+            self.STORE_NAMESPACE, guild_id, sorted(blocklist.patterns), math.inf
+        )  # ^^ Blocklists never expire, they are emptied with /automod-remove
+
+    async def read_patterns(
+        self, patterns: str | None, file: discord.Attachment | None
+    ) -> typing.List[str]:
+        """Collects the patterns given to /automod-add or /automod-remove
+
+        Args:
+            patterns (str | None): Patterns separated by commas
+            file (discord.Attachment | None): A text file with one pattern per line
+
+        Returns:
+            typing.List[str]: The patterns, without blank and over-long ones
+        """
+        collected = (patterns or "").split(",")
+        if file is not None:
+            collected += (await file.read()).decode("utf-8", "replace").splitlines()
+
+        return [
+            pattern
+            for pattern in map(str.strip, collected)
+            if parse_pattern(pattern)[0] and len(pattern) <= self.MAX_PATTERN_LENGTH
+        ]  # ^^ A lone * would match nothing
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message) -> None:
+        await self.check_message(message)
+
+    @commands.Cog.listener()
+    async def on_message_edit(
+        self, before: discord.Message, after: discord.Message
+    ) -> None:
+        """Checks edits too, otherwise a blocked pattern could be edited into a clean message"""
+        if before.content != after.content:
+            await self.check_message(after)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent) -> None:
+        """on_message_edit only fires for cached messages, and the message cache is off by default"""
+        if payload.cached_message is not None or "content" not in payload.data:
+            return  # Cached edits go through on_message_edit, no content means a link preview was added
+        if not self.blocklists.get(payload.guild_id):  # type: ignore
+            return
+
+        guild = self.client.get_guild(payload.guild_id)  # type: ignore
+        channel = guild.get_channel_or_thread(payload.channel_id) if guild else None
+        if channel is None:
+            return
+
+        try:
+            message = discord.Message(
+                state=self.client._connection, channel=channel, data=payload.data  # type: ignore
+            )
+        except (KeyError, TypeError, ValueError):
+            return  # A partial update that can't be turned into a message
+
+        await self.check_message(message)
+
+    async def check_message(self, message: discord.Message) -> None:
+        """Deletes a guild message if it contains a blocked pattern, members who can manage messages are exempt"""
+        if message.guild is None or message.author.bot or not message.content:
+            return
+
+        blocklist = self.blocklists.get(message.guild.id)
+        if not blocklist:
+            return  # Most guilds have no blocklist, nothing to scan
+
+        if (
+            isinstance(message.author, discord.Member)
+            and message.author.guild_permissions.manage_messages
+        ):
+            return
+
+        self.checked += 1
+        pattern = blocklist.find(message.content)
+        if pattern is None:
+            return
+
+        self.matched += 1
+        logger.display_notice(
+            "[Automod] deleting message from [User %s] in [Guild %s], matched `%s`",
+            message.author.id,
+            message.guild.id,
+            pattern,
+        )
+        try:
+            await message.delete()
+            await message.channel.send(
+                f"{message.author.mention}, your message was removed by automod.",
+                delete_after=self.NOTICE_SECONDS,
+                allowed_mentions=discord.AllowedMentions(users=[message.author]),
+            )
+        except discord.HTTPException as e:
+            self.delete_errors += 1
+            logger.display_warning(
+                "[Automod] could not remove message in [Guild %s]: %s",
+                message.guild.id,
+                e,
+            )
+
+    @app_commands.command(
+        name="automod-add", description="Blocks words or patterns on this server"
+    )
+    @app_commands.describe(
+        patterns="Patterns separated by commas, a * at either end also matches inside longer words",
+        file="A text file with one pattern per line",
+    )
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(manage_messages=True)
+    async def automod_add(
+        self,
+        interaction: discord.Interaction,
+        patterns: str | None = None,
+        file: discord.Attachment | None = None,
+    ):
+        logger.display_notice("[User %s] is calling /automod-add", interaction.user.id)
+        await defer_with_logs(interaction, logger, ephemeral=True)
+
+        guild_id: int = interaction.guild_id  # type: ignore
+        blocklist = self.blocklists.get(guild_id) or Blocklist()
+        requested = await self.read_patterns(patterns, file)
+        new = [
+            pattern
+            for pattern in dict.fromkeys(requested)
+            if pattern not in blocklist.patterns
+        ]
+        room = max(0, config.AUTOMOD_MAX_PATTERNS - len(blocklist))
+
+        added = blocklist.add(new[:room])
+        if added:
+            self.blocklists[guild_id] = blocklist
+            self.save(guild_id)
+            if blocklist.needs_compaction:
+                await blocklist.compact()
+
+        description = (
+            f"Added {len(added)} patterns, the blocklist has {len(blocklist)}."
+        )
+        if len(new) > room:
+            description += f"\nThe blocklist is limited to {config.AUTOMOD_MAX_PATTERNS} patterns, {len(new) - room} were not added."
+        if not requested:
+            description = f"Give me patterns separated by commas, or a file with one per line. Patterns are up to {self.MAX_PATTERN_LENGTH} characters."
+
+        embed = discord.Embed(
+            color=self.AUTOMOD_HEX if added else self.ERROR_HEX,
+            description=description,
+        )
+        await send_followup_message_with_logs(
+            interaction, logger, "automod-add", embed=embed, ephemeral=True
+        )
+
+    @app_commands.command(
+        name="automod-remove", description="Unblocks words or patterns on this server"
+    )
+    @app_commands.describe(
+        patterns="Patterns separated by commas, written like they were added",
+        file="A text file with one pattern per line",
+    )
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(manage_messages=True)
+    async def automod_remove(
+        self,
+        interaction: discord.Interaction,
+        patterns: str | None = None,
+        file: discord.Attachment | None = None,
+    ):
+        logger.display_notice(
+            "[User %s] is calling /automod-remove", interaction.user.id
+        )
+        await defer_with_logs(interaction, logger, ephemeral=True)
+
+        guild_id: int = interaction.guild_id  # type: ignore
+        blocklist = self.blocklists.get(guild_id) or Blocklist()
+        removed = blocklist.remove(await self.read_patterns(patterns, file))
+        if removed:
+            self.save(guild_id)
+            if blocklist.needs_compaction:
+                await blocklist.compact()
+
+        embed = discord.Embed(
+            color=self.AUTOMOD_HEX if removed else self.ERROR_HEX,
+            description=f"Removed {len(removed)} patterns, the blocklist has {len(blocklist)}.",
+        )
+        await send_followup_message_with_logs(
+            interaction, logger, "automod-remove", embed=embed, ephemeral=True
+        )
+
+    @app_commands.command(
+        name="automod-list", description="Shows the patterns blocked on this server"
+    )
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(manage_messages=True)
+    async def automod_list(self, interaction: discord.Interaction):
+        logger.display_notice("[User %s] is calling /automod-list", interaction.user.id)
+        await defer_with_logs(interaction, logger, ephemeral=True)
+
+        blocklist = self.blocklists.get(interaction.guild_id) or Blocklist()  # type: ignore
+        embed = discord.Embed(
+            color=self.AUTOMOD_HEX,
+            title=f"Automod Blocklist ({len(blocklist)} patterns)",
+            description="",
+        )
+        for pattern in sorted(blocklist.patterns):
+            line = f"`{pattern}`\n"
+            if len(embed.description) + len(line) > 4000:  # type: ignore
+                embed.description += "..."  # type: ignore
+                break
+            embed.description += line  # type: ignore
+
+        if not blocklist:
+            embed.description = (
+                "Nothing is blocked yet, add patterns with `/automod-add`."
+            )
+
+        await send_followup_message_with_logs(
+            interaction, logger, "automod-list", embed=embed, ephemeral=True
+        )
+
+
+async def setup(client: commands.Bot) -> None:
+    """Cog Setup Function, required for every cog that needs to be loaded.
+    Adds all the commands in the cog to the client and loads them"""
+    await client.add_cog(Automod(client))
@@ -1,17 +1,19 @@
 import random
 import discord
-import asyncio
-import requests
 from discord import app_commands
 from discord.ext import commands
-from pythondebuglogger.Logger import Logger
+from models.Config import Config
+from models.command_metrics import command_metrics
+from models.reaction_client import ReactionClient
 from logger_help import (
+    QueuedLogger,
     defer_with_logs,
     send_followup_message_with_logs,
     send_response_message_with_logs,
 )
 
-logger: Logger = Logger(enable_timestamps=True)  # Create the debug logger
+config = Config()
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)  # Create the debug logger
 
 
 class Entertainment(commands.Cog):
@@ -19,29 +21,17 @@ class Entertainment(commands.Cog):
 
     def __init__(self, client: commands.Bot) -> None:
         self.client: commands.Bot = client
+        self.reactions = ReactionClient(
+            buffer_size=config.REACTION_BUFFER_SIZE,
+            refill_interval=config.REACTION_REFILL_INTERVAL,
+            max_age=config.REACTION_MAX_AGE,
+        )  # ^^ otakugifs client, keeps a buffer of ready gif URLs for every reaction type
 
-    def get_hug_gif(self) -> str | None:
-        """Retrieves information from an api.
-        Simply returns a string or None if the request fails.
-        The string will be a url to an anime gif hug."""
+    async def cog_load(self) -> None:
+        self.reactions.start(["hug"])  # Start buffering hug gifs right away
 
-        hug_api_url = "https://api.otakugifs.xyz/gif?reaction=hug"
-        logger.display_notice("[get_hug_gif()] Attempting to request data from API")
-        data = requests.get(hug_api_url)
-
-        try:
-            url = data.json().get("url")
-            logger.display_notice(
-                "[get_hug_gif()] Successfully requested data from API"
-            )
-            return url
-        except Exception as e:
-            logger.display_error(
-                f"[get_hug_gif()] failed to retrieve a valid json response: {e}"
-            )
-            logger.display_error("[get_hug_gif()] Actual response data:")
-            logger.display_debug(data.text)
-            return None
+    async def cog_unload(self) -> None:
+        await self.reactions.close()
 
     @app_commands.command(name="hug", description="Give a user of your choice a hug")
     @app_commands.describe(user="The user you want to give a hug to")
@@ -51,28 +41,23 @@ class Entertainment(commands.Cog):
         It will also ping the member and attempt to access the interaction user's avatar.
         """
 
-        logger.display_notice(f"[User {interaction.user.id}] is calling /hug")
+        logger.display_notice("[User %s] is calling /hug", interaction.user.id)
 
         await defer_with_logs(interaction, logger)
 
-        try:
-            active_event_loop = asyncio.get_running_loop()
-        except RuntimeError:
-            logger.display_error(
-                f"[User {interaction.user.id}/hug] There is no running event loop."
-            )
-            return
-
-        logger.display_notice(f"[User {interaction.user.id}/hug] calling get_hug_gif()")
-        api_results = await active_event_loop.run_in_executor(None, self.get_hug_gif)
+        logger.display_notice("[User %s/hug] getting a hug gif", interaction.user.id)
+        with command_metrics.timer("hug", "fetch"):
+            api_results = await self.reactions.get_gif("hug")
 
         if api_results is None:
             logger.display_error(
-                f"[User {interaction.user.id}/hug] Failed to retrieve valid json from API"
+                "[User %s/hug] Failed to retrieve valid json from API",
+                interaction.user.id,
             )
+            command_metrics.record_error("hug")
             return
 
-        logger.display_notice(f"[User {interaction.user.id}/hug] creating hug embed")
+        logger.display_notice("[User %s/hug] creating hug embed", interaction.user.id)
         hug_message = f"*{interaction.user.name} is giving {user.name} a hug!*"
         if user == interaction.user or user == self.client.user:
             hug_message = f"Awh, are you lonely {interaction.user.name}? Have some hugs from me! 💙"
@@ -85,7 +70,8 @@ class Entertainment(commands.Cog):
             avatar_url = interaction.user.avatar.url  # type: ignore
         except Exception:
             logger.display_debug(
-                f"[User {interaction.user.id}/hug] Something is up with the users avatar."
+                "[User %s/hug] Something is up with the users avatar.",
+                interaction.user.id,
             )
             avatar_url = ""
 
@@ -103,10 +89,12 @@ class Entertainment(commands.Cog):
         1 -> Heads
         0 -> Tails"""
 
-        logger.display_notice(f"[User {interaction.user.id}] is calling /flip")
+        logger.display_notice("[User %s] is calling /flip", interaction.user.id)
         random_number = random.randint(0, 1)
         logger.display_notice(
-            f"[User {interaction.user.id}] generated random number ({random_number})"
+            "[User %s] generated random number (%s)",
+            interaction.user.id,
+            random_number,
         )
 
         await send_response_message_with_logs(
@@ -118,7 +106,7 @@ class Entertainment(commands.Cog):
 
     @app_commands.command(name="ping", description="Pong! 🏓")
     async def _ping(self, interaction: discord.Interaction):
-        logger.display_notice(f"[User {interaction.user.id}] is calling /ping")
+        logger.display_notice("[User %s] is calling /ping", interaction.user.id)
 
         await send_response_message_with_logs(
             interaction, logger, "ping", "Pong! 🏓", ephemeral=True
@@ -1,21 +1,41 @@
+import re
+import math
 import typing
+import asyncio
 import discord
+import functools
 from random import choice
 from discord import app_commands
 from discord.ext import commands
-from mihomo.models import Character
-from mihomo import Language, MihomoAPI
-from mihomo.models import StarrailInfoParsed
+from models.Config import Config
+from models.command_metrics import command_metrics
+from models.profile_cache import ProfileCache
+from models.profile_store import profile_store
+from models.rate_limiter import Priority
+from models.stat_percentiles import stat_percentiles
+from models.shared_caches import hsr_profiles, mihomo_limiter
+from models.parsed_profile import ParsedProfile
+from models.compact_profile import CompactCharacter, CompactProfile
 from models.player_card_view import PlayerCardView
-from mihomo.errors import InvalidParams, UserNotFound, HttpRequestError
-from pythondebuglogger.Logger import Logger
+from models.character_dropdown import CharacterDropdown
+from models.character_card_view import LightconeButton
 
 from logger_help import (
+    QueuedLogger,
     defer_with_logs,
+    edit_followup_message_with_logs,
     send_followup_message_with_logs,
 )
 
-logger: Logger = Logger(enable_timestamps=True)
+if typing.TYPE_CHECKING:  # mihomo and its pydantic models are imported on first use
+    from mihomo import MihomoAPI
+    from mihomo.models import StarrailInfoParsed
+
+config = Config()
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
+
+QueueCallback = typing.Callable[[int, float], typing.Awaitable[typing.Any]]
+# ^^ Called with the queue position and estimated wait in seconds when a request has to wait for the rate limiter
 
 
 class HSR(commands.Cog):
@@ -27,50 +47,232 @@ class HSR(commands.Cog):
     def __init__(self, client: commands.Bot) -> None:
         self.client: commands.Bot = client
         # ^^ Sets the client to be an attribute of the class
-        self.hsrapi = MihomoAPI(language=Language.EN)
-        # ^^ Honkai: Star Rail API Client, used for getting HSR Information
+        self._hsrapi: "MihomoAPI | None" = None
+        # ^^ Honkai: Star Rail API Client, created by the hsrapi property on first use
+        self.profile_cache: "ProfileCache[int, CompactProfile]" = hsr_profiles
+        # ^^ Profiles keyed by UID, shared by concurrent lookups for the same UID and kept across /reload
+        command_metrics.register_gauges("hsr_profile_cache", self.profile_cache.stats)
+        self.parsed_profiles: ProfileCache[int, ParsedProfile] = ProfileCache(
+            max_size=config.VIEW_CACHE_SIZE, ttl=config.VIEW_CACHE_TTL
+        )  # ^^ Parsed profiles keyed by UID, keeps rendered cards for the dropdowns and buttons.
+        # Not kept across /reload, the cards are rendered again with the reloaded code
+        command_metrics.register_gauges("hsr_view_cache", self.parsed_profiles.stats)
+        self.mihomo_limiter = mihomo_limiter
+        # ^^ Token bucket in front of every request to Mihomo's API, interactive requests go first
+        command_metrics.register_gauges("mihomo_limiter", self.mihomo_limiter.stats)
+        self.QUEUE_NOTICE_AFTER = 1.0
+        # ^^ Seconds a request has to wait for the rate limiter before the user is told about it
+        self.COMPARE_MAX_UIDS = 4
+        self.COMPARE_CONCURRENCY = 2
+        self.COMPARE_COLUMN_WIDTH = 10
+        # ^^ /hsr-compare limits, four columns still fit an embed on a phone
+        self.PERCENTILE_MIN_BUILDS = 5
+        # ^^ Builds of a character needed before character cards show how a stat compares
         self.FIVE_STAR_HEX = 0xFFAA4A
         self.FOUR_STAR_HEX = 0x8278ED
         self.ERROR_HEX = 0xFF5733
         # ^^ Constant variables used multiple times in the class
 
+    async def cog_load(self) -> None:
+        self.client.add_dynamic_items(CharacterDropdown, LightconeButton)
+        # ^^ Dispatches the dropdowns and buttons of every /hsr message, including ones sent before a restart
+
+    async def cog_unload(self) -> None:
+        self.client.remove_dynamic_items(CharacterDropdown, LightconeButton)
+        await profile_store.flush()  # Keep the profiles fetched since the last batch
+
+    @property
+    def hsrapi(self) -> "MihomoAPI":
+        """Honkai: Star Rail API Client, used for getting HSR Information.
+        mihomo is imported here instead of at the top of the file, so its pydantic models
+        are only loaded when the first HSR command runs instead of on every startup.
+        """
+        if self._hsrapi is None:
+            from mihomo import Language, MihomoAPI
+
+            self._hsrapi = MihomoAPI(language=Language.EN)
+
+        return self._hsrapi
+
     async def get_hsr_data(
-        self, uid: int
-    ) -> StarrailInfoParsed | typing.Literal["Net"] | None:
+        self,
+        uid: int,
+        priority: Priority = Priority.INTERACTIVE,
+        on_queued: QueueCallback | None = None,
+    ) -> "CompactProfile | typing.Literal['Net'] | None":
         """Requests data from Honkai: Star Rail using a UID
 
         Args:
             uid (int): A user ID from Honkai: Star Rail. Ex: 613792348, 714028257
+            priority (Priority, optional): Where the request goes in the rate limiter's queue. Defaults to Priority.INTERACTIVE.
+            on_queued (QueueCallback | None, optional): Awaited with the queue position and estimated wait
+            if the request has to wait for the rate limiter. Defaults to None.
 
         Returns:
-            StarrailInfoParsed | typing.Literal["Net"] | None:
+            CompactProfile | typing.Literal["Net"] | None:
               Returns the Honkai: Star Rail user information based on the UID if the data is retrievable.
               If there is an HttpRequestError, returns "Net"
               If there is another type of error, returns None
         """
 
-        logger.display_notice(f"[get_hsr_data()] is being called with uid `{uid}`")
+        from mihomo.errors import HttpRequestError, InvalidParams, UserNotFound
+
+        logger.display_notice("[get_hsr_data()] is being called with uid `%s`", uid)
         try:  # Attempting to get the data
-            data: StarrailInfoParsed = await self.hsrapi.fetch_user(
-                uid, replace_icon_name_with_url=True
+            data: "CompactProfile" = await self.profile_cache.get_or_fetch(
+                uid,
+                functools.partial(
+                    self.load_profile, priority=priority, on_queued=on_queued
+                ),
             )
             logger.display_notice(
-                f"[get_hsr_data()] request was made successfully for uid `{uid}`"
+                "[get_hsr_data()] request was made successfully for uid `%s`",
+                uid,
             )
             return data
         except HttpRequestError:
             logger.display_warning(
-                f"[get_hsr_data()] request failed due to a network error for uid `{uid}`"
+                "[get_hsr_data()] request failed due to a network error for uid `%s`",
+                uid,
             )
             return "Net"
         except (InvalidParams, UserNotFound):  # If an invalid UID is passed
             logger.display_error(
-                f"[get_hsr_data()] request failed due to invalid parameters or user with uid `{uid}` could not be found."
+                "[get_hsr_data()] request failed due to invalid parameters or user with uid `%s` could not be found.",
+                uid,
             )
             return None
 
-    def make_player_card(self, hsr_info: StarrailInfoParsed) -> discord.Embed:
-        """Takes in a StarrailInfoParsed object and creates a discord Embed representing the player card.
+    async def load_profile(
+        self,
+        uid: int,
+        priority: Priority = Priority.INTERACTIVE,
+        on_queued: QueueCallback | None = None,
+    ) -> "CompactProfile":
+        """Loads a profile from the on-disk profile store, or from Mihomo's API if it isn't stored.
+        Only called by the profile cache when there is no valid cached entry and no request in flight.
+
+        Args:
+            uid (int): A user ID from Honkai: Star Rail
+            priority (Priority, optional): Passed on to fetch_user. Defaults to Priority.INTERACTIVE.
+            on_queued (QueueCallback | None, optional): Passed on to fetch_user. Defaults to None.
+
+        Returns:
+            CompactProfile: The user information the cards need
+
+        Raises:
+            HttpRequestError, InvalidParams, UserNotFound: Passed through from MihomoAPI.fetch_user
+        """
+        data: CompactProfile | None = await profile_store.get(
+            "hsr-compact", uid, CompactProfile.from_json
+        )
+        if data is not None:
+            logger.display_notice(
+                "[load_profile()] uid `%s` loaded from the profile store", uid
+            )
+            self.record_builds(data)
+            return data
+
+        data = CompactProfile.from_model(
+            await self.fetch_user(uid, priority, on_queued)
+        )
+        # ^^ The pydantic model is dropped here, only the compact copy is cached and stored
+        self.record_builds(data)
+        profile_store.put(
+            "hsr-compact", uid, data, config.PROFILE_STORE_TTL, CompactProfile.to_json
+        )
+        return data
+
+    async def fetch_user(
+        self,
+        uid: int,
+        priority: Priority = Priority.INTERACTIVE,
+        on_queued: QueueCallback | None = None,
+    ) -> "StarrailInfoParsed":
+        """Requests a profile straight from Mihomo's API, bypassing the profile cache and store.
+        Waits for the rate limiter first.
+
+        Args:
+            uid (int): A user ID from Honkai: Star Rail
+            priority (Priority, optional): Where the request goes in the rate limiter's queue. Defaults to Priority.INTERACTIVE.
+            on_queued (QueueCallback | None, optional): Awaited with the queue position and estimated wait
+            if the wait is longer than QUEUE_NOTICE_AFTER. Defaults to None.
+
+        Returns:
+            StarrailInfoParsed: The parsed user information
+
+        Raises:
+            HttpRequestError, InvalidParams, UserNotFound: Passed through from MihomoAPI.fetch_user
+        """
+
+        ticket = self.mihomo_limiter.reserve(priority)
+        wait = ticket.estimated_wait
+        if wait > 0:
+            logger.display_notice(
+                "[fetch_user()] uid `%s` queued at position %s, about %.1fs",
+                uid,
+                ticket.position,
+                wait,
+            )
+            if on_queued is not None and wait >= self.QUEUE_NOTICE_AFTER:
+                await on_queued(ticket.position, wait)
+        await ticket.wait()
+
+        logger.display_notice(
+            "[fetch_user()] cache miss, requesting uid `%s` from the API",
+            uid,
+        )
+        data: "StarrailInfoParsed" = await self.hsrapi.fetch_user(
+            uid, replace_icon_name_with_url=True
+        )
+        if logger.is_enabled_for(
+            "debug"
+        ):  # Skip building the stats when they would be dropped
+            logger.display_debug(
+                "[fetch_user()] profile cache stats: %s",
+                self.profile_cache.stats(),
+            )
+        return data
+
+    def record_builds(self, hsr_info: "CompactProfile") -> None:
+        """Adds the total stats of every character on a profile to the stat percentiles,
+        replacing the builds recorded the last time this profile was loaded
+
+        Args:
+            hsr_info (CompactProfile): The information retrieved from Mihomo's API
+        """
+        for character in hsr_info.characters:
+            stat_percentiles.update(
+                character.name,
+                hsr_info.player.uid,
+                {
+                    stat: total["value"]
+                    for stat, total in self.calculate_total_character_stats(
+                        character
+                    ).items()
+                },
+            )
+
+    def player_attributes(self, hsr_info: "CompactProfile") -> typing.Dict[str, int]:
+        """Returns the general player information shown on player cards
+
+        Args:
+            hsr_info (CompactProfile): The information retrieved from Mihomo's API
+
+        Returns:
+            typing.Dict[str, int]: {descriptor: value}, in display order. Ex: {"Trailblaze Level": 70, ...}
+        """
+        return {
+            "Trailblaze Level": hsr_info.player.level,
+            "Friends": hsr_info.player.friend_count,
+            "Equilibrium Level": hsr_info.player.world_level,
+            "Achievements": hsr_info.player.achievements,
+            "Characters Owned": hsr_info.player.characters,
+            "Light Cones Owned": hsr_info.player.light_cones,
+        }
+
+    def make_player_card(self, hsr_info: "CompactProfile") -> discord.Embed:
+        """Takes in a CompactProfile and creates a discord Embed representing the player card.
         The player card refers to some general useful information about the player.
 
         This information includes Trailblaze Level, Friend Count, Equilibrium Level, Achievement Count,
@@ -79,80 +281,99 @@ class HSR(commands.Cog):
         Once the embed is created, returns it.
 
         Args:
-            hsr_info (StarrailInfoParsed): The information retrieved from Mihomo's API
+            hsr_info (CompactProfile): The information retrieved from Mihomo's API
 
         Returns:
             discord.Embed: The player card embed
         """
 
         logger.display_notice(
-            f"[make_player_card()] called for user `{hsr_info.player.uid}`"
+            "[make_player_card()] called for user `%s`",
+            hsr_info.player.uid,
         )
 
         player_card_color = choice((self.FIVE_STAR_HEX, self.FOUR_STAR_HEX))
+        player_attribute_mapping = self.player_attributes(hsr_info)
+
+        lines = [
+            f"{descriptor:17} -> {value:4d}\n"
+            for descriptor, value in player_attribute_mapping.items()
+        ]
         player_card = discord.Embed(
             color=player_card_color,
-            description="```",
-        )
+            description="```" + "".join(lines) + "```",
+        )  # ^^ The description is joined once instead of grown line by line
         player_card.set_author(
             name=hsr_info.player.name + " | " + str(hsr_info.player.uid),
             icon_url=hsr_info.player.avatar.icon,
         )
 
-        player_attribute_mapping = {
-            "Trailblaze Level": hsr_info.player.level,
-            "Friends": hsr_info.player.friend_count,
-            "Equilibrium Level": hsr_info.player.world_level,
-            "Achievements": hsr_info.player.achievements,
-            "Characters Owned": hsr_info.player.characters,
-            "Light Cones Owned": hsr_info.player.light_cones,
-        }
-
-        for descriptor, value in player_attribute_mapping.items():
-            player_card.description += f"{descriptor:17} -> {value:4d}\n"  # type: ignore
-
-        player_card.description += "```"  # type: ignore
-
         logger.display_notice(
-            f"[make_player_card()] Card created for user `{hsr_info.player.uid}`"
+            "[make_player_card()] Card created for user `%s`",
+            hsr_info.player.uid,
         )
 
         return player_card
 
-    def make_character_list(self, hsr_info: StarrailInfoParsed) -> discord.Embed:
-        """Takes the hsr_info from the API and returns a list of the characters on the users profile
+    def make_comparison_card(
+        self,
+        profiles: typing.List["CompactProfile"],
+        failures: typing.List[str],
+    ) -> discord.Embed:
+        """Creates a discord Embed with the player card information of several players side by side,
+        one column per player, followed by a line for every UID that could not be compared.
 
         Args:
-            hsr_info (StarrailInfoParsed): The data from the Mihomo API
+            profiles (typing.List[CompactProfile]): The players to compare, in column order
+            failures (typing.List[str]): Why each failed UID is missing. Ex: ["`123`: not a valid UID"]
 
         Returns:
-            discord.Embed: A discord embed whose title is a list of the characters the user has on their profile.
-            To access it, simply access the embed's title property. Ex: character_list.title
+            discord.Embed: The comparison card
         """
 
         logger.display_notice(
-            f"[make_character_list()] called for user `{hsr_info.player.uid}`"
+            "[make_comparison_card()] called for %s players and %s failures",
+            len(profiles),
+            len(failures),
         )
 
-        character_list = discord.Embed(title="")
-        character_list.title = ", ".join(
-            character.name for character in hsr_info.characters
-        )
+        lines: typing.List[str] = []
+        if profiles:
+            width = self.COMPARE_COLUMN_WIDTH
+            rows = {
+                "": [hsr_info.player.name[:width] for hsr_info in profiles],
+                "UID": [str(hsr_info.player.uid) for hsr_info in profiles],
+            }
+            for hsr_info in profiles:
+                for descriptor, value in self.player_attributes(hsr_info).items():
+                    rows.setdefault(descriptor, []).append(str(value))
+
+            lines.append("```\n")
+            for descriptor, values in rows.items():
+                lines.append(
+                    f"{descriptor:17}"
+                    + "".join(f" {value:>{width}}" for value in values)
+                    + "\n"
+                )
+            lines.append("```")
+            # ^^ One row per attribute and one right aligned column per player
 
-        logger.display_notice(
-            f"[make_character_list()] finished for user `{hsr_info.player.uid}`"
-        )
+        lines.extend(f"\n❌ {failure}" for failure in failures)
 
-        return character_list
+        return discord.Embed(
+            color=choice((self.FIVE_STAR_HEX, self.FOUR_STAR_HEX)),
+            title="Player Comparison",
+            description="".join(lines),
+        )
 
     def calculate_total_character_stats(
-        self, character: Character
+        self, character: "CompactCharacter"
     ) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
         """Returns an informational mapping of strings to attribute values that matter,
         combining them and adding the values
 
         Args:
-            character (Character): The character object
+            character (CompactCharacter): The character object
 
         Returns:
             typing.Dict[str, typing.Dict[str, typing.Any]]: The stats for a character
@@ -174,7 +395,8 @@ class HSR(commands.Cog):
         """
 
         logger.display_notice(
-            f"[calculate_total_character_stats()] called for character `{character.name}`"
+            "[calculate_total_character_stats()] called for character `%s`",
+            character.name,
         )
 
         raw_stats = character.attributes + character.additions
@@ -194,73 +416,161 @@ class HSR(commands.Cog):
                 # ^^ Add the values together
 
         logger.display_notice(
-            f"[calculate_total_character_stats()] finished for character `{character.name}`"
+            "[calculate_total_character_stats()] finished for character `%s`",
+            character.name,
         )
 
         return total_stats
 
+    def make_character_card(self, character: "CompactCharacter") -> discord.Embed:
+        """Creates the character card for a single character, which is a discord Embed
+        containing important information about the character
+
+        Args:
+            character (CompactCharacter): The character object
+
+        Returns:
+            discord.Embed: The character card
+        """
+
+        logger.display_notice(
+            "[make_character_card()] being called for character `%s`",
+            character.name,
+        )
+
+        element_color = int("0x" + character.element.color[1:], 0)  # Get hex code
+        character_stats = self.calculate_total_character_stats(character)
+        # ^^  Calculate the characters total stats
+
+        lines = [
+            (
+                f"+ {stat:28}-> {int(character_stats[stat]['value']):8}\n"
+                if not character_stats[stat]["is_percent"]
+                else f"+ {stat:28}-> {round((character_stats[stat]['value'] * 100), 1):7}%\n"
+            )
+            for stat in character_stats
+        ]  # ^^ String formatting, one codeblock line per stat
+
+        character_card: discord.Embed = discord.Embed(
+            description="```diff\n" + "".join(lines) + "```",
+            color=element_color,
+        )  # Create the Embed
+
+        ranks = {
+            stat: rank
+            for stat, rank in stat_percentiles.rank(
+                character.name,
+                {stat: total["value"] for stat, total in character_stats.items()},
+            ).items()
+            if rank[1] >= self.PERCENTILE_MIN_BUILDS
+        }  # ^^ (rank, builds, top percent) of each stat among the builds the bot has seen
+        if ranks:
+            character_card.add_field(
+                name=f"Compared to {max(rank[1] for rank in ranks.values())} {character.name} builds",
+                value="```\n"
+                + "".join(
+                    f"{stat:28}top {max(1, math.ceil(top_percent)):3d}%\n"
+                    for stat, (_, _, top_percent) in ranks.items()
+                )
+                + "```",
+            )
+
+        character_card.set_author(
+            name=f"{character.name} - Lvl {character.level}/{character.max_level} -  E{character.eidolon}",
+            icon_url=character.icon,
+        )
+
+        character_card.set_image(url=character.preview)
+        return character_card
+
     def make_character_cards(
-        self, hsr_info: StarrailInfoParsed
+        self, hsr_info: "CompactProfile"
     ) -> typing.Dict[str, discord.Embed]:
         """Creates a dictionary of character names mapped to character cards, which are discord Embeds
         Each card will contain important information about each character
 
         Args:
-            hsr_info (StarrailInfoParsed): Parsed Honkai: Star Rail Info parsed from Mihomo's API
+            hsr_info (CompactProfile): Parsed Honkai: Star Rail Info parsed from Mihomo's API
 
         Returns:
             typing.Dict[str, discord.Embed]: {character_name (str): character_card (discord.Embed)}
         """
 
         logger.display_notice(
-            f"[make_character_cards()] being called for user `{hsr_info.player.uid}`"
+            "[make_character_cards()] being called for user `%s`",
+            hsr_info.player.uid,
+        )
+
+        character_cards: typing.Dict[str, discord.Embed] = {
+            character.name: self.make_character_card(character)
+            for character in hsr_info.characters
+        }  # ^^ Every character available mapped to their card
+
+        logger.display_notice(
+            "[make_character_cards()] finished for user `%s`",
+            hsr_info.player.uid,
         )
+        return character_cards
 
-        character_cards: typing.Dict[str, discord.Embed] = {}
-        # ^^ The initial Empty dictionary to be returned
+    def make_lightcone_card(self, character: "CompactCharacter") -> discord.Embed:
+        """Creates the lightcone card for a single character, which is the character's lightcone
+        in a nice fancy embed.
 
-        for character in hsr_info.characters:  # For every character available
-            element_color = int("0x" + character.element.color[1:], 0)  # Get hex code
-            character_stats = self.calculate_total_character_stats(character)
-            # ^^  Calculate the characters total stats
+        Args:
+            character (CompactCharacter): The character object
+
+        Returns:
+            discord.Embed: The lightcone card, or a "No Lightcone" embed if the character has none equipped
+        """
 
-            character_card: discord.Embed = discord.Embed(
-                description="```diff\n",
-                color=element_color,
-            )  # Create the Embed
+        logger.display_notice(
+            "[make_lightcone_card()] called for character `%s`",
+            character.name,
+        )
 
-            for stat in character_stats:
-                character_card.description += (
-                    f"+ {stat:28}-> {int(character_stats[stat]['value']):8}\n"
-                    if not character_stats[stat]["is_percent"]
-                    else f"+ {stat:28}-> {round((character_stats[stat]['value'] * 100), 1):7}%\n"
-                )  # type: ignore
-                # ^^ String formatting, adding in the stats to the codeblock
+        if character.light_cone is None:
+            return discord.Embed(title="No Lightcone :(", color=0xFF0000)
 
-            character_card.description += "```"  # type: ignore
+        lightcone_name = f" {character.light_cone.name}"
+        lightcone_name += (
+            f" - Lvl {character.light_cone.level} / {character.light_cone.max_level}"
+        )
+        lightcone_color = int("0x" + character.element.color[1:], 0)
 
-            character_card.set_author(
-                name=f"{character.name} - Lvl {character.level}/{character.max_level} -  E{character.eidolon}",
-                icon_url=character.icon,
+        lines = [
+            (
+                f"+ {stat.name:15} -> {int(stat.displayed_value):8}\n"
+                if not stat.is_percent
+                else f"+ {stat.name:15} -> {round((stat.value * 100), 1):7}%\n"
+            )
+            for stat in (
+                *character.light_cone.attributes,
+                *character.light_cone.properties,
             )
+        ]  # ^^ Attributes first, then properties, formatted the same way
 
-            character_card.set_image(url=character.preview)
-            character_cards[character.name] = character_card
-            # ^^ Add the character card to the dictionary
+        lightcone_embed = discord.Embed(
+            title=lightcone_name,
+            color=lightcone_color,
+            description="```diff\n" + "".join(lines) + "```",
+        )
 
-        logger.display_notice(
-            f"[make_character_cards()] finished for user `{hsr_info.player.uid}`"
+        lightcone_embed.set_image(url=character.light_cone.portrait)
+
+        lightcone_embed.set_footer(
+            text=f"{character.name}'s Lightcone", icon_url=character.icon
         )
-        return character_cards
+
+        return lightcone_embed
 
     def make_lightcone_cards(
-        self, hsr_info: StarrailInfoParsed
+        self, hsr_info: "CompactProfile"
     ) -> typing.Dict[str, discord.Embed]:
         """Creates a dictionary of strings mapped to discord embed, which is just the character mapped to their lightcone
         but in a nice fancy embed.
 
         Args:
-            hsr_info (StarrailInfoParsed): Data parsed from mihomo api
+            hsr_info (CompactProfile): Data parsed from mihomo api
 
         Returns:
             typing.Dict[str, discord.Embed]: A mapping of character names to embeds
@@ -268,77 +578,66 @@ class HSR(commands.Cog):
         """
 
         logger.display_notice(
-            f"[make_lightcone_cards()] called for user `{hsr_info.player.uid}`"
+            "[make_lightcone_cards()] called for user `%s`",
+            hsr_info.player.uid,
         )
 
-        lightcone_cards: typing.Dict[str, discord.Embed] = {}
-
-        for character in hsr_info.characters:
-            if character.light_cone is None:
-                lightcone_cards[character.name] = discord.Embed(
-                    title="No Lightcone :(", color=0xFF0000
-                )
-                break  # If there is no lightcone, exit loop
-
-            lightcone_name = f" {character.light_cone.name}"
-            lightcone_name += f" - Lvl {character.light_cone.level} / {character.light_cone.max_level}"
-            lightcone_color = int("0x" + character.element.color[1:], 0)
+        lightcone_cards: typing.Dict[str, discord.Embed] = {
+            character.name: self.make_lightcone_card(character)
+            for character in hsr_info.characters
+        }
 
-            lightcone_embed = discord.Embed(
-                title=lightcone_name, color=lightcone_color, description="```diff\n"
-            )
+        logger.display_notice(
+            "[make_lightcone_cards()] finished for user `%s`",
+            hsr_info.player.uid,
+        )
+        return lightcone_cards
 
-            for attribute in character.light_cone.attributes:
-                if not attribute.is_percent:
-                    lightcone_embed.description += (
-                        f"+ {attribute.name:15} -> {int(attribute.displayed_value):8}\n"
-                    )  # type: ignore
-                else:
-                    lightcone_embed.description += f"+ {attribute.name:15} -> {round((attribute.value * 100), 1):7}%\n"  # type: ignore
+    def parse_data(self, hsr_info: "CompactProfile") -> ParsedProfile:
+        """Wraps the data retrieved from the API in a ParsedProfile.
+        Nothing is rendered here, every card is built the first time it is asked for.
 
-            for _property in character.light_cone.properties:
-                if not _property.is_percent:
-                    lightcone_embed.description += (
-                        f"+ {_property.name:15} -> {int(_property.displayed_value):8}\n"
-                    )  # type: ignore
-                else:
-                    lightcone_embed.description += f"+ {_property.name:15} -> {round((_property.value * 100), 1):7}%\n"  # type: ignore
+        Args:
+            hsr_info (CompactProfile): Data parsed from mihomo api
 
-            lightcone_embed.description += "```"  # type: ignore
+        Returns:
+            ParsedProfile: The lazily rendered profile
+        """
+        logger.display_notice("[parse_data()] called for user %s", hsr_info.player.uid)
+        return ParsedProfile(hsr_info, self)
 
-            lightcone_embed.set_image(url=character.light_cone.portrait)
+    def parse_cached(self, hsr_info: "CompactProfile") -> ParsedProfile:
+        """Returns the cached ParsedProfile of this data, so cards already rendered are reused.
+        The data is parsed and cached again if the cached profile was parsed from older data.
 
-            lightcone_embed.set_footer(
-                text=f"{character.name}'s Lightcone", icon_url=character.icon
-            )
+        Args:
+            hsr_info (CompactProfile): Data parsed from mihomo api
 
-            lightcone_cards[character.name] = lightcone_embed
+        Returns:
+            ParsedProfile: The lazily rendered profile
+        """
+        uid = hsr_info.player.uid
+        parsed_data = self.parsed_profiles.get(uid)
+        if parsed_data is None or parsed_data.hsr_info is not hsr_info:
+            parsed_data = self.parse_data(hsr_info)
+            self.parsed_profiles.put(uid, parsed_data)
 
-        logger.display_notice(
-            f"[make_lightcone_cards()] finished for user `{hsr_info.player.uid}`"
-        )
-        return lightcone_cards
+        return parsed_data
 
-    def parse_data(
-        self, hsr_info: StarrailInfoParsed
-    ) -> typing.Dict[str, discord.Embed | typing.Dict[str, discord.Embed]]:
-        logger.display_notice(f"[parse_data()] called for user {hsr_info.player.uid}")
+    async def get_parsed_profile(self, uid: int) -> ParsedProfile | None:
+        """Loads a profile for the dropdowns and buttons, which only know the UID
 
-        player_card = self.make_player_card(hsr_info)
-        character_list = self.make_character_list(hsr_info)
-        character_cards = self.make_character_cards(hsr_info)
-        lightcone_cards = self.make_lightcone_cards(hsr_info)
-        # ^^ Creating all the data
+        Args:
+            uid (int): A user ID from Honkai: Star Rail
 
-        resulting_dictionary = {
-            "player_card": player_card,
-            "characters": character_list,
-            "character_cards": character_cards,
-            "lightcone_cards": lightcone_cards,
-        }  # ^^ Formatting it nicely
+        Returns:
+            ParsedProfile | None: The lazily rendered profile, None if it could not be retrieved
+        """
+        data = await self.get_hsr_data(uid)
+        if data is None or isinstance(data, str):
+            return None
 
-        logger.display_notice(f"[parse_data()] finished for user {hsr_info.player.uid}")
-        return resulting_dictionary  # Returning the nice data
+        return self.parse_cached(data)
 
     @app_commands.command(
         name="hsr",
@@ -348,17 +647,45 @@ class HSR(commands.Cog):
         uid="The Honkai: Star Rail UID of the user you want the information on"
     )
     async def hsr(self, interaction: discord.Interaction, uid: int):
-        logger.display_notice(f"[User {interaction.user.id}] is calling /hsr")
+        logger.display_notice("[User %s] is calling /hsr", interaction.user.id)
         logger.display_notice(
-            f"[User {interaction.user.id}/hsr] command is being deferred"
+            "[User %s/hsr] command is being deferred",
+            interaction.user.id,
         )
 
         await defer_with_logs(interaction, logger)
 
         logger.display_notice(
-            f"[User {interaction.user.id}/hsr] attempting to get data"
+            "[User %s/hsr] attempting to get data",
+            interaction.user.id,
         )
-        data = await self.get_hsr_data(uid)
+
+        notice_id: int | None = None
+
+        async def notify_queued(position: int, wait: float) -> None:
+            nonlocal notice_id
+            try:
+                notice = await interaction.edit_original_response(
+                    content=f"⏳ The Honkai: Star Rail API is busy, you are #{position + 1} in line. "
+                    f"Your profile should arrive in about {math.ceil(wait)}s."
+                )  # ^^ Replaces the "thinking…" message, a followup would become the public reply
+                notice_id = notice.id
+            except discord.HTTPException as e:
+                logger.display_debug(str(e))
+
+        async def reply(**kwargs: typing.Any) -> None:
+            """Sends the result, overwriting the queue notice if one was shown"""
+            if notice_id is None:
+                await send_followup_message_with_logs(
+                    interaction, logger, "hsr", **kwargs
+                )
+            else:
+                await edit_followup_message_with_logs(
+                    interaction, logger, "hsr", notice_id, **kwargs
+                )
+
+        with command_metrics.timer("hsr", "fetch"):
+            data = await self.get_hsr_data(uid, on_queued=notify_queued)
 
         if isinstance(data, str):  # If an HttpRequestError occurs
             embed: discord.Embed = discord.Embed(
@@ -367,12 +694,12 @@ class HSR(commands.Cog):
                 description="Something is wrong with the API service right now. It must be down for an update or something of the sort",
             )
             logger.display_warning(
-                f"[User {interaction.user.id}/hsr] command failed due to an HttpRequestError"
+                "[User %s/hsr] command failed due to an HttpRequestError",
+                interaction.user.id,
             )
 
-            await send_followup_message_with_logs(
-                interaction, logger, "hsr", embed=embed
-            )
+            await reply(embed=embed)
+            command_metrics.record_error("hsr")
             return  # Quitting the function early
 
         if data is None:  # If the request failed due to invalid parameters
@@ -382,24 +709,101 @@ class HSR(commands.Cog):
                 description="Either you provided an invalid input number or the user could not be found in the database.",
             )
             logger.display_warning(
-                f"[User {interaction.user.id}/hsr] command failed due to an invalid input or a user not found"
-            )
-            await send_followup_message_with_logs(
-                interaction, logger, "hsr", embed=embed
+                "[User %s/hsr] command failed due to an invalid input or a user not found",
+                interaction.user.id,
             )
+            await reply(embed=embed)
+            command_metrics.record_error("hsr")
             return  # Quitting the function early
 
         logger.display_notice(
-            f"[User {interaction.user.id}/hsr] attempting to parse data"
+            "[User %s/hsr] attempting to parse data",
+            interaction.user.id,
+        )
+        with command_metrics.timer("hsr", "parse"):
+            parsed_data = self.parse_cached(data)  # Parsing the retrieved data
+            player_card = parsed_data.player_card
+
+        await reply(
+            embed=player_card, view=PlayerCardView(interaction.user.id, parsed_data)
+        )
+
+    @app_commands.command(
+        name="hsr-compare",
+        description="Compare the player cards of several Honkai: Star Rail players side by side",
+    )
+    @app_commands.describe(
+        uids="Up to 4 Honkai: Star Rail UIDs, separated by spaces or commas"
+    )
+    async def hsr_compare(self, interaction: discord.Interaction, uids: str):
+        logger.display_notice("[User %s] is calling /hsr-compare", interaction.user.id)
+
+        await defer_with_logs(interaction, logger)
+
+        failures: typing.List[str] = []
+        requested: typing.List[int] = []
+        for token in re.split(r"[\s,]+", uids.strip()):
+            if not token:
+                continue
+            if not token.isdecimal():  # isdigit() also accepts "²", which int() rejects
+                failures.append(f"`{token[:20]}`: not a valid UID")
+            elif int(token) not in requested:
+                requested.append(int(token))
+
+        if not requested and not failures:
+            failures.append("No UIDs were given")
+
+        if len(requested) > self.COMPARE_MAX_UIDS:
+            failures.append(
+                f"Only the first {self.COMPARE_MAX_UIDS} UIDs are compared, skipped "
+                + ", ".join(f"`{uid}`" for uid in requested[self.COMPARE_MAX_UIDS :])
+            )
+            requested = requested[: self.COMPARE_MAX_UIDS]
+
+        semaphore = asyncio.Semaphore(self.COMPARE_CONCURRENCY)
+
+        async def fetch(
+            uid: int,
+        ) -> "CompactProfile | typing.Literal['Net'] | None":
+            # Bounded fan-out, the rate limiter still applies to each request
+            async with semaphore:
+                return await self.get_hsr_data(uid)
+
+        logger.display_notice(
+            "[User %s/hsr-compare] attempting to get data for %s UIDs",
+            interaction.user.id,
+            len(requested),
         )
-        parsed_data = self.parse_data(data)  # Parsing the retrieved data
+        with command_metrics.timer("hsr-compare", "fetch"):
+            results = await asyncio.gather(
+                *(fetch(uid) for uid in requested), return_exceptions=True
+            )  # ^^ One UID failing in an unexpected way is reported with the others, not raised
+
+        profiles: typing.List["CompactProfile"] = []
+        for uid, data in zip(requested, results):
+            if isinstance(data, BaseException):
+                logger.display_warning(
+                    "[User %s/hsr-compare] fetching uid `%s` failed: %r",
+                    interaction.user.id,
+                    uid,
+                    data,
+                )
+                failures.append(f"`{uid}`: request failed ({type(data).__name__})")
+            elif isinstance(data, str):  # If an HttpRequestError occurs
+                failures.append(f"`{uid}`: the API service is not responding")
+            elif data is None:  # If the request failed due to invalid parameters
+                failures.append(f"`{uid}`: the user could not be found")
+            else:
+                profiles.append(data)
+
+        if not profiles:
+            command_metrics.record_error("hsr-compare")
+
+        with command_metrics.timer("hsr-compare", "parse"):
+            comparison_card = self.make_comparison_card(profiles, failures)
 
         await send_followup_message_with_logs(
-            interaction,
-            logger,
-            "hsr",
-            embed=parsed_data["player_card"],  # type: ignore
-            view=PlayerCardView(interaction.user.id, parsed_data),  # type: ignore
+            interaction, logger, "hsr-compare", embed=comparison_card
         )
 
 
@@ -0,0 +1,303 @@
+import math
+import time
+import typing
+import asyncio
+import discord
+from discord import app_commands
+from discord.ext import commands
+from models.Config import Config
+from models.client_options import owns_guild
+from models.command_metrics import command_metrics
+from models.profile_store import profile_store, settings_store
+from models.rate_limiter import Priority
+from models.leaderboard_index import METRICS, LeaderboardIndex
+
+from logger_help import (
+    QueuedLogger,
+    defer_with_logs,
+    send_followup_message_with_logs,
+    send_response_message_with_logs,
+)
+
+if typing.TYPE_CHECKING:
+    from models.compact_profile import CompactProfile
+    from cogs.hsr import HSR
+
+config = Config()
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
+
+
+class HSRLeaderboard(commands.Cog):
+    """
+    Honkai: Star Rail Leaderboard Cog
+    Members register their UID once, a background task keeps every registered profile
+    up to date, and leaderboards are read from memory without calling the API.
+    """
+
+    def __init__(self, client: commands.Bot) -> None:
+        self.client: commands.Bot = client
+        # ^^ Sets the client to be an attribute of the class
+        self.index: LeaderboardIndex = LeaderboardIndex()
+        # ^^ Every registration, loaded from the settings store in cog_load
+        self._refresh_task: asyncio.Task | None = None
+        self.refreshed: int = 0
+        self.refresh_errors: int = 0
+        # ^^ Counters exposed through stats()
+        command_metrics.register_gauges("hsr_leaderboard", self.stats)
+        self.STORE_NAMESPACE = "hsr-leaderboard"
+        self.LEADERBOARD_SIZE = 10
+        self.LEADERBOARD_HEX = 0xFFAA4A
+        self.ERROR_HEX = 0xFF5733
+        # ^^ Constant variables used multiple times in the class
+
+    async def cog_load(self) -> None:
+        await settings_store.move_namespace(profile_store, self.STORE_NAMESPACE)
+        # ^^ Older versions kept these in the profile cache
+        registrations = await settings_store.load_namespace(self.STORE_NAMESPACE)
+        loaded = 0
+        for key, entry in registrations.items():
+            guild_id, user_id = map(int, key.split(":"))
+            if owns_guild(guild_id):
+                self.index.register(guild_id, user_id, entry)
+                loaded += 1
+        # ^^ Every cluster shares the store, only the guild's own cluster refreshes and saves its entries,
+        # so the UIDs aren't fetched once per cluster and a stale copy never rewrites an unregistered entry
+
+        logger.display_notice(
+            "[HSRLeaderboard.cog_load()] loaded %s registrations", loaded
+        )
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def cog_unload(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+        await settings_store.flush()  # Keep the registrations refreshed since the last batch
+
+    @property
+    def hsr(self) -> "HSR | None":
+        """The HSR cog, which fetches profiles through its cache, store and rate limiter"""
+        return self.client.get_cog("HSR")  # type: ignore
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Returns the leaderboard counters
+
+        Returns:
+            typing.Dict[str, int]: {"registered", "refreshed", "refresh_errors"}
+        """
+        return {
+            "registered": sum(len(users) for users in self.index.entries.values()),
+            "refreshed": self.refreshed,
+            "refresh_errors": self.refresh_errors,
+        }
+
+    def player_values(self, hsr_info: "CompactProfile") -> typing.Dict[str, typing.Any]:
+        """Returns the ranked metrics of a profile, in the form stored on leaderboard entries
+
+        Args:
+            hsr_info (CompactProfile): The information retrieved from Mihomo's API
+
+        Returns:
+            typing.Dict[str, typing.Any]: {"name", "achievements", "level", "characters", "refreshed_at"}
+        """
+        return {
+            "name": hsr_info.player.name,
+            "achievements": hsr_info.player.achievements,
+            "level": hsr_info.player.level,
+            "characters": hsr_info.player.characters,
+            "refreshed_at": time.time(),
+        }
+
+    def save(self, guild_id: int, user_id: int) -> None:
+        """Queues a registration to be written to the settings store"""
+        settings_store.put(
+            self.STORE_NAMESPACE,
+            f"{guild_id}:{user_id}",
+            self.index.entries[guild_id][user_id],
+            math.inf,
+        )  # ^^ Registrations never expire, they are deleted by /hsr-unregister
+
+    async def refresh_batch(self, uids: typing.List[int]) -> None:
+        """Fetches a batch of registered profiles at background priority and updates their entries.
+        Commands waiting on the rate limiter go first, so a refresh never delays them.
+
+        Args:
+            uids (typing.List[int]): The UIDs to refresh
+        """
+        hsr = self.hsr
+        if hsr is None:
+            return
+
+        results = await asyncio.gather(
+            *(hsr.get_hsr_data(uid, priority=Priority.BACKGROUND) for uid in uids),
+            return_exceptions=True,
+        )
+        for uid, data in zip(uids, results):
+            if data is None or isinstance(data, (str, BaseException)):
+                self.refresh_errors += 1
+                logger.display_warning(
+                    "[refresh_batch()] could not refresh uid `%s`: %s", uid, data
+                )
+                continue
+
+            self.refreshed += 1
+            for guild_id, user_id in self.index.update_player(
+                uid, self.player_values(data)
+            ):
+                self.save(guild_id, user_id)
+
+    async def _refresh_loop(self) -> None:
+        """Refreshes every registration older than the refresh interval, in batches, then sleeps"""
+        interval = config.LEADERBOARD_REFRESH_INTERVAL
+        batch_size = max(1, config.LEADERBOARD_BATCH_SIZE)
+        await self.client.wait_until_ready()  # The HSR cog is loaded by then
+        while True:
+            stale_before = time.time() - interval
+            stale = [
+                uid
+                for uid in self.index.uids()  # Least recently refreshed first
+                if self.index.refreshed_at(uid) < stale_before
+            ]
+            if stale:
+                logger.display_notice(
+                    "[_refresh_loop()] refreshing %s registered UIDs", len(stale)
+                )
+
+            for start in range(0, len(stale), batch_size):
+                try:
+                    await self.refresh_batch(stale[start : start + batch_size])
+                except Exception as e:  # Keep the loop alive, the next pass retries
+                    logger.display_error("[_refresh_loop()] batch failed: %s", e)
+
+            await asyncio.sleep(interval)
+
+    @app_commands.command(
+        name="hsr-register",
+        description="Link your Honkai: Star Rail UID to rank on this server's leaderboards",
+    )
+    @app_commands.describe(uid="Your Honkai: Star Rail UID")
+    @app_commands.guild_only()
+    async def hsr_register(self, interaction: discord.Interaction, uid: int):
+        logger.display_notice("[User %s] is calling /hsr-register", interaction.user.id)
+
+        await defer_with_logs(interaction, logger, ephemeral=True)
+
+        hsr = self.hsr
+        with command_metrics.timer("hsr-register", "fetch"):
+            data = None if hsr is None else await hsr.get_hsr_data(uid)
+
+        if data is None or isinstance(data, str):
+            embed = discord.Embed(
+                color=self.ERROR_HEX,
+                title="Whoops!",
+                description=(
+                    "Something is wrong with the API service right now, try again later."
+                    if isinstance(data, str)
+                    else "Either you provided an invalid UID or the user could not be found in the database."
+                ),
+            )
+            await send_followup_message_with_logs(
+                interaction, logger, "hsr-register", embed=embed, ephemeral=True
+            )
+            command_metrics.record_error("hsr-register")
+            return  # Quitting the function early
+
+        guild_id: int = interaction.guild_id  # type: ignore
+        self.index.register(
+            guild_id,
+            interaction.user.id,
+            {"uid": data.player.uid, **self.player_values(data)},
+        )
+        self.save(guild_id, interaction.user.id)
+
+        embed = discord.Embed(
+            color=self.LEADERBOARD_HEX,
+            description=f"Registered **{discord.utils.escape_markdown(data.player.name)}** (`{data.player.uid}`). "
+            "You now show up on `/hsr-leaderboard` for this server.",
+        )
+        await send_followup_message_with_logs(
+            interaction, logger, "hsr-register", embed=embed, ephemeral=True
+        )
+
+    @app_commands.command(
+        name="hsr-unregister",
+        description="Remove your Honkai: Star Rail UID from this server's leaderboards",
+    )
+    @app_commands.guild_only()
+    async def hsr_unregister(self, interaction: discord.Interaction):
+        logger.display_notice(
+            "[User %s] is calling /hsr-unregister", interaction.user.id
+        )
+
+        guild_id: int = interaction.guild_id  # type: ignore
+        entry = self.index.unregister(guild_id, interaction.user.id)
+        if entry is None:
+            message = "You are not registered on this server."
+        else:
+            settings_store.delete(
+                self.STORE_NAMESPACE, f"{guild_id}:{interaction.user.id}"
+            )
+            message = f"Unregistered UID `{entry['uid']}` from this server."
+
+        await send_response_message_with_logs(
+            interaction, logger, "hsr-unregister", message, ephemeral=True
+        )
+
+    @app_commands.command(
+        name="hsr-leaderboard",
+        description="Rank this server's registered Honkai: Star Rail players",
+    )
+    @app_commands.describe(metric="What to rank the players by")
+    @app_commands.choices(
+        metric=[
+            app_commands.Choice(name=name, value=metric)
+            for metric, name in METRICS.items()
+        ]
+    )
+    @app_commands.guild_only()
+    async def hsr_leaderboard(
+        self, interaction: discord.Interaction, metric: app_commands.Choice[str]
+    ):
+        logger.display_notice(
+            "[User %s] is calling /hsr-leaderboard", interaction.user.id
+        )
+
+        guild_id: int = interaction.guild_id  # type: ignore
+        with command_metrics.timer("hsr-leaderboard", "parse"):
+            top = self.index.top(guild_id, metric.value, self.LEADERBOARD_SIZE)
+            rank = self.index.rank(guild_id, metric.value, interaction.user.id)
+            # ^^ Both read the sorted index in memory, nothing is fetched here
+
+            leaderboard = discord.Embed(
+                color=self.LEADERBOARD_HEX,
+                title=f"{METRICS[metric.value]} Leaderboard",
+                description="",
+            )
+            for place, (user_id, entry) in enumerate(top, start=1):
+                leaderboard.description += (
+                    f"`#{place:<2}` <@{user_id}> · "
+                    f"{discord.utils.escape_markdown(entry['name'])} -> **{entry[metric.value]}**\n"
+                )  # type: ignore
+
+            if not top:
+                leaderboard.description = (
+                    "Nobody on this server is ranked yet, use `/hsr-register` to join."
+                )
+
+            if rank is not None:
+                leaderboard.set_footer(
+                    text=f"You are #{rank} of {self.index.ranked_count(guild_id)}"
+                )
+            else:
+                leaderboard.set_footer(text="Use /hsr-register to join the leaderboard")
+
+        await send_response_message_with_logs(
+            interaction, logger, "hsr-leaderboard", embed=leaderboard
+        )
+
+
+async def setup(client: commands.Bot) -> None:
+    """Cog Setup Function, required for every cog that needs to be loaded.
+    Adds all the commands in the cog to the client and loads them"""
+    await client.add_cog(HSRLeaderboard(client))
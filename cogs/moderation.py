@@ -1,10 +1,21 @@
+import time
+import typing
 import discord
 from discord import app_commands
 from discord.ext import commands
-from pythondebuglogger.Logger import Logger
-from logger_help import defer_with_logs, send_followup_message_with_logs
+from models.Config import Config
+from models.audit_log import ACTIONS, audit_log
+from models.bulk_action import BulkAction, parse_targets
+from models.modlog_view import ModlogFilters, ModlogPageButton, build_modlog_page
+from logger_help import (
+    QueuedLogger,
+    defer_with_logs,
+    send_followup_message_with_logs,
+    edit_followup_message_with_logs,
+)
 
-logger: Logger = Logger(enable_timestamps=True)
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
+config = Config()
 
 
 class Moderation(commands.Cog):
@@ -23,6 +34,217 @@ class Moderation(commands.Cog):
             client (commands.Bot): The bot instance to which this cog is attached.
         """
         self.client = client
+        self.MAX_BULK_TARGETS = (
+            1000  # Most members one /mass-ban, /mass-kick or /role-all acts on
+        )
+        self.SUCCESS_HEX = 0x57F287
+        self.PARTIAL_HEX = 0xFFAA4A
+        self.ERROR_HEX = 0xFF5733
+
+    async def cog_load(self) -> None:
+        self.client.add_dynamic_items(ModlogPageButton)
+        # ^^ /modlog page buttons keep working after a restart
+
+    async def cog_unload(self) -> None:
+        self.client.remove_dynamic_items(ModlogPageButton)
+        await audit_log.flush()  # Keep the actions recorded since the last batch
+
+    async def get_bot_member(self, guild: discord.Guild) -> discord.Member:
+        """
+        Returns the bot's own member in a guild, requesting it from discord if it isn't cached.
+
+        The member cache is configured in config.json and may be turned off,
+        so moderation commands never assume a member is cached.
+
+        Args:
+            guild (discord.Guild): The guild to look the bot up in.
+
+        Returns:
+            discord.Member: The bot's member in the guild.
+        """
+        return guild.me or await guild.fetch_member(self.client.user.id)  # type: ignore
+
+    async def fetch_members_with_role(
+        self,
+        guild: discord.Guild,
+        role: discord.Role | None,
+        exclude_role: discord.Role | None = None,
+    ) -> typing.List[discord.Member]:
+        """
+        Requests the guild's member list from discord, since the member cache may be turned off.
+
+        Args:
+            guild (discord.Guild): The guild to list the members of.
+            role (discord.Role | None): Only keep members with this role, None keeps every member.
+            exclude_role (discord.Role | None, optional): Skip members who already have this role. Defaults to None.
+
+        Returns:
+            typing.List[discord.Member]: The members, at most MAX_BULK_TARGETS + 1 so oversized runs can be refused.
+        """
+        members: typing.List[discord.Member] = []
+        async for member in guild.fetch_members(limit=None):
+            if (
+                exclude_role is not None
+                and member.get_role(exclude_role.id) is not None
+            ):
+                continue  # Filtered before the cap, so it counts the real targets
+            if role is None or member.get_role(role.id) is not None:
+                members.append(member)
+                if len(members) > self.MAX_BULK_TARGETS:
+                    break
+
+        return members
+
+    async def resolve_targets(
+        self,
+        interaction: discord.Interaction,
+        command_name: str,
+        targets: str | None,
+        with_role: discord.Role | None,
+    ) -> typing.List[int] | None:
+        """
+        Collects the user IDs a bulk command acts on, from mentions and IDs, members with a role, or both.
+
+        Sends the reason to the user and returns None if nothing can be acted on.
+
+        Args:
+            interaction (discord.Interaction): The interaction that triggered the command.
+            command_name (str): The command name, used for logs.
+            targets (str | None): Mentions and IDs separated by spaces or commas.
+            with_role (discord.Role | None): Also act on every member with this role.
+
+        Returns:
+            typing.List[int] | None: The user IDs without duplicates, or None if the command should stop.
+        """
+        user_ids, invalid = parse_targets(targets or "")
+        problem = None
+        if invalid:
+            problem = f"These aren't members or user IDs: {', '.join(invalid[:10])}"
+        elif with_role is not None and not self.client.intents.members:
+            problem = "Targeting a role needs the `members` intent, add it to `intents` in config.json."
+        elif with_role is not None:
+            for member in await self.fetch_members_with_role(interaction.guild, with_role):  # type: ignore
+                if member.id not in user_ids:
+                    user_ids.append(member.id)
+
+        if problem is None and not user_ids:
+            problem = "Give me some members, user IDs or a role to act on."
+        elif problem is None and len(user_ids) > self.MAX_BULK_TARGETS:
+            problem = f"That's more than {self.MAX_BULK_TARGETS} members, split it into smaller runs."
+
+        if problem is not None:
+            await send_followup_message_with_logs(
+                interaction, logger, f"{command_name}-fail-targets", problem
+            )
+            return None
+
+        return user_ids
+
+    def make_bulk_summary(self, title: str, bulk: BulkAction) -> discord.Embed:
+        """
+        Builds the embed listing the outcome for every member of a bulk action.
+
+        Args:
+            title (str): The embed title. Ex: "Mass ban"
+            bulk (BulkAction): The finished action.
+
+        Returns:
+            discord.Embed: One line per member, cut short to fit discord's description limit.
+        """
+        lines = [f"✅ <@{user_id}>" for user_id in bulk.succeeded]
+        lines += [
+            f"❌ <@{user_id}>: {reason}" for user_id, reason in bulk.failed.items()
+        ]
+
+        description = ""
+        for shown, line in enumerate(lines):
+            more = f"\n... and {len(lines) - shown} more"
+            if len(description) + len(line) + len(more) + 1 > 4096:
+                description += more
+                break
+            description += line + "\n"
+
+        if not bulk.failed:
+            color = self.SUCCESS_HEX
+        elif bulk.succeeded:
+            color = self.PARTIAL_HEX
+        else:
+            color = self.ERROR_HEX
+
+        summary_embed = discord.Embed(
+            title=title, description=description.strip(), color=color
+        )
+        summary_embed.set_footer(
+            text=f"{len(bulk.succeeded)} succeeded, {len(bulk.failed)} failed in {bulk.elapsed:.1f}s"
+        )
+        return summary_embed
+
+    async def run_bulk_action(
+        self,
+        interaction: discord.Interaction,
+        command_name: str,
+        title: str,
+        bulk: BulkAction,
+    ) -> None:
+        """
+        Runs a bulk action, editing a single followup message with its progress and then its summary.
+
+        Args:
+            interaction (discord.Interaction): The interaction that triggered the command.
+            command_name (str): The command name, used for logs.
+            title (str): The progress and summary title. Ex: "Mass ban"
+            bulk (BulkAction): The action to run, with the protected targets already skipped.
+        """
+        progress_message = await send_followup_message_with_logs(
+            interaction,
+            logger,
+            command_name,
+            f"{title}: starting on {len(bulk.targets)} members...",
+            wait=True,
+        )
+
+        async def on_progress(bulk: BulkAction) -> None:
+            if not isinstance(progress_message, discord.Message):
+                return  # The progress message failed to send, there is nothing to edit
+
+            if bulk.finished:
+                await edit_followup_message_with_logs(
+                    interaction,
+                    logger,
+                    command_name,
+                    progress_message.id,
+                    embed=self.make_bulk_summary(title, bulk),
+                )
+            else:
+                await edit_followup_message_with_logs(
+                    interaction,
+                    logger,
+                    command_name,
+                    progress_message.id,
+                    f"{title}: {bulk.done}/{len(bulk.targets)} done, {len(bulk.failed)} failed...",
+                )
+
+        await bulk.run(on_progress, config.BULK_ACTION_PROGRESS_INTERVAL)
+        logger.display_notice(
+            "[User %s/%s] finished: %s succeeded, %s failed",
+            interaction.user.id,
+            command_name,
+            len(bulk.succeeded),
+            len(bulk.failed),
+        )
+
+    def skip_protected(
+        self, interaction: discord.Interaction, bulk: BulkAction
+    ) -> None:
+        """Skips the members a bulk action must never touch: the user running it, the bot and the owner"""
+        protected = {
+            interaction.user.id: "that's you",
+            self.client.user.id: "that's me",  # type: ignore
+            interaction.guild.owner_id: "the server owner",  # type: ignore
+        }
+        for user_id in bulk.targets:
+            if user_id in protected:
+                bulk.skip(user_id, protected[user_id])
 
     @app_commands.command(name="kick", description="Kicks a user from the server")
     @app_commands.describe(
@@ -50,14 +272,19 @@ class Moderation(commands.Cog):
         Raises:
             discord.Forbidden: If the bot does not have permission to kick the user.
         """
-        logger.display_notice(f"[User {interaction.user.id}] is running /kick")
+        logger.display_notice("[User %s] is running /kick", interaction.user.id)
         await defer_with_logs(interaction, logger)
 
         try:
             logger.display_notice(
-                f"[User {interaction.user.id}/kick] is attempting to kick [User {member.id}]"
+                "[User %s/kick] is attempting to kick [User %s]",
+                interaction.user.id,
+                member.id,
             )
             await member.kick(reason=reason)
+            audit_log.record(
+                member.guild.id, "kick", interaction.user.id, member.id, reason
+            )
             await send_followup_message_with_logs(
                 interaction,
                 logger,
@@ -65,7 +292,9 @@ class Moderation(commands.Cog):
                 f"{member.display_name} has been kicked from the server for: {reason}",
             )
             logger.display_notice(
-                f"[User {interaction.user.id}/kick] successfully kicked [User {member.id}]"
+                "[User %s/kick] successfully kicked [User %s]",
+                interaction.user.id,
+                member.id,
             )
         except discord.Forbidden:
             await send_followup_message_with_logs(
@@ -75,7 +304,8 @@ class Moderation(commands.Cog):
                 "I couldn't kick this user due to lack of permissions.",
             )
             logger.display_error(
-                f"[User {interaction.user.id}/kick] Failed to execute command"
+                "[User %s/kick] Failed to execute command",
+                interaction.user.id,
             )
 
     @app_commands.command(name="ban", description="Bans a user from the server")
@@ -104,14 +334,19 @@ class Moderation(commands.Cog):
         Raises:
             discord.Forbidden: If the bot does not have permission to ban the user.
         """
-        logger.display_notice(f"[User {interaction.user.id}] is running /ban")
+        logger.display_notice("[User %s] is running /ban", interaction.user.id)
         await defer_with_logs(interaction, logger)
 
         try:
             logger.display_notice(
-                f"[User {interaction.user.id}/ban] is attempting to ban [User {member.id}]"
+                "[User %s/ban] is attempting to ban [User %s]",
+                interaction.user.id,
+                member.id,
             )
             await member.ban(reason=reason)
+            audit_log.record(
+                member.guild.id, "ban", interaction.user.id, member.id, reason
+            )
             await send_followup_message_with_logs(
                 interaction,
                 logger,
@@ -119,7 +354,9 @@ class Moderation(commands.Cog):
                 f"{member.display_name} has been banned from the server for: {reason}",
             )
             logger.display_notice(
-                f"[User {interaction.user.id}/ban] successfully banned [User {member.id}]"
+                "[User %s/ban] successfully banned [User %s]",
+                interaction.user.id,
+                member.id,
             )
         except discord.Forbidden:
             await send_followup_message_with_logs(
@@ -129,7 +366,8 @@ class Moderation(commands.Cog):
                 "I couldn't ban this user due to lack of permissions.",
             )
             logger.display_error(
-                f"[User {interaction.user.id}/ban] Failed to execute command"
+                "[User %s/ban] Failed to execute command",
+                interaction.user.id,
             )
 
     @app_commands.command(name="role", description="Assigns a role to a user")
@@ -159,16 +397,20 @@ class Moderation(commands.Cog):
         Raises:
             discord.Forbidden: If the bot does not have permission to manage roles.
         """
-        logger.display_notice(f"[User {interaction.user.id}] is running /role")
+        logger.display_notice("[User %s] is running /role", interaction.user.id)
         await defer_with_logs(interaction, logger)
 
         try:
             logger.display_notice(
-                f"[User {interaction.user.id}/role] is attempting to assign [Role {role.id}] to [User {member.id}]"
+                "[User %s/role] is attempting to assign [Role %s] to [User %s]",
+                interaction.user.id,
+                role.id,
+                member.id,
             )
 
             # Check if the bot's highest role is above the role to be assigned
-            if role >= interaction.guild.me.top_role:  # type: ignore
+            bot_member = await self.get_bot_member(interaction.guild)  # type: ignore
+            if role >= bot_member.top_role:
                 await send_followup_message_with_logs(
                     interaction,
                     logger,
@@ -176,13 +418,22 @@ class Moderation(commands.Cog):
                     "I can't assign this role as it is higher than my highest role.",
                 )
                 logger.display_error(
-                    f"[User {interaction.user.id}/role] Failed: [Role {role.id}] is higher than bot's highest role"
+                    "[User %s/role] Failed: [Role %s] is higher than bot's highest role",
+                    interaction.user.id,
+                    role.id,
                 )
                 return
 
             await member.add_roles(
                 role, reason=f"Role assigned by {interaction.user.display_name}"
             )
+            audit_log.record(
+                member.guild.id,
+                "role",
+                interaction.user.id,
+                member.id,
+                details=role.name,
+            )
             await send_followup_message_with_logs(
                 interaction,
                 logger,
@@ -190,7 +441,10 @@ class Moderation(commands.Cog):
                 f"{member.display_name} has been assigned the role {role.name} successfully.",
             )
             logger.display_notice(
-                f"[User {interaction.user.id}/role] successfully assigned [Role {role.id}] to [User {member.id}]"
+                "[User %s/role] successfully assigned [Role %s] to [User %s]",
+                interaction.user.id,
+                role.id,
+                member.id,
             )
         except discord.Forbidden:
             await send_followup_message_with_logs(
@@ -200,9 +454,228 @@ class Moderation(commands.Cog):
                 "I couldn't assign the role due to lack of permissions.",
             )
             logger.display_error(
-                f"[User {interaction.user.id}/role] Failed to execute command due to permissions"
+                "[User %s/role] Failed to execute command due to permissions",
+                interaction.user.id,
             )
 
+    @app_commands.command(
+        name="mass-ban", description="Bans many users from the server at once"
+    )
+    @app_commands.describe(
+        targets="Members or user IDs, separated by spaces or commas",
+        with_role="Also ban every member with this role",
+        reason="The reason for banning the members",
+        delete_message_days="Days of their messages to delete, from 0 to 7",
+    )
+    @app_commands.checks.has_permissions(ban_members=True)
+    async def mass_ban(
+        self,
+        interaction: discord.Interaction,
+        targets: str | None = None,
+        with_role: discord.Role | None = None,
+        reason: str = "No reason provided.",
+        delete_message_days: app_commands.Range[int, 0, 7] = 0,
+    ):
+        """
+        Bans every listed user and every member with a role, streaming the progress into one message.
+
+        User IDs don't have to belong to members, so users can be banned before they join.
+
+        Args:
+            interaction (discord.Interaction): The interaction that triggered this command.
+            targets (str | None): Mentions and user IDs separated by spaces or commas.
+            with_role (discord.Role | None): Also ban every member with this role.
+            reason (str): The reason for the bans, defaults to "No reason provided."
+            delete_message_days (int): Days of messages to delete for every banned user.
+        """
+        logger.display_notice("[User %s] is running /mass-ban", interaction.user.id)
+        await defer_with_logs(interaction, logger)
+
+        user_ids = await self.resolve_targets(
+            interaction, "mass-ban", targets, with_role
+        )
+        if user_ids is None:
+            return
+
+        guild: discord.Guild = interaction.guild  # type: ignore
+
+        async def ban(user_id: int) -> None:
+            await guild.ban(
+                discord.Object(id=user_id),
+                reason=reason,
+                delete_message_seconds=delete_message_days * 86400,
+            )
+            audit_log.record(guild.id, "ban", interaction.user.id, user_id, reason)
+
+        bulk = BulkAction(user_ids, ban, config.BULK_ACTION_CONCURRENCY)
+        self.skip_protected(interaction, bulk)
+        await self.run_bulk_action(interaction, "mass-ban", "Mass ban", bulk)
+
+    @app_commands.command(
+        name="mass-kick", description="Kicks many members from the server at once"
+    )
+    @app_commands.describe(
+        targets="Members or user IDs, separated by spaces or commas",
+        with_role="Also kick every member with this role",
+        reason="The reason for kicking the members",
+    )
+    @app_commands.checks.has_permissions(kick_members=True)
+    async def mass_kick(
+        self,
+        interaction: discord.Interaction,
+        targets: str | None = None,
+        with_role: discord.Role | None = None,
+        reason: str = "No reason provided.",
+    ):
+        """
+        Kicks every listed member and every member with a role, streaming the progress into one message.
+
+        Args:
+            interaction (discord.Interaction): The interaction that triggered this command.
+            targets (str | None): Mentions and user IDs separated by spaces or commas.
+            with_role (discord.Role | None): Also kick every member with this role.
+            reason (str): The reason for the kicks, defaults to "No reason provided."
+        """
+        logger.display_notice("[User %s] is running /mass-kick", interaction.user.id)
+        await defer_with_logs(interaction, logger)
+
+        user_ids = await self.resolve_targets(
+            interaction, "mass-kick", targets, with_role
+        )
+        if user_ids is None:
+            return
+
+        guild: discord.Guild = interaction.guild  # type: ignore
+
+        async def kick(user_id: int) -> None:
+            await guild.kick(discord.Object(id=user_id), reason=reason)
+            audit_log.record(guild.id, "kick", interaction.user.id, user_id, reason)
+
+        bulk = BulkAction(user_ids, kick, config.BULK_ACTION_CONCURRENCY)
+        self.skip_protected(interaction, bulk)
+        await self.run_bulk_action(interaction, "mass-kick", "Mass kick", bulk)
+
+    @app_commands.command(
+        name="role-all",
+        description="Assigns a role to every member, or every member with a role",
+    )
+    @app_commands.describe(
+        role="The role you want to assign",
+        with_role="Only assign it to members with this role",
+    )
+    @app_commands.checks.has_permissions(manage_roles=True)
+    async def role_all(
+        self,
+        interaction: discord.Interaction,
+        role: discord.Role,
+        with_role: discord.Role | None = None,
+    ):
+        """
+        Assigns a role to every member of the server, or to every member with another role,
+        streaming the progress into one message. Members who already have the role are left out.
+
+        Args:
+            interaction (discord.Interaction): The interaction that triggered this command.
+            role (discord.Role): The role to assign.
+            with_role (discord.Role | None): Only assign it to members with this role.
+        """
+        logger.display_notice("[User %s] is running /role-all", interaction.user.id)
+        await defer_with_logs(interaction, logger)
+
+        problem = None
+        bot_member = await self.get_bot_member(interaction.guild)  # type: ignore
+        if not self.client.intents.members:
+            problem = "Listing the members needs the `members` intent, add it to `intents` in config.json."
+        elif role >= bot_member.top_role:
+            problem = "I can't assign this role as it is higher than my highest role."
+
+        if problem is not None:
+            await send_followup_message_with_logs(
+                interaction, logger, "role-all-fail", problem
+            )
+            logger.display_error(
+                "[User %s/role-all] Failed: %s", interaction.user.id, problem
+            )
+            return
+
+        members = {
+            member.id: member
+            for member in await self.fetch_members_with_role(
+                interaction.guild, with_role, exclude_role=role  # type: ignore
+            )
+        }
+        if not members or len(members) > self.MAX_BULK_TARGETS:
+            await send_followup_message_with_logs(
+                interaction,
+                logger,
+                "role-all-fail-targets",
+                (
+                    "Every member already has this role."
+                    if not members
+                    else f"That's more than {self.MAX_BULK_TARGETS} members, use `with_role` to split it into smaller runs."
+                ),
+            )
+            return
+
+        async def assign(user_id: int) -> None:
+            await members[user_id].add_roles(
+                role, reason=f"Role assigned by {interaction.user.display_name}"
+            )
+            audit_log.record(
+                role.guild.id, "role", interaction.user.id, user_id, details=role.name
+            )
+
+        bulk = BulkAction(list(members), assign, config.BULK_ACTION_CONCURRENCY)
+        await self.run_bulk_action(
+            interaction, "role-all", f"Assigning {role.name}", bulk
+        )
+
+    @app_commands.command(
+        name="modlog", description="Shows the moderation actions taken on this server"
+    )
+    @app_commands.describe(
+        target="Only actions taken on this user",
+        actor="Only actions taken by this moderator",
+        action="Only this kind of action",
+        days="Only actions from the last this many days",
+    )
+    @app_commands.choices(
+        action=[app_commands.Choice(name=action, value=action) for action in ACTIONS]
+    )
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(view_audit_log=True)
+    async def modlog(
+        self,
+        interaction: discord.Interaction,
+        target: discord.User | None = None,
+        actor: discord.User | None = None,
+        action: app_commands.Choice[str] | None = None,
+        days: app_commands.Range[int, 1, 3650] | None = None,
+    ):
+        """
+        Lists the server's recorded kicks, bans and role assignments, newest first, with buttons to page through them.
+
+        Args:
+            interaction (discord.Interaction): The interaction that triggered this command.
+            target (discord.User | None): Only actions taken on this user.
+            actor (discord.User | None): Only actions taken by this moderator, the bot itself for automatic actions.
+            action (app_commands.Choice[str] | None): Only this kind of action.
+            days (int | None): Only actions from the last this many days.
+        """
+        logger.display_notice("[User %s] is running /modlog", interaction.user.id)
+        await defer_with_logs(interaction, logger)
+
+        filters = ModlogFilters(
+            target.id if target else 0,
+            actor.id if actor else 0,
+            action.value if action else "",
+            int(time.time()) - days * 86400 if days else 0,
+        )
+        embed, view = await build_modlog_page(interaction.guild_id, filters)  # type: ignore
+        await send_followup_message_with_logs(
+            interaction, logger, "modlog", embed=embed, view=view
+        )
+
 
 async def setup(client: commands.Bot):
     """
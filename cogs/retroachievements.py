@@ -1,16 +1,45 @@
-import json
-import asyncio
+import typing
 import discord
-import subprocess
 from datetime import datetime
 from discord.ext import commands
 from discord import app_commands
-from pythondebuglogger.Logger import Logger
-from models.retro_game_info_view import RetroGameInfoView
-from logger_help import send_followup_message_with_logs, defer_with_logs
+from models.Config import Config
+from models.command_metrics import command_metrics
+from models.profile_cache import ProfileCache
+from models.profile_store import profile_store
+from models.shared_caches import retro_game_infos
+from models.embed_template import EmbedTemplate
+from models.retro_game_info_view import (
+    GameInfoButton,
+    RetroGameInfoView,
+    make_game_info_embed,
+)
+from models.retroachievements_client import RetroAchievementsClient
+from logger_help import QueuedLogger, send_followup_message_with_logs, defer_with_logs
 
+config = Config()
 blue = 0x73BCF8  # Hex color blue stored for embed usage
-logger: Logger = Logger(enable_timestamps=True)
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
+
+
+def load_api_key() -> str:
+    """
+    Loads the RetroAchievements web API key from the api info file
+    Args: None
+    Returns (str): The API key, or an empty string if it can't be read
+    """
+    try:
+        with open(
+            f"{config.API_INFO_LOCATION}/api_info.txt", "r", encoding="utf-8"
+        ) as f:
+            api_key: str = f.read()
+
+        return api_key.strip()
+    except Exception:
+        logger.display_error(
+            "Failed to read api_info.txt when calling load_api_key() in retroachievements.py"
+        )
+        return ""  # Every request will fail authorization, but the rest of the bot keeps running
 
 
 class Retroachievements(commands.Cog):
@@ -18,6 +47,110 @@ class Retroachievements(commands.Cog):
 
     def __init__(self, client: commands.Bot):
         self.client: commands.Bot = client
+        self.raapi = RetroAchievementsClient(
+            config.RA_USERNAME, load_api_key(), timeout=config.RETRO_REQUEST_TIMEOUT
+        )
+        # ^^ RetroAchievements API Client, credentials are read once when the cog loads
+        self.game_infos: ProfileCache[typing.Tuple[str, int], dict] = retro_game_infos
+        # ^^ Game info and progress keyed by (username, game ID), for the game information buttons
+        command_metrics.register_gauges("retro_view_cache", self.game_infos.stats)
+        self.game_cards: ProfileCache[
+            typing.Tuple[str, int], typing.Tuple[dict, EmbedTemplate]
+        ] = ProfileCache(max_size=config.VIEW_CACHE_SIZE, ttl=config.VIEW_CACHE_TTL)
+        # ^^ (game info, rendered card) keyed like game_infos, so every click on the same game shares one card.
+        # Not kept across /reload, the cards are rendered again with the reloaded code
+        command_metrics.register_gauges("retro_card_cache", self.game_cards.stats)
+
+    async def cog_load(self) -> None:
+        self.client.add_dynamic_items(GameInfoButton)
+        # ^^ Dispatches the buttons of every /retro-profile message, including ones sent before a restart
+
+    async def cog_unload(self) -> None:
+        self.client.remove_dynamic_items(GameInfoButton)
+        await self.raapi.close()  # Release the pooled connections
+        await profile_store.flush()  # Keep the payloads fetched since the last batch
+
+    async def stored_request(
+        self,
+        namespace: str,
+        key: str,
+        request: typing.Callable[[], typing.Awaitable[dict]],
+    ) -> dict:
+        """Returns a payload from the on-disk profile store, or requests and stores it if it isn't stored
+
+        Args:
+            namespace (str): The kind of payload. Ex: "retro-profile"
+            key (str): The payload's key. Ex: "vfk4083"
+            request (typing.Callable[[], typing.Awaitable[dict]]): Requests the payload from the API
+
+        Returns:
+            dict: The stored or freshly requested payload
+        """
+        payload = await profile_store.get(namespace, key)
+        if payload is None:
+            payload = await request()
+            profile_store.put(namespace, key, payload, config.PROFILE_STORE_TTL)
+
+        return payload
+
+    async def fetch_game_info(self, key: typing.Tuple[str, int]) -> dict:
+        """Requests a user's progress in a game, called by the game info cache on a miss
+
+        Args:
+            key (typing.Tuple[str, int]): (username, game ID)
+
+        Returns:
+            dict: The game info and user progress
+        """
+        username, game_id = key
+        return await self.stored_request(
+            "retro-game",
+            f"{username}:{game_id}",
+            lambda: self.raapi.get_game_info_and_user_progress(username, game_id),
+        )
+
+    async def get_game_info(self, username: str, game_id: int) -> dict | None:
+        """Loads a user's progress in a game for the game information button
+
+        Args:
+            username (str): The RetroAchievements username
+            game_id (int): The RetroAchievements game ID
+
+        Returns:
+            dict | None: The game info and user progress, None if it could not be retrieved
+        """
+        try:
+            return await self.game_infos.get_or_fetch(
+                (username, game_id), self.fetch_game_info
+            )
+        except Exception as e:
+            logger.display_error(
+                "[get_game_info()] failed to get game `%s` for `%s`", game_id, username
+            )
+            logger.display_debug(str(e))
+            return None
+
+    async def get_game_card(self, username: str, game_id: int) -> EmbedTemplate | None:
+        """Returns the game information card for the game information button, rendering it once per game info
+
+        Args:
+            username (str): The RetroAchievements username
+            game_id (int): The RetroAchievements game ID
+
+        Returns:
+            EmbedTemplate | None: The card, call render() for a copy to send. None if the game info could not be retrieved
+        """
+        game_info = await self.get_game_info(username, game_id)
+        if game_info is None:
+            return None
+
+        cached = self.game_cards.get((username, game_id))
+        if cached is None or cached[0] is not game_info:
+            # ^^ Rendered again when the game info was fetched again
+            cached = (game_info, EmbedTemplate(make_game_info_embed(game_info)))
+            self.game_cards.put((username, game_id), cached)
+
+        return cached[1]
 
     @app_commands.command(
         name="retro-profile",
@@ -27,7 +160,9 @@ class Retroachievements(commands.Cog):
         username="The retroachievements username of the person you want to lookup"
     )
     async def retro_profile(self, interaction: discord.Interaction, username: str):
-        logger.display_notice(f"[User {interaction.user.id}] is running /retro_profile")
+        logger.display_notice(
+            "[User %s] is running /retro_profile", interaction.user.id
+        )
 
         await defer_with_logs(interaction, logger)
 
@@ -38,30 +173,22 @@ class Retroachievements(commands.Cog):
         # Step 1: Get user profile
         try:
             logger.display_notice(
-                f"[User {interaction.user.id}/retro_profile] calling getUserProfile.mjs subprocess"
-            )
-            profile_stdout = await asyncio.create_subprocess_exec(
-                "node",
-                "cogs/retroachievements-js/getUserProfile.mjs",
-                username,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+                "[User %s/retro_profile] requesting user profile",
+                interaction.user.id,
             )
-            stdout, stderr = await profile_stdout.communicate()
-
-            if stderr:
-                logger.display_error(
-                    f"[User {interaction.user.id}/retro_profile] failed in getUserProfile.mjs"
+            with command_metrics.timer("retro-profile", "fetch"):
+                dict_profile_stdout = await self.stored_request(
+                    "retro-profile",
+                    username,
+                    lambda: self.raapi.get_user_profile(username),
                 )
-                logger.display_debug(str(stderr))
-
-            modified_profile_stdout = stdout.decode("utf-8").strip()
-            dict_profile_stdout = json.loads(modified_profile_stdout)
         except Exception as e:
             logger.display_error(
-                f"[User {interaction.user.id}/retro_profile] failed in getUserProfile.mjs"
+                "[User %s/retro_profile] failed to get user profile",
+                interaction.user.id,
             )
             logger.display_debug(str(e))
+            command_metrics.record_error("retro-profile")
             await send_followup_message_with_logs(
                 interaction,
                 logger,
@@ -76,21 +203,28 @@ class Retroachievements(commands.Cog):
             if not last_game_id:
                 raise ValueError("Missing lastGameId from profile data.")
 
-            game_info_and_progress_stdout = subprocess.check_output(
-                f"node cogs/retroachievements-js/getGameInfoAndUserProgress.mjs {username} {last_game_id}",
-                shell=True,
-            )
-            modified_game_info_and_progress_stdout = (
-                game_info_and_progress_stdout.decode("utf-8")
-            )
-            dict_game_info_and_progress_stdout = json.loads(
-                modified_game_info_and_progress_stdout
+            logger.display_notice(
+                "[User %s/retro_profile] requesting game info and progress",
+                interaction.user.id,
             )
+            with command_metrics.timer("retro-profile", "fetch"):
+                dict_game_info_and_progress_stdout = await self.stored_request(
+                    "retro-game",
+                    f"{username}:{last_game_id}",
+                    lambda: self.raapi.get_game_info_and_user_progress(
+                        username, last_game_id
+                    ),
+                )
+            self.game_infos.put(
+                (username, int(last_game_id)), dict_game_info_and_progress_stdout
+            )  # ^^ Same progress as the profile shows, for the game information button
         except Exception as e:
             logger.display_error(
-                f"[User {interaction.user.id}/retro_profile] failed in getGameInfoAndProgress.mjs"
+                "[User %s/retro_profile] failed to get game info and progress",
+                interaction.user.id,
             )
             logger.display_debug(str(e))
+            command_metrics.record_error("retro-profile")
             await send_followup_message_with_logs(
                 interaction,
                 logger,
@@ -102,47 +236,48 @@ class Retroachievements(commands.Cog):
         # Step 3: Construct embed
         try:
             logger.display_notice(
-                f"[User {interaction.user.id}/retro_profile] starting embed creation"
+                "[User %s/retro_profile] starting embed creation",
+                interaction.user.id,
             )
 
-            profile_picture_url = (
-                "https://media.retroachievements.org"
-                + dict_profile_stdout.get("userPic", "")
-            )
-            member_since_as_datetime = datetime.strptime(
-                dict_profile_stdout.get("memberSince", "2000-01-01 00:00:00"),
-                "%Y-%m-%d %H:%M:%S",
-            )
-            mastery_percentage = int(
-                dict_game_info_and_progress_stdout.get(
-                    "userCompletionHardcore", "0"
-                ).split(".")[0]
-            )
+            with command_metrics.timer("retro-profile", "parse"):
+                profile_picture_url = (
+                    "https://media.retroachievements.org"
+                    + dict_profile_stdout.get("userPic", "")
+                )
+                member_since_as_datetime = datetime.strptime(
+                    dict_profile_stdout.get("memberSince", "2000-01-01 00:00:00"),
+                    "%Y-%m-%d %H:%M:%S",
+                )
+                mastery_percentage = int(
+                    dict_game_info_and_progress_stdout.get(
+                        "userCompletionHardcore", "0"
+                    ).split(".")[0]
+                )
 
-            output_embed = discord.Embed(
-                color=blue,
-                title="Retro Profile for " + dict_profile_stdout.get("user", username),
-                description="",
-            )
-            output_embed.set_thumbnail(url=profile_picture_url)
-            output_embed.set_footer(
-                text=f"Member since {member_since_as_datetime.strftime('%B %d, %Y')}"
-            )
-            output_embed.description += (
-                f"Last Game Played: **{dict_game_info_and_progress_stdout.get('title', 'Unknown')} "
-                f"({mastery_percentage}%)**\n"
-            )  # type: ignore
-            output_embed.description += f"-# {dict_profile_stdout.get('richPresenceMsg', 'No rich presence available')}\n"
-            output_embed.description += (
-                f"**__{dict_profile_stdout.get('totalPoints', '0')}__ "
-                f"({dict_profile_stdout.get('totalTruePoints', '0')})** total points.\n"
-            )
+                output_embed = discord.Embed(
+                    color=blue,
+                    title="Retro Profile for "
+                    + dict_profile_stdout.get("user", username),
+                    description=(
+                        f"Last Game Played: **{dict_game_info_and_progress_stdout.get('title', 'Unknown')} "
+                        f"({mastery_percentage}%)**\n"
+                        f"-# {dict_profile_stdout.get('richPresenceMsg', 'No rich presence available')}\n"
+                        f"**__{dict_profile_stdout.get('totalPoints', '0')}__ "
+                        f"({dict_profile_stdout.get('totalTruePoints', '0')})** total points.\n"
+                    ),
+                )
+                output_embed.set_thumbnail(url=profile_picture_url)
+                output_embed.set_footer(
+                    text=f"Member since {member_since_as_datetime.strftime('%B %d, %Y')}"
+                )
 
-            logger.display_notice(
-                f"[User {interaction.user.id}/retro_profile] embed created"
-            )
+                logger.display_notice(
+                    "[User %s/retro_profile] embed created",
+                    interaction.user.id,
+                )
 
-            output_view = RetroGameInfoView(dict_game_info_and_progress_stdout)
+                output_view = RetroGameInfoView(int(last_game_id), username)
 
             await send_followup_message_with_logs(
                 interaction,
@@ -154,9 +289,11 @@ class Retroachievements(commands.Cog):
 
         except Exception as e:
             logger.display_error(
-                f"[User {interaction.user.id}/retro_profile] failed to build or send embed"
+                "[User %s/retro_profile] failed to build or send embed",
+                interaction.user.id,
             )
             logger.display_debug(str(e))
+            command_metrics.record_error("retro-profile")
             await send_followup_message_with_logs(
                 interaction,
                 logger,
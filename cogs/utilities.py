@@ -1,12 +1,20 @@
 import os
 import sys
-import base64
+import time
+import typing
+import asyncio
 import discord
 from discord import app_commands
 from models.Config import Config
+from models.command_metrics import command_metrics
+from models.profile_store import profile_store, settings_store
+from models.audit_log import audit_log
+from models.codec_stream import CODECS, CodecError, transcode
+from models.client_options import cluster_id
 from discord.ext import commands
-from pythondebuglogger.Logger import Logger
 from logger_help import (
+    QueuedLogger,
+    flush_logs,
     send_response_message_with_logs,
     defer_with_logs,
     send_followup_message_with_logs,
@@ -15,7 +23,7 @@ from logger_help import (
 config = Config()
 blue = 0x73BCF8  # Hex color blue stored for embed usage
 
-logger: Logger = Logger(enable_timestamps=True)
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
 
 
 class Utilities(commands.Cog):
@@ -28,13 +36,42 @@ class Utilities(commands.Cog):
         self.client: commands.Bot = client
         # ^^ Sets the client to be an attribute of the class
 
+    async def cog_load(self) -> None:
+        self.default_on_error = self.client.tree.on_error
+        self.client.tree.on_error = self.on_app_command_error
+        # ^^ Count commands that raise instead of handling their own errors
+
+    async def cog_unload(self) -> None:
+        self.client.tree.on_error = self.default_on_error
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(
+        self, interaction: discord.Interaction, command: app_commands.Command
+    ) -> None:
+        """Records the end-to-end time of every finished command, measured from when discord created the interaction"""
+        command_metrics.record(
+            command.qualified_name,
+            "total",
+            (discord.utils.utcnow() - interaction.created_at).total_seconds(),
+        )
+
+    async def on_app_command_error(
+        self, interaction: discord.Interaction, error: app_commands.AppCommandError
+    ) -> None:
+        """Counts the error for the command, then falls back to the default error handling"""
+        if interaction.command is not None:
+            command_metrics.record_error(interaction.command.qualified_name)
+
+        await self.default_on_error(interaction, error)
+
     @app_commands.command(name="restart", description="restarts the bot")
     async def restart(self, interaction: discord.Interaction):
-        logger.display_notice(f"[User {interaction.user.id}] is calling /restart")
+        logger.display_notice("[User %s] is calling /restart", interaction.user.id)
 
         if interaction.user.id != config.OWNER_ID:
             logger.display_debug(
-                f"[User {interaction.user.id}] was refused bot restart access."
+                "[User %s] was refused bot restart access.",
+                interaction.user.id,
             )
 
             await send_response_message_with_logs(
@@ -45,67 +82,333 @@ class Utilities(commands.Cog):
         await send_response_message_with_logs(
             interaction, logger, command_name="restart", message="Restarting..."
         )
+        await profile_store.flush()  # Fetched profiles are loaded from disk after the restart
+        await settings_store.flush()  # execv would drop the settings changes still queued
+        await audit_log.flush()  # execv would drop the moderation actions still queued
+        flush_logs()  # execv skips atexit, write out queued log records first
         os.execv(sys.executable, ["python"] + sys.argv)
 
-    @app_commands.command(name="base64", description="Encode or decode base64 text")
+    def cog_names(self) -> typing.List[str]:
+        """Returns the names of the loaded cogs, as their file names without .py. Ex: ["entertainment", "hsr"]"""
+        return sorted(
+            extension.removeprefix("cogs.") for extension in self.client.extensions
+        )
+
+    async def reload_cog(self, name: str) -> typing.Tuple[float, str | None]:
+        """Reloads a cog's module and instance, keeping the gateway connection and shared caches.
+        If the new module fails to import or set up, discord.py sets the old module up again.
+
+        Args:
+            name (str): The cog's file name without .py. Ex: "hsr"
+
+        Returns:
+            typing.Tuple[float, str | None]: How long the reload took in seconds, and the error if it failed
+        """
+        start = time.perf_counter()
+        try:
+            await self.client.reload_extension(f"cogs.{name}")
+        except commands.ExtensionError as e:
+            error = e.__cause__ or e  # ^^ ExtensionFailed wraps the actual exception
+            logger.display_error(
+                "Cog %s failed to reload, kept the old version: %s", name, error
+            )
+            return time.perf_counter() - start, f"{type(error).__name__}: {error}"
+
+        logger.display_notice("Cog %s successfully reloaded", name)
+        return time.perf_counter() - start, None
+
+    @app_commands.command(
+        name="reload", description="Reloads cogs without restarting the bot, owner only"
+    )
+    @app_commands.describe(cog="The cog to reload, every cog if left empty")
+    async def reload(
+        self, interaction: discord.Interaction, cog: str | None = None
+    ) -> None:
+        logger.display_notice("[User %s] is calling /reload", interaction.user.id)
+
+        await defer_with_logs(interaction, logger, ephemeral=True)
+
+        if interaction.user.id != config.OWNER_ID:
+            logger.display_debug(
+                "[User %s] was refused access to /reload", interaction.user.id
+            )
+            await send_followup_message_with_logs(
+                interaction, logger, command_name="reload", message="No."
+            )
+            return
+
+        names = self.cog_names()
+        if cog is not None:
+            cog = cog.removeprefix("cogs.").removesuffix(".py")
+            if cog not in names:
+                await send_followup_message_with_logs(
+                    interaction,
+                    logger,
+                    command_name="reload",
+                    message=f"`{cog}` is not a loaded cog, pick from {', '.join(names)}",
+                )
+                return
+            names = [cog]
+
+        embed = discord.Embed(color=blue, title="🔁 Reload", description="```diff\n")
+        total = 0.0
+        # One at a time, so a failed cog doesn't leave the others half reloaded
+        for name in names:
+            seconds, error = await self.reload_cog(name)
+            total += seconds
+            embed.description += (
+                f"+ {name:16} {seconds * 1000:7.1f}ms\n"
+                if error is None
+                else f"- {name:16} {seconds * 1000:7.1f}ms, rolled back\n- {error[:200]}\n"
+            )  # type: ignore
+
+        embed.description += "```"  # type: ignore
+        embed.set_footer(
+            text=f"{len(names)} cogs in {total * 1000:.1f}ms. Run ~sync if command options changed."
+        )
+
+        await send_followup_message_with_logs(
+            interaction, logger, command_name="reload", embed=embed
+        )
+
+    @reload.autocomplete("cog")
+    async def reload_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> typing.List[app_commands.Choice[str]]:
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in self.cog_names()
+            if current.lower() in name
+        ][:25]
+
+    @app_commands.command(
+        name="stats", description="Shows command latency statistics, owner only"
+    )
+    @app_commands.describe(
+        export="Also write the statistics to a Prometheus metrics file and attach it"
+    )
+    async def stats(self, interaction: discord.Interaction, export: bool = False):
+        logger.display_notice("[User %s] is calling /stats", interaction.user.id)
+
+        await defer_with_logs(interaction, logger, ephemeral=True)
+
+        if interaction.user.id != config.OWNER_ID:
+            logger.display_debug(
+                "[User %s] was refused access to /stats", interaction.user.id
+            )
+            await send_followup_message_with_logs(
+                interaction,
+                logger,
+                command_name="stats",
+                message="This command is not for you.",
+            )
+            return
+
+        embed = discord.Embed(color=blue, title="📈 Command Statistics")
+        for name, source in list(command_metrics.gauges.items())[:25]:
+            value = "\n".join(f"{key}: {value}" for key, value in source().items())
+            if len(embed) + len(name) + len(value) > 4000:
+                break  # Leave room for the latency table below
+            embed.add_field(name=name, value=value[:1024])
+        # ^^ Discord allows 25 fields of up to 1024 characters
+
+        lines = []
+        for command, data in command_metrics.snapshot().items():
+            lines.append(f"{command} (errors: {data['errors']})")
+            for phase, latency in data["phases"].items():
+                lines.append(
+                    f"  {phase:20} {latency['count']:6} "
+                    + " ".join(
+                        f"{latency[percentile] * 1000:6.0f}ms"
+                        for percentile in ("p50", "p95", "p99")
+                    )
+                )
+        # ^^ One row per phase of each command, latencies in milliseconds
+
+        limit = min(4096, 6000 - len(embed))
+        # ^^ The description is capped at 4096 characters, and the whole embed at 6000
+        description = (
+            f"```\n{'command/phase':22} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8}\n"
+        )
+        for shown, line in enumerate(lines):
+            more = f"```\n... and {len(lines) - shown} more rows, use `export` for all of them"
+            if len(description) + len(line) + 1 + len(more) > limit:
+                description += more
+                break
+            description += line + "\n"
+        else:
+            description += "```"
+
+        embed.description = description
+
+        if not export:
+            await send_followup_message_with_logs(
+                interaction, logger, command_name="stats", embed=embed, ephemeral=True
+            )
+            return
+
+        prometheus_text = command_metrics.to_prometheus()
+        metrics_path = self.metrics_export_location()
+        await asyncio.to_thread(
+            self.write_metrics_file, metrics_path, prometheus_text
+        )  # ^^ Keep the disk write off the event loop
+
+        try:
+            await interaction.followup.send(
+                embed=embed,
+                file=discord.File(metrics_path),
+                ephemeral=True,
+            )
+        except discord.HTTPException as e:
+            logger.display_error(
+                "[User %s/stats] failed to send the metrics file", interaction.user.id
+            )
+            logger.display_debug(str(e))
+
+    @staticmethod
+    def metrics_export_location() -> str:
+        """Returns where /stats writes the metrics file.
+        Every cluster started by launcher.py gets its own file. Ex: metrics.cluster-1.prom
+
+        Returns:
+            str: The metrics file path
+        """
+        cluster = cluster_id()
+        if cluster is None:
+            return config.METRICS_EXPORT_LOCATION
+
+        root, extension = os.path.splitext(config.METRICS_EXPORT_LOCATION)
+        return f"{root}.cluster-{cluster}{extension}"
+
+    @staticmethod
+    def write_metrics_file(path: str, prometheus_text: str) -> None:
+        """Writes metrics in the Prometheus text format, replacing the file atomically
+        so a scraper never reads a half written file
+
+        Args:
+            path (str): Where to write the file
+            prometheus_text (str): The rendered metrics
+        """
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write(prometheus_text)
+
+        os.replace(f"{path}.tmp", path)
+
+    @app_commands.command(
+        name="base64", description="Encode or decode text or a file with base64"
+    )
     @app_commands.describe(
-        type="Encode or Decode", text="The text you want to encode or decode"
+        type="Encode or Decode",
+        text="The text you want to encode or decode",
+        file="A file to encode or decode instead, up to the upload limit",
+        codec="The encoding to use, Base64 by default",
     )
     @app_commands.choices(
         type=[
             app_commands.Choice(name="Encode", value="Encode"),
             app_commands.Choice(name="Decode", value="Decode"),
-        ]
+        ],
+        codec=[
+            app_commands.Choice(name=name, value=codec)
+            for codec, (name, _) in CODECS.items()
+        ],
     )
     async def base64(
-        self, interaction: discord.Interaction, type: str, text: str
+        self,
+        interaction: discord.Interaction,
+        type: str,
+        text: str | None = None,
+        file: discord.Attachment | None = None,
+        codec: str = "base64",
     ) -> None:
-        logger.display_notice(f"[User {interaction.user.id}] is calling /base64")
-
-        await defer_with_logs(interaction, logger, ephemeral=True)
-        embed = discord.Embed(color=blue, title="")
-
-        if type == "Encode":
-            embed = discord.Embed(color=blue, title="✅ Base64 Encoded Result")
-            # ^^ Create the embed with it's constructor
-            text_as_bytes: bytes = base64.b64encode(bytes(text, "utf-8"))
-            # ^^ Convert text to base64 bytes
-            embed.description = f"```\n{text_as_bytes.decode()}\n```"
-            # ^^ Set embed description to text format of base64 bytes
-            embed.set_footer(
-                text="Requested by @" + interaction.user.name,
-                icon_url=interaction.user.avatar.url if interaction.user.avatar else "",
-            )
-            # ^^ Set the embed footer to the one who used to command
+        """
+        Encodes or decodes text or an attachment. Short text results are shown in the embed,
+        anything else is sent back as an attachment.
 
-            await send_followup_message_with_logs(
-                interaction, logger, command_name="/base64", embed=embed
-            )
-            # ^^ Send the result with logs
-            return
+        Args:
+            interaction (discord.Interaction): Provided by discord, the interaction which called the command.
+            type (str): "Encode" or "Decode"
+            text (str | None, optional): The text to convert. Defaults to None.
+            file (discord.Attachment | None, optional): The file to convert, used when no text is given. Defaults to None.
+            codec (str, optional): One of CODECS. Defaults to "base64".
 
-        # At this point type.name should be "Decode"
-        embed = discord.Embed(color=blue, title="✅ Base64 Decoded Result")
-        # ^^ Create the embed with it's constructor
-        try:  # Attempt to convert the base64 input to plain text
-            embed.description = f"```\n{str(base64.b64decode(text))[2:-1]}\n```"
-            """ ^^ Adds the converted plain text to the embed description
-            and converts it in one line.
-            If this throws base64.binascii.Error
-            An invalid input was given
-            """
-        except base64.binascii.Error:  # type: ignore # In the case that an invalid input was given
-            embed.description = "```diff\n- Text was not in base64 format\n```"
-            # ^^ Change the embed description to reflect that
+        Returns (None): Sends a discord embed as a result and returns nothing
+        """
+        logger.display_notice("[User %s] is calling /base64", interaction.user.id)
 
+        await defer_with_logs(interaction, logger, ephemeral=True)
+        name, extension = CODECS[codec]
+        decode = type == "Decode"
+        upload_limit = (
+            interaction.guild.filesize_limit
+            if interaction.guild
+            else discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES
+        )  # ^^ The result is sent back to the same channel, so it has to fit the same limit
+
+        embed = discord.Embed(
+            color=blue,
+            title=f"✅ {name} {'Decoded' if decode else 'Encoded'} Result",
+        )
         embed.set_footer(
             text="Requested by @" + interaction.user.name,
             icon_url=interaction.user.avatar.url if interaction.user.avatar else "",
         )
         # ^^ Set the embed footer to reflect the user who called the interaction
 
+        problem = None
+        if (text is None) == (file is None):
+            problem = "Give either text or a file"
+        elif file is not None and file.size > upload_limit:
+            problem = f"Files can be up to {upload_limit // 2**20} MB here"
+
+        result = None
+        if problem is None:
+            try:
+                data = await file.read() if file else text.encode("utf-8")  # type: ignore
+                result = await asyncio.to_thread(
+                    transcode, data, codec, decode, upload_limit
+                )  # ^^ Chunked, and off the event loop, so large files don't stall other commands
+            except discord.HTTPException:
+                problem = "The file could not be downloaded"
+            except CodecError as e:
+                problem = str(e).rstrip(".")
+
+        if result is None:
+            embed.title = ""
+            embed.description = f"```diff\n- {problem}\n```"
+            await send_followup_message_with_logs(
+                interaction, logger, command_name="base64", embed=embed
+            )
+            return
+
+        shown = None
+        if file is None and result.getbuffer().nbytes <= 4000:
+            try:
+                shown = result.getvalue().decode("utf-8")
+            except UnicodeDecodeError:  # Binary, sent as a file below
+                pass
+
+        if shown is not None:
+            embed.description = f"```\n{shown}\n```"
+            await send_followup_message_with_logs(
+                interaction, logger, command_name="base64", embed=embed
+            )
+            return
+
+        if not decode:
+            filename = f"{file.filename if file else 'text.txt'}.{extension}"
+        elif file and file.filename.endswith(f".{extension}"):
+            filename = file.filename.removesuffix(f".{extension}")
+        else:
+            filename = "decoded.bin"
+
+        embed.description = f"`{filename}`, {result.getbuffer().nbytes:,} bytes"
         await send_followup_message_with_logs(
-            interaction, logger, command_name="base64-decode", embed=embed
+            interaction,
+            logger,
+            command_name="base64",
+            embed=embed,
+            file=discord.File(result, filename=filename),
         )
 
     @app_commands.command(name="avatar", description="Retrieves an avatar")
@@ -123,7 +426,7 @@ class Utilities(commands.Cog):
         Returns (None): Sends a discord embed as a result and returns nothing
         """
 
-        logger.display_notice(f"[User {interaction.user.id}] is calling /avatar")
+        logger.display_notice("[User %s] is calling /avatar", interaction.user.id)
 
         await defer_with_logs(interaction, logger)
 
@@ -171,7 +474,7 @@ class Utilities(commands.Cog):
             Quite literally nothing
         """
 
-        logger.display_notice(f"[User {interaction.user.id}] is calling /invite")
+        logger.display_notice("[User %s] is calling /invite", interaction.user.id)
 
         await defer_with_logs(interaction, logger, ephemeral=True)
         invite_url = "https://discord.com/api/oauth2/authorize?client_id=1025477778428133379&permissions=8&scope=applications.commands%20bot"
@@ -208,7 +511,7 @@ class Utilities(commands.Cog):
             interaction (discord.Interaction): Provided by discord.
         """
 
-        logger.display_notice(f"[User {interaction.user.id}] is calling /sync")
+        logger.display_notice("[User %s] is calling /sync", interaction.user.id)
 
         await defer_with_logs(interaction, logger, ephemeral=True)
         # ^^ Bypass 3 second discord check
@@ -216,7 +519,8 @@ class Utilities(commands.Cog):
             interaction.user.id != config.OWNER_ID
         ):  # If the user of the command isn't me
             logger.display_debug(
-                f"[User {interaction.user.id}] was refused access to /sync"
+                "[User %s] was refused access to /sync",
+                interaction.user.id,
             )
 
             await send_followup_message_with_logs(
@@ -244,7 +548,7 @@ class Utilities(commands.Cog):
             interaction (discord.Interaction): Provided by discord.
         """
 
-        logger.display_notice(f"[User {interaction.user.id}] is calling /about")
+        logger.display_notice("[User %s] is calling /about", interaction.user.id)
 
         await defer_with_logs(interaction, logger, ephemeral=True)
         # ^^ Bypass 3 second check from discord
@@ -0,0 +1,230 @@
+# Runs the bot as several processes, called clusters, each connecting its own range of shards,
+# so gateway events are handled on more than one core.
+#
+# Usage:
+#   python launcher.py                         # cluster and shard counts from config.json
+#   python launcher.py --clusters 4 --shards 16
+
+import os
+import sys
+import time
+import typing
+import signal
+import asyncio
+import aiohttp
+import argparse
+import subprocess
+import discord
+from models.Config import Config
+from logger_help import QueuedLogger
+from models.client_options import (
+    CLUSTER_ID_VARIABLE,
+    SHARD_COUNT_VARIABLE,
+    SHARD_IDS_VARIABLE,
+)
+
+config = Config()
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
+
+IDENTIFY_INTERVAL: float = 5.0
+# ^^ Discord allows max_concurrency shards to identify every 5 seconds, across every process
+RESTART_DELAY: float = 5.0
+# ^^ Seconds before a cluster that exited is started again
+
+
+def load_token() -> str:
+    """
+    Loads the bot's authorization token from the token file
+    Args: None
+    Returns (str): The bot's authorization token
+    """
+    try:
+        with open(f"{config.TOKEN_LOCATION}/token.txt", "r", encoding="utf-8") as f:
+            token: str = f.read()
+
+        return token.strip()
+    except Exception:
+        logger.display_error(
+            "Failed to read token.txt when calling load_token() in launcher.py"
+        )
+        exit(1)  # Exit with code 1 if token can't be read
+
+
+async def fetch_gateway_info(token: str) -> typing.Dict[str, typing.Any]:
+    """Asks discord how many shards the bot should run and how many can identify at once
+
+    Args:
+        token (str): The bot's authorization token
+
+    Returns:
+        typing.Dict[str, typing.Any]: The /gateway/bot response. Ex: {"shards": 2, "session_start_limit": {"max_concurrency": 1, ...}, ...}
+    """
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            f"{discord.http.Route.BASE}/gateway/bot",
+            headers={"Authorization": f"Bot {token}"},
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
+
+def shard_ranges(shard_count: int, clusters: int) -> typing.List[typing.List[int]]:
+    """Splits the shard IDs into contiguous ranges of nearly equal size, one per cluster
+
+    Args:
+        shard_count (int): The total amount of shards
+        clusters (int): The amount of clusters, capped at the amount of shards
+
+    Returns:
+        typing.List[typing.List[int]]: The shard IDs of each cluster. Ex: shard_ranges(5, 2) -> [[0, 1, 2], [3, 4]]
+    """
+    clusters = max(1, min(clusters, shard_count))
+    size, remainder = divmod(shard_count, clusters)
+
+    ranges = []
+    start = 0
+    for cluster in range(clusters):
+        end = start + size + (1 if cluster < remainder else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+
+    return ranges
+
+
+class Cluster:
+    """A main.py process running a range of shards"""
+
+    def __init__(
+        self, cluster_id: int, shard_ids: typing.List[int], shard_count: int
+    ) -> None:
+        """
+        Args:
+            cluster_id (int): The cluster's number, starting at 0
+            shard_ids (typing.List[int]): The shards this cluster connects
+            shard_count (int): The total amount of shards across every cluster
+        """
+        self.cluster_id: int = cluster_id
+        self.shard_ids: typing.List[int] = shard_ids
+        self.shard_count: int = shard_count
+        self.process: subprocess.Popen | None = None
+        self.restart_at: float | None = None
+        # ^^ When a cluster that exited should be started again
+
+    def start(self) -> None:
+        environment = {
+            **os.environ,
+            CLUSTER_ID_VARIABLE: str(self.cluster_id),
+            SHARD_IDS_VARIABLE: ",".join(map(str, self.shard_ids)),
+            SHARD_COUNT_VARIABLE: str(self.shard_count),
+        }  # ^^ Kept across /restart, os.execv passes the environment on
+        self.process = subprocess.Popen([sys.executable, "main.py"], env=environment)
+        self.restart_at = None
+        logger.display_notice(
+            "Cluster %s started with shards %s-%s (pid %s)",
+            self.cluster_id,
+            self.shard_ids[0],
+            self.shard_ids[-1],
+            self.process.pid,
+        )
+
+    def exit_code(self) -> int | None:
+        """Returns the exit code if the process has exited, None while it is running"""
+        return None if self.process is None else self.process.poll()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Asks the process to exit, and kills it if it hasn't after the timeout"""
+        if self.process is None or self.process.poll() is not None:
+            return
+
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def supervise(clusters: typing.List[Cluster]) -> None:
+    """Restarts clusters that exit until the launcher is asked to stop
+
+    Args:
+        clusters (typing.List[Cluster]): The started clusters
+    """
+    stopping = False
+
+    def request_stop(signal_number: int, frame: typing.Any) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    while not stopping:
+        for cluster in clusters:
+            exit_code = cluster.exit_code()
+            if exit_code is None:
+                continue
+
+            if cluster.restart_at is None:
+                logger.display_warning(
+                    "Cluster %s exited with code %s, restarting in %ss",
+                    cluster.cluster_id,
+                    exit_code,
+                    RESTART_DELAY,
+                )
+                cluster.restart_at = time.monotonic() + RESTART_DELAY
+            elif time.monotonic() >= cluster.restart_at:
+                cluster.start()
+
+        time.sleep(1)
+
+    logger.display_notice("Stopping %s clusters", len(clusters))
+    for cluster in clusters:
+        cluster.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Runs the bot as several processes, each with its own range of shards"
+    )
+    parser.add_argument(
+        "--clusters", type=int, default=config.CLUSTERS, help="Amount of processes"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=config.SHARD_COUNT,
+        help="Total amount of shards, defaults to discord's recommendation",
+    )
+    args = parser.parse_args()
+
+    max_concurrency = 1
+    shard_count: int | None = args.shards
+    try:
+        gateway_info = asyncio.run(fetch_gateway_info(load_token()))
+        max_concurrency = gateway_info["session_start_limit"]["max_concurrency"]
+        shard_count = shard_count or gateway_info["shards"]
+    except Exception as e:
+        logger.display_error("Failed to get the recommended shard count: %s", e)
+        if shard_count is None:
+            exit(1)  # Nothing to split across the clusters
+
+    assert shard_count is not None
+    clusters = [
+        Cluster(cluster_id, shard_ids, shard_count)
+        for cluster_id, shard_ids in enumerate(shard_ranges(shard_count, args.clusters))
+    ]
+    logger.display_notice(
+        "Launching %s shards across %s clusters", shard_count, len(clusters)
+    )
+
+    for cluster in clusters:
+        cluster.start()
+        if cluster is not clusters[-1]:
+            time.sleep(IDENTIFY_INTERVAL * len(cluster.shard_ids) / max_concurrency)
+            # ^^ Let this cluster's shards identify before the next cluster starts
+
+    supervise(clusters)
+
+
+if __name__ == "__main__":
+    main()
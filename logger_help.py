@@ -2,19 +2,248 @@
 # Allows for logger to handle errors in a nicer way and drastically reduces need
 # To copy and paste
 
+import time
+import queue
+import atexit
+import typing
 import discord
+import functools
+import threading
+from models.Config import Config
 from pythondebuglogger.Logger import Logger
+from models.command_metrics import command_metrics
 
+config = Config()
 
+LOG_LEVELS: typing.Dict[str, int] = {
+    "debug": 10,
+    "notice": 20,
+    "warning": 30,
+    "error": 40,
+}  # ^^ Level names mapped to their severity, matching the Logger.display_* methods
+
+
+class LogSink:
+    """Bounded queue of log records drained in batches by a background thread.
+
+    Writing to the console never happens on the caller's thread, and if the queue is full
+    the record is dropped and counted instead of blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.1,
+    ) -> None:
+        """
+        Args:
+            max_queue_size (int, optional): Maximum amount of pending records. Defaults to 10000.
+            batch_size (int, optional): Maximum amount of records written per batch. Defaults to 256.
+            flush_interval (float, optional): Seconds the drain thread waits for new records. Defaults to 0.1.
+        """
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.dropped: int = 0
+        self._reported_dropped: int = 0
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(
+            target=self._drain, name="log-sink", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        logger: Logger,
+        level: str,
+        message: str,
+        args: typing.Tuple[typing.Any, ...],
+    ) -> None:
+        """Queues a record without formatting it
+
+        Args:
+            logger (Logger): The logger that will write the record
+            level (str): The level name. Ex: "notice"
+            message (str): The message, optionally with %-style placeholders
+            args (typing.Tuple[typing.Any, ...]): Arguments for the placeholders, formatted on the drain thread
+        """
+        try:
+            self._queue.put_nowait((logger, level, message, args))
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Returns the sink counters
+
+        Returns:
+            typing.Dict[str, int]: {"queued", "dropped"}
+        """
+        return {"queued": self._queue.qsize(), "dropped": self.dropped}
+
+    def flush(self) -> None:
+        """Blocks until every queued record has been written"""
+        self._queue.join()
+
+    def _drain(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                pass  # Write whatever arrived in time
+
+            for logger, level, message, args in batch:
+                try:
+                    getattr(logger, f"display_{level}")(
+                        message % args if args else message
+                    )
+                # A bad record should never kill the drain thread
+                except Exception as e:
+                    logger.display_error(f"[LogSink] failed to write a log record: {e}")
+                finally:
+                    self._queue.task_done()
+
+            if self.dropped != self._reported_dropped:
+                batch[0][0].display_warning(
+                    f"[LogSink] dropped {self.dropped - self._reported_dropped} log records, the queue was full"
+                )
+                self._reported_dropped = self.dropped
+
+
+_log_sink: LogSink | None = None
+_log_sink_lock = threading.Lock()  # Cogs are imported from worker threads at startup
+
+
+def get_log_sink() -> LogSink:
+    """Returns the process wide log sink, starting it on first use
+
+    Returns:
+        LogSink: The log sink
+    """
+    global _log_sink
+    with _log_sink_lock:
+        if _log_sink is None:
+            _log_sink = LogSink(
+                max_queue_size=config.LOG_QUEUE_SIZE, batch_size=config.LOG_BATCH_SIZE
+            )
+            atexit.register(
+                _log_sink.flush
+            )  # Don't lose queued records on a normal exit
+            command_metrics.register_gauges("log_sink", _log_sink.stats)
+
+    return _log_sink
+
+
+def flush_logs() -> None:
+    """Writes out every queued log record. Call before anything that replaces the process, like os.execv"""
+    if _log_sink is not None:
+        _log_sink.flush()
+
+
+class QueuedLogger:
+    """Drop-in replacement for pythondebuglogger's Logger that writes through the log sink.
+
+    The level threshold is checked before anything is queued, and messages may use
+    %-style placeholders so formatting only happens for records that are actually written:
+
+        logger.display_notice("[User %s] is calling /hsr", interaction.user.id)
+    """
+
+    def __init__(
+        self, enable_timestamps: bool = False, level: str | None = None
+    ) -> None:
+        """
+        Args:
+            enable_timestamps (bool, optional): Passed through to the underlying Logger. Defaults to False.
+            level (str | None, optional): Minimum level that gets written. Defaults to the "log-level" config value.
+        """
+        self._logger: Logger = Logger(enable_timestamps=enable_timestamps)
+        self._sink: LogSink = get_log_sink()
+        self.level: int = LOG_LEVELS[level or config.LOG_LEVEL]
+
+    def is_enabled_for(self, level: str) -> bool:
+        """Checks if records of a level would be written, useful to skip building expensive messages
+
+        Args:
+            level (str): The level name. Ex: "debug"
+
+        Returns:
+            bool: True if the level passes the threshold
+        """
+        return LOG_LEVELS[level] >= self.level
+
+    def display_debug(self, message: str, *args: typing.Any) -> None:
+        if LOG_LEVELS["debug"] >= self.level:
+            self._sink.submit(self._logger, "debug", message, args)
+
+    def display_notice(self, message: str, *args: typing.Any) -> None:
+        if LOG_LEVELS["notice"] >= self.level:
+            self._sink.submit(self._logger, "notice", message, args)
+
+    def display_warning(self, message: str, *args: typing.Any) -> None:
+        if LOG_LEVELS["warning"] >= self.level:
+            self._sink.submit(self._logger, "warning", message, args)
+
+    def display_error(self, message: str, *args: typing.Any) -> None:
+        if LOG_LEVELS["error"] >= self.level:
+            self._sink.submit(self._logger, "error", message, args)
+
+
+def command_label(interaction: discord.Interaction) -> str:
+    """Returns the name metrics are grouped under for an interaction
+
+    Args:
+        interaction (discord.Interaction): The discord interaction
+
+    Returns:
+        str: The qualified command name, or "component" for button and select interactions
+    """
+    if interaction.command is not None:
+        return interaction.command.qualified_name
+
+    return "component"
+
+
+def timed_phase(phase: str) -> typing.Callable:
+    """Decorator for the helpers below, records how long the call took as a phase of the command.
+    A helper returning False is counted as an error for the command.
+
+    Args:
+        phase (str): The phase name. Ex: "defer"
+    """
+
+    def decorator(func: typing.Callable) -> typing.Callable:
+        @functools.wraps(func)
+        async def wrapper(
+            interaction: discord.Interaction, *args: typing.Any, **kwargs: typing.Any
+        ) -> typing.Any:
+            start = time.perf_counter()
+            result = await func(interaction, *args, **kwargs)
+
+            command = command_label(interaction)
+            command_metrics.record(command, phase, time.perf_counter() - start)
+            if result is False:
+                command_metrics.record_error(command)
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+@timed_phase("defer")
 async def defer_with_logs(
-    interaction: discord.Interaction, logger: Logger, ephemeral: bool = False
+    interaction: discord.Interaction, logger: QueuedLogger, ephemeral: bool = False
 ) -> bool:
     """This function called interaction.response.defer() with the provided arguments.
     It will allow for easier dealing with logs and errors
 
     Args:
         interaction (discord.Interaction): The discord interaction
-        logger (Logger): The logger object
+        logger (QueuedLogger): The logger object
         ephemeral (bool, optional): True or False, Ephemeral or not. Defaults to False.
 
     Returns:
@@ -24,22 +253,25 @@ async def defer_with_logs(
     try:
         await interaction.response.defer(ephemeral=ephemeral)
         logger.display_notice(
-            f"[User {interaction.user.id}] is having a command defered."
+            "[User %s] is having a command defered.",
+            interaction.user.id,
         )
         return True
     except discord.HTTPException:
-        logger.display_error(f"[Interaction {interaction.id}] failed to defer.")
+        logger.display_error("[Interaction %s] failed to defer.", interaction.id)
         return False
     except discord.InteractionResponded:
         logger.display_error(
-            f"[Interaction {interaction.id}] has already been responded to."
+            "[Interaction %s] has already been responded to.",
+            interaction.id,
         )
         return False
 
 
+@timed_phase("response")
 async def send_response_message_with_logs(
     interaction: discord.Interaction,
-    logger: Logger,
+    logger: QueuedLogger,
     command_name: str,
     message: str = None,  # type: ignore
     embed: discord.Embed = discord.utils.MISSING,
@@ -52,7 +284,7 @@ async def send_response_message_with_logs(
 
     Args:
         interaction (discord.Interaction): The interaction
-        logger (Logger): The logger
+        logger (QueuedLogger): The logger
         command_name (str): The name of the command the logger is in
         message (str): The message you want to send. Defaults to None
         embed (discord.Embed) The embed you want to send. Defaults to None
@@ -67,86 +299,120 @@ async def send_response_message_with_logs(
             content=message, ephemeral=ephemeral, embed=embed, view=view
         )  # type: ignore
         logger.display_notice(
-            f"[User {interaction.user.id}/{command_name}] Successfully sent reply message to [Channel {interaction.channel.id}]"  # type: ignore
+            "[User %s/%s] Successfully sent reply message to [Channel %s]",
+            interaction.user.id,
+            command_name,
+            interaction.channel.id,  # type: ignore
         )
         return message
     except discord.HTTPException as e:
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] Message failed to send."
+            "[User %s/%s] Message failed to send.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
     except discord.NotFound as e:  # type: ignore
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] This webhook was not found."
+            "[User %s/%s] This webhook was not found.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
     except TypeError as e:
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] You specified both embed and embeds or file and files or thread and thread_name."
+            "[User %s/%s] You specified both embed and embeds or file and files or thread and thread_name.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
     except ValueError as e:
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] The length of embeds was invalid, there was no token associated with this webhook or ephemeral was passed with the improper webhook type or there was no state attached with this webhook when giving it a view."
+            "[User %s/%s] The length of embeds was invalid, there was no token associated with this webhook or ephemeral was passed with the improper webhook type or there was no state attached with this webhook when giving it a view.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
 
 
+@timed_phase("followup")
 async def send_followup_message_with_logs(
     interaction: discord.Interaction,
-    logger: Logger,
+    logger: QueuedLogger,
     command_name: str,
     message: str = None,  # type: ignore
     embed: discord.Embed = discord.utils.MISSING,
     view: discord.ui.View = discord.utils.MISSING,
     ephemeral: bool = False,
+    wait: bool = False,
+    file: discord.File = discord.utils.MISSING,
 ) -> discord.Message | bool:  # type: ignore
     try:
-        await interaction.followup.send(
-            content=message, embed=embed, view=view, ephemeral=ephemeral
-        )
+        sent = await interaction.followup.send(
+            content=message,
+            embed=embed,
+            view=view,
+            ephemeral=ephemeral,
+            wait=wait,
+            file=file,
+        )  # ^^ Only a message when wait is True, so it can be edited later
         logger.display_notice(
-            f"[User {interaction.user.id}/{command_name}] response sent to [Channel {interaction.channel.id}]"  # type: ignore
+            "[User %s/%s] response sent to [Channel %s]",
+            interaction.user.id,
+            command_name,
+            interaction.channel.id,  # type: ignore
         )
+        return sent
     except discord.HTTPException as e:
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] Message failed to send."
+            "[User %s/%s] Message failed to send.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
     except discord.NotFound as e:  # type: ignore
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] This webhook was not found."
+            "[User %s/%s] This webhook was not found.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
     except TypeError as e:
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] You specified both embed and embeds or file and files or thread and thread_name."
+            "[User %s/%s] You specified both embed and embeds or file and files or thread and thread_name.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
     except ValueError as e:
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] The length of embeds was invalid, there was no token associated with this webhook or ephemeral was passed with the improper webhook type or there was no state attached with this webhook when giving it a view."
+            "[User %s/%s] The length of embeds was invalid, there was no token associated with this webhook or ephemeral was passed with the improper webhook type or there was no state attached with this webhook when giving it a view.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
     except discord.Forbidden as e:  # type: ignore
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] The authorization token for the webhook is incorrect."
+            "[User %s/%s] The authorization token for the webhook is incorrect.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
 
 
+@timed_phase("edit")
 async def edit_followup_message_with_logs(
     interaction: discord.Interaction,
-    logger: Logger,
+    logger: QueuedLogger,
     command_name: str,
     message_id: int,
     message: str = None,  # type: ignore
@@ -161,35 +427,48 @@ async def edit_followup_message_with_logs(
             view=view,
         )
         logger.display_notice(
-            f"[User {interaction.user.id}/{command_name}] response sent to [Channel {interaction.channel.id}]"  # type: ignore
+            "[User %s/%s] response sent to [Channel %s]",
+            interaction.user.id,
+            command_name,
+            interaction.channel.id,  # type: ignore
         )
     except discord.HTTPException as e:
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] Message failed to send."
+            "[User %s/%s] Message failed to send.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
     except discord.NotFound as e:  # type: ignore
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] This webhook was not found."
+            "[User %s/%s] This webhook was not found.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
     except TypeError as e:
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] You specified both embed and embeds or file and files or thread and thread_name."
+            "[User %s/%s] You specified both embed and embeds or file and files or thread and thread_name.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
     except ValueError as e:
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] The length of embeds was invalid, there was no token associated with this webhook or ephemeral was passed with the improper webhook type or there was no state attached with this webhook when giving it a view."
+            "[User %s/%s] The length of embeds was invalid, there was no token associated with this webhook or ephemeral was passed with the improper webhook type or there was no state attached with this webhook when giving it a view.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
     except discord.Forbidden as e:  # type: ignore
         logger.display_error(
-            f"[User {interaction.user.id}/{command_name}] The authorization token for the webhook is incorrect."
+            "[User %s/%s] The authorization token for the webhook is incorrect.",
+            interaction.user.id,
+            command_name,
         )
         logger.display_debug(str(e))
         return False
@@ -1,16 +1,42 @@
 import os
+import time
 import typing
-import discord
+import ast
+import asyncio
+import importlib
+import importlib.util
 from discord.ext import commands
 from models.Config import Config
-from pythondebuglogger.Logger import Logger
+from logger_help import QueuedLogger
+from models.command_metrics import command_metrics
+from models.gateway_monitor import GatewayMonitor
+from models.profile_store import profile_store, settings_store
+from models.audit_log import audit_log
+from models.client_options import client_options, cluster_id, shard_options
+
+STARTED_AT: float = time.perf_counter()
+# ^^ Used to report how long startup took, including after /restart
 
 config = Config()
-logger: Logger = Logger(enable_timestamps=True)
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
 logger.display_notice("Debug Logger Initialized")
 
+
+def load_client_options() -> dict[str, typing.Any]:
+    """
+    Reads the intents and cache settings from config.json
+    Args: None
+    Returns (dict[str, typing.Any]): Intents and cache keyword arguments for commands.Bot
+    """
+    try:
+        return client_options()
+    except ValueError as e:
+        logger.display_error("Invalid gateway settings in config.json: %s", e)
+        exit(1)  # Exit with code 1 if the intents or cache flags are invalid
+
+
 SETUP_KWARGS: dict[str, typing.Any] = {
-    "intents": discord.Intents.all(),  # What the bot intends to use
+    **load_client_options(),  # Intents, member cache flags and message cache size
     "command_prefix": config.PREFIX,  # The command prefix
     "help_command": None,  # Removing the default help command
     "description": "A cute, general purpose discord bot",  # bot description
@@ -67,7 +93,8 @@ def cprint(text: str, rgb: tuple[int]) -> None:
     for color_value in rgb:
         if not (0 <= color_value <= 255):
             logger.display_error(
-                f"Color value cannot be out of range 0-255.\n Values given: {rgb}"
+                "Color value cannot be out of range 0-255.\n Values given: %s",
+                rgb,
             )
             exit(1)  # # Tells the user they messed up and explains how
 
@@ -81,10 +108,72 @@ def cprint(text: str, rgb: tuple[int]) -> None:
     )  # Printing the replace output
 
 
+def import_dependencies(extension: str) -> None:
+    """
+    Imports the modules a cog imports at its top level, without running the cog module itself.
+    load_extension always runs the cog module from its file, so importing the cog here would run it twice.
+
+    Args:
+        extension (str): The cog's module name. Ex: "cogs.hsr"
+    """
+
+    spec = importlib.util.find_spec(extension)
+    if spec is None or spec.origin is None:
+        return  # load_extension reports the missing cog
+
+    with open(spec.origin, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), spec.origin)
+
+    # Imports nested in functions or TYPE_CHECKING blocks stay lazy
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                importlib.import_module(alias.name)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            importlib.import_module(node.module)
+
+
+async def load_cog(client: commands.Bot, filename: str) -> typing.Dict[str, typing.Any]:
+    """
+    Imports a single cog and connects it to the discord bot, timing both steps
+
+    Args:
+        client (commands.Bot): The discord bot object
+        filename (str): The cog's file name in the cogs folder. Ex: "hsr.py"
+
+    Returns (typing.Dict[str, typing.Any]): {"cog": str, "import": float, "setup": float, "error": str | None}, times in seconds
+    """
+
+    extension = f"cogs.{filename[:-3]}"
+    timing: typing.Dict[str, typing.Any] = {
+        "cog": filename,
+        "import": 0.0,
+        "setup": 0.0,
+        "error": None,
+    }
+
+    try:
+        start = time.perf_counter()
+        await asyncio.to_thread(import_dependencies, extension)
+        # ^^ Import the cog's dependencies in a worker thread, so cogs import side by side
+        timing["import"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await client.load_extension(extension)
+        # ^^ Runs the cog module, which is cheap now that its imports are cached, then setup()
+        timing["setup"] = time.perf_counter() - start
+        logger.display_notice("Cog %s successfully loaded", filename)
+    except Exception as e:
+        timing["error"] = f"{type(e).__name__}: {e}"
+        logger.display_error("Cog %s failed to load: %s", filename, timing["error"])
+
+    return timing
+
+
 async def load_cogs(client: commands.Bot) -> None:
     """
-    Loads all the cogs from the cogs folder
-    and connects them to the discord bot
+    Loads all the cogs from the cogs folder concurrently
+    and connects them to the discord bot, then logs how long each cog took
 
     Args:
         client (commands.Bot): The discord bot object
@@ -92,25 +181,72 @@ async def load_cogs(client: commands.Bot) -> None:
     Returns (None): There is nothing to return
     """
 
-    for filename in os.listdir("cogs"):  # for every cog in the cogs folder
-        if filename[-1] == "y":
-            # ^^ If the cog ends in "y", checking if it's a python file
-            try:
-                await client.load_extension(f"cogs.{filename[:-3]}")
-                logger.display_notice(f"Cog {filename} successfully loaded")
-            except Exception:
-                logger.display_error(f"Cog {filename} failed to load")
+    start = time.perf_counter()
+    timings = await asyncio.gather(
+        *(
+            load_cog(client, filename)
+            for filename in sorted(os.listdir("cogs"))
+            if filename.endswith(".py")
+        )
+    )
+
+    logger.display_notice(
+        "Cog startup report, %.1fms total:", (time.perf_counter() - start) * 1000
+    )
+    for timing in sorted(timings, key=lambda t: t["import"] + t["setup"], reverse=True):
+        if timing["error"] is not None:
+            logger.display_notice("  %s: failed, %s", timing["cog"], timing["error"])
+            continue
+
+        logger.display_notice(
+            "  %s: import %.1fms, setup %.1fms",
+            timing["cog"],
+            timing["import"] * 1000,
+            timing["setup"] * 1000,
+        )
+
+
+class KoiBot(commands.AutoShardedBot):
+    """AutoShardedBot that counts every gateway event for the cluster's gateway gauges"""
+
+    def __init__(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.gateway_monitor = GatewayMonitor(self, cluster_id())
+        command_metrics.register_gauges("gateway", self.gateway_monitor.stats)
+
+    def dispatch(
+        self, event_name: str, /, *args: typing.Any, **kwargs: typing.Any
+    ) -> None:
+        if event_name == "socket_event_type":  # Dispatched once for every gateway event
+            self.gateway_monitor.record_event()
+
+        super().dispatch(event_name, *args, **kwargs)
+
+    async def close(self) -> None:
+        await super().close()  # Unloads the cogs first, which queue their last writes
+        await profile_store.close()
+        await settings_store.close()
+        await audit_log.close()
 
 
-client = commands.Bot(**SETUP_KWARGS)
-logger.display_notice("discord.commands.Bot Object created successfully")
+SHARD_KWARGS: dict[str, typing.Any] = shard_options()
+# ^^ Which shards this process runs, set per cluster by launcher.py
+
+client = KoiBot(**SETUP_KWARGS, **SHARD_KWARGS)
+logger.display_notice(
+    "discord.commands.AutoShardedBot Object created successfully (cluster %s, shards %s of %s)",
+    cluster_id(),
+    SHARD_KWARGS["shard_ids"] or "all",
+    SHARD_KWARGS["shard_count"] or "recommended",
+)
 
 
 @client.command(name="sync")
 async def _sync(ctx: commands.Context):
     if ctx.author.id != config.OWNER_ID:
         logger.display_error(
-            f"User with ID {ctx.user.id} attempted to sync command tree."
+            "User with ID %s attempted to sync command tree.",
+            ctx.user.id,
         )
         return
 
@@ -122,6 +258,11 @@ async def _sync(ctx: commands.Context):
     )
 
 
+@client.event
+async def on_shard_ready(shard_id: int) -> None:
+    logger.display_notice("Shard %s is connected and ready", shard_id)
+
+
 @client.event
 async def setup_hook() -> None:
     """This function runs to setup crucial client behavior
@@ -131,7 +272,10 @@ async def setup_hook() -> None:
     await load_cogs(client)
     logger.display_notice("Attempted to load all cogs")
     cprint(STARTUP_ART, BLUE)
-    logger.display_notice("The bot is now running successfully")
+    logger.display_notice(
+        "The bot is now running successfully, startup took %.1fms",
+        (time.perf_counter() - STARTED_AT) * 1000,
+    )
 
 
 client.run(load_token())
@@ -1,5 +1,5 @@
 import json
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 
 class Config:
@@ -82,6 +82,335 @@ class Config:
         """
         return self.data.get("ra-username", "")
 
+    @property
+    def HSR_CACHE_SIZE(self) -> int:
+        """Get the maximum amount of Honkai: Star Rail profiles kept in memory.
+
+        Returns:
+            int: The profile cache size, defaulting to 256 if not specified.
+        """
+        return self.data.get("hsr-cache-size", 256)
+
+    @property
+    def HSR_CACHE_TTL(self) -> float:
+        """Get how long a cached Honkai: Star Rail profile stays valid, in seconds.
+
+        Returns:
+            float: The profile cache TTL, defaulting to 300 if not specified.
+        """
+        return self.data.get("hsr-cache-ttl", 300)
+
+    @property
+    def MIHOMO_RATE(self) -> float:
+        """Get how many requests per second are made to Mihomo's API, on average.
+
+        Returns:
+            float: The request rate, defaulting to 2 if not specified.
+        """
+        return self.data.get("mihomo-rate", 2)
+
+    @property
+    def MIHOMO_BURST(self) -> int:
+        """Get how many requests can be made to Mihomo's API at once after a quiet period.
+
+        Returns:
+            int: The burst size, defaulting to 5 if not specified.
+        """
+        return self.data.get("mihomo-burst", 5)
+
+    @property
+    def LEADERBOARD_REFRESH_INTERVAL(self) -> float:
+        """Get how often the profiles of players registered for /hsr-leaderboard are refreshed, in seconds.
+
+        Returns:
+            float: The refresh interval, defaulting to 1800 if not specified.
+        """
+        return self.data.get("leaderboard-refresh-interval", 1800)
+
+    @property
+    def LEADERBOARD_BATCH_SIZE(self) -> int:
+        """Get how many registered players are refreshed at once by the leaderboard refresh.
+
+        Returns:
+            int: The batch size, defaulting to 10 if not specified.
+        """
+        return self.data.get("leaderboard-batch-size", 10)
+
+    @property
+    def BULK_ACTION_CONCURRENCY(self) -> int:
+        """Get how many requests /mass-ban, /mass-kick and /role-all keep in flight at once.
+
+        Returns:
+            int: The concurrency, defaulting to 5 if not specified.
+        """
+        return self.data.get("bulk-action-concurrency", 5)
+
+    @property
+    def BULK_ACTION_PROGRESS_INTERVAL(self) -> float:
+        """Get how often bulk moderation commands update their progress message, in seconds.
+
+        Returns:
+            float: The interval, defaulting to 2 if not specified.
+        """
+        return self.data.get("bulk-action-progress-interval", 2)
+
+    @property
+    def AUTOMOD_MAX_PATTERNS(self) -> int:
+        """Get the maximum amount of patterns on a guild's automod blocklist.
+
+        Returns:
+            int: The pattern limit, defaulting to 10000 if not specified.
+        """
+        return self.data.get("automod-max-patterns", 10000)
+
+    @property
+    def SPAM_MESSAGE_LIMIT(self) -> int:
+        """Get how many messages a member can send within `spam-message-window` before antispam acts on them.
+
+        Returns:
+            int: The message limit, defaulting to 8 if not specified.
+        """
+        return self.data.get("spam-message-limit", 8)
+
+    @property
+    def SPAM_MESSAGE_WINDOW(self) -> float:
+        """Get the amount of seconds antispam measures a member's message rate over.
+
+        Returns:
+            float: The window, defaulting to 5 if not specified.
+        """
+        return self.data.get("spam-message-window", 5)
+
+    @property
+    def SPAM_DUPLICATE_LIMIT(self) -> int:
+        """Get how many identical messages in a row within `spam-duplicate-window` make antispam act on a member.
+
+        Returns:
+            int: The duplicate limit, defaulting to 4 if not specified.
+        """
+        return self.data.get("spam-duplicate-limit", 4)
+
+    @property
+    def SPAM_DUPLICATE_WINDOW(self) -> float:
+        """Get the amount of seconds identical messages have to be sent within to count as spam.
+
+        Returns:
+            float: The window, defaulting to 30 if not specified.
+        """
+        return self.data.get("spam-duplicate-window", 30)
+
+    @property
+    def RAID_JOIN_LIMIT(self) -> int:
+        """Get how many members can join within `raid-join-window` before antispam treats the joins as a raid.
+
+        Returns:
+            int: The join limit, defaulting to 10 if not specified.
+        """
+        return self.data.get("raid-join-limit", 10)
+
+    @property
+    def RAID_JOIN_WINDOW(self) -> float:
+        """Get the amount of seconds antispam measures a guild's join rate over.
+
+        Returns:
+            float: The window, defaulting to 10 if not specified.
+        """
+        return self.data.get("raid-join-window", 10)
+
+    @property
+    def SPAM_IDLE_SECONDS(self) -> float:
+        """Get how long antispam keeps tracking a member or guild without any activity, in seconds.
+
+        Returns:
+            float: The idle time, defaulting to 300 if not specified.
+        """
+        return self.data.get("spam-idle-seconds", 300)
+
+    @property
+    def VIEW_CACHE_SIZE(self) -> int:
+        """Get the maximum amount of profiles and games kept in memory for buttons and dropdowns.
+
+        Returns:
+            int: The view cache size, defaulting to 128 if not specified.
+        """
+        return self.data.get("view-cache-size", 128)
+
+    @property
+    def VIEW_CACHE_TTL(self) -> float:
+        """Get how long a profile or game stays cached for buttons and dropdowns, in seconds.
+
+        Returns:
+            float: The view cache TTL, defaulting to 900 if not specified.
+        """
+        return self.data.get("view-cache-ttl", 900)
+
+    @property
+    def PROFILE_STORE_LOCATION(self) -> str:
+        """Get the SQLite file fetched profiles are stored in across restarts.
+
+        Returns:
+            str: The database path, defaulting to profiles.sqlite3 if not specified. An empty string disables the store.
+        """
+        return self.data.get("profile-store-location", "profiles.sqlite3")
+
+    @property
+    def PROFILE_STORE_TTL(self) -> float:
+        """Get how long a stored profile stays valid, in seconds.
+
+        Returns:
+            float: The profile store TTL, defaulting to 600 if not specified.
+        """
+        return self.data.get("profile-store-ttl", 600)
+
+    @property
+    def SETTINGS_STORE_LOCATION(self) -> str:
+        """Get the SQLite file guild settings are stored in, like automod blocklists and leaderboard registrations.
+
+        Returns:
+            str: The database path, defaulting to settings.sqlite3 if not specified. It can't be disabled, an empty string also uses the default.
+        """
+        return self.data.get("settings-store-location") or "settings.sqlite3"
+
+    @property
+    def AUDIT_LOG_LOCATION(self) -> str:
+        """Get the SQLite file every moderation action is recorded in.
+
+        Returns:
+            str: The database path, defaulting to audit.sqlite3 if not specified. An empty string disables the log.
+        """
+        return self.data.get("audit-log-location", "audit.sqlite3")
+
+    @property
+    def RETRO_REQUEST_TIMEOUT(self) -> float:
+        """Get the timeout for a single RetroAchievements API request, in seconds.
+
+        Returns:
+            float: The request timeout, defaulting to 10 if not specified.
+        """
+        return self.data.get("retro-request-timeout", 10)
+
+    @property
+    def REACTION_BUFFER_SIZE(self) -> int:
+        """Get the amount of ready reaction gif URLs kept per reaction type.
+
+        Returns:
+            int: The buffer size, defaulting to 5 if not specified.
+        """
+        return self.data.get("reaction-buffer-size", 5)
+
+    @property
+    def REACTION_REFILL_INTERVAL(self) -> float:
+        """Get the amount of seconds between reaction gif buffer refills.
+
+        Returns:
+            float: The refill interval, defaulting to 2 if not specified.
+        """
+        return self.data.get("reaction-refill-interval", 2)
+
+    @property
+    def REACTION_MAX_AGE(self) -> float:
+        """Get how long a buffered reaction gif URL stays usable, in seconds.
+
+        Returns:
+            float: The maximum URL age, defaulting to 600 if not specified.
+        """
+        return self.data.get("reaction-max-age", 600)
+
+    @property
+    def LOG_LEVEL(self) -> str:
+        """Get the minimum level of log messages that get written.
+
+        Returns:
+            str: One of "debug", "notice", "warning" or "error", defaulting to "debug" if not specified.
+        """
+        return self.data.get("log-level", "debug")
+
+    @property
+    def LOG_QUEUE_SIZE(self) -> int:
+        """Get the maximum amount of log messages waiting to be written before new ones are dropped.
+
+        Returns:
+            int: The log queue size, defaulting to 10000 if not specified.
+        """
+        return self.data.get("log-queue-size", 10000)
+
+    @property
+    def LOG_BATCH_SIZE(self) -> int:
+        """Get the maximum amount of log messages written per batch.
+
+        Returns:
+            int: The log batch size, defaulting to 256 if not specified.
+        """
+        return self.data.get("log-batch-size", 256)
+
+    @property
+    def METRICS_EXPORT_LOCATION(self) -> str:
+        """Get the path the Prometheus metrics file is written to by /stats.
+
+        Returns:
+            str: The metrics file path, defaulting to "metrics.prom" if not specified.
+        """
+        return self.data.get("metrics-export-location", "metrics.prom")
+
+    @property
+    def INTENTS(self) -> List[str]:
+        """Get the names of the gateway intents the bot subscribes to, as named on discord.Intents.
+        "default" and "all" can be used as shorthands for discord.Intents.default() and discord.Intents.all().
+
+        Returns:
+            List[str]: The intent names, defaulting to ["guilds", "guild_messages", "message_content"] if not specified.
+            guilds is needed by every slash command. guild_messages and message_content are needed by
+            the ~sync prefix command, AutoMod (new and edited messages) and AntiSpam. members is not on by
+            default, AntiSpam raid detection, /role-all and the with_role option of the bulk commands need it.
+        """
+        return self.data.get("intents", ["guilds", "guild_messages", "message_content"])
+
+    @property
+    def MEMBER_CACHE_FLAGS(self) -> List[str] | None:
+        """Get the names of the discord.MemberCacheFlags deciding which members are kept in memory.
+
+        Returns:
+            List[str] | None: The flag names, defaulting to None if not specified,
+            which derives the flags from the intents like discord.py does.
+        """
+        return self.data.get("member-cache-flags", None)
+
+    @property
+    def MAX_MESSAGES(self) -> int | None:
+        """Get the maximum amount of messages kept in the message cache.
+
+        Returns:
+            int | None: The message cache size, defaulting to None if not specified, which disables the message cache.
+        """
+        return self.data.get("max-messages", None)
+
+    @property
+    def CHUNK_GUILDS_AT_STARTUP(self) -> bool:
+        """Get whether every guild's full member list is requested when the bot connects.
+
+        Returns:
+            bool: Whether to chunk guilds at startup, defaulting to False if not specified.
+        """
+        return self.data.get("chunk-guilds-at-startup", False)
+
+    @property
+    def SHARD_COUNT(self) -> int | None:
+        """Get the total amount of gateway shards the bot runs.
+
+        Returns:
+            int | None: The shard count, defaulting to None if not specified, which uses the count recommended by discord.
+        """
+        return self.data.get("shard-count", None)
+
+    @property
+    def CLUSTERS(self) -> int:
+        """Get the amount of processes launcher.py spreads the shards across.
+
+        Returns:
+            int: The cluster count, defaulting to 1 if not specified.
+        """
+        return self.data.get("clusters", 1)
+
     def reload_config(self) -> None:
         """Reload the configuration data from the JSON file.
 
@@ -0,0 +1,339 @@
+import time
+import typing
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from models.Config import Config
+from models.command_metrics import command_metrics
+from logger_help import QueuedLogger
+
+config = Config()
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
+
+ACTIONS: typing.Tuple[str, ...] = ("kick", "ban", "role")
+# ^^ The actions recorded, shown as choices on /modlog
+
+
+class AuditLog:
+    """Append-only SQLite log of every moderation action, to answer questions like "who banned X last month".
+
+    Rows are only ever inserted, triggers reject updates and deletes. Every query is scoped to a guild
+    and pages through rows newest first by row ID, using one of the (guild), (guild, target) or
+    (guild, actor) indexes, so a page costs the same with millions of rows as with ten. The
+    (guild, time) index only finds the first row ID of a time range, which then bounds the page.
+    Like ProfileStore, all queries run on one worker thread that owns the connection, and records are
+    queued and inserted in batches, every `flush_interval` seconds or once `batch_size` are queued.
+    """
+
+    SCHEMA: typing.Tuple[str, ...] = (
+        """
+        CREATE TABLE IF NOT EXISTS actions (
+            id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            actor_id INTEGER NOT NULL,
+            target_id INTEGER NOT NULL,
+            reason TEXT,
+            details TEXT,
+            created_at REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS actions_guild ON actions (guild_id)",
+        "CREATE INDEX IF NOT EXISTS actions_target ON actions (guild_id, target_id)",
+        "CREATE INDEX IF NOT EXISTS actions_actor ON actions (guild_id, actor_id)",
+        "CREATE INDEX IF NOT EXISTS actions_time ON actions (guild_id, created_at)",
+        # ^^ Index entries end with the row ID, so each index already returns rows in ID order
+        """
+        CREATE TRIGGER IF NOT EXISTS actions_no_update BEFORE UPDATE ON actions
+        BEGIN SELECT RAISE(ABORT, 'the audit log is append-only'); END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS actions_no_delete BEFORE DELETE ON actions
+        BEGIN SELECT RAISE(ABORT, 'the audit log is append-only'); END
+        """,
+    )
+    MAX_FLUSH_RETRIES: int = 10
+    # ^^ About 10 flush intervals, each waiting up to the 5s lock timeout
+    COLUMNS: typing.Tuple[str, ...] = (
+        "id",
+        "guild_id",
+        "action",
+        "actor_id",
+        "target_id",
+        "reason",
+        "details",
+        "created_at",
+    )
+
+    def __init__(
+        self, path: str, flush_interval: float = 1.0, batch_size: int = 256
+    ) -> None:
+        """
+        Args:
+            path (str): The database file. An empty string disables the log.
+            flush_interval (float, optional): Longest a queued record waits before it is inserted, in seconds. Defaults to 1.0.
+            batch_size (int, optional): Amount of queued records that triggers an insert right away. Defaults to 256.
+        """
+        self.path: str = path
+        self.flush_interval: float = flush_interval
+        self.batch_size: int = batch_size
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="audit-log"
+        )  # ^^ The only thread that touches the connection, so queries never run concurrently
+        self._connection: sqlite3.Connection | None = None
+        # ^^ Opened by the worker thread on first use
+        self._pending: typing.List[typing.Tuple[typing.Any, ...]] = []
+        # ^^ Rows waiting to be inserted, in the order they were recorded
+        self._flush_task: asyncio.Task | None = None
+        self._batch_full: asyncio.Event | None = None
+
+        self.recorded: int = 0
+        self.queries: int = 0
+        self.flushes: int = 0
+        self.errors: int = 0
+        self.dropped: int = 0
+        # ^^ Counters exposed through stats()
+        self._failed_flushes: int = 0
+        # ^^ Failed inserts in a row, of the batch at the front of _pending
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens the database on the worker thread, creating the table, indexes and triggers"""
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            # ^^ With WAL, NORMAL only risks the last commits on power loss, never corruption
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+            connection.commit()
+            self._connection = connection
+
+        return self._connection
+
+    def _write(self, rows: typing.List[typing.Tuple[typing.Any, ...]]) -> None:
+        connection = self._connect()
+        with connection:  # One transaction for the whole batch
+            connection.executemany(
+                "INSERT INTO actions (guild_id, action, actor_id, target_id, reason, details, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def record(
+        self,
+        guild_id: int,
+        action: str,
+        actor_id: int,
+        target_id: int,
+        reason: str | None = None,
+        details: str | None = None,
+    ) -> None:
+        """Queues a moderation action, it is inserted with the next batch
+
+        Args:
+            guild_id (int): The guild it happened in
+            action (str): What was done, one of ACTIONS. Ex: "ban"
+            actor_id (int): Who did it, the bot's own ID for automatic actions
+            target_id (int): Who it was done to
+            reason (str | None, optional): The reason given. Defaults to None.
+            details (str | None, optional): Anything else worth keeping, like the role assigned. Defaults to None.
+        """
+        if not self.enabled:
+            return
+
+        self._pending.append(
+            (guild_id, action, actor_id, target_id, reason, details, time.time())
+        )
+        if self._batch_full is None:
+            self._batch_full = asyncio.Event()
+        if len(self._pending) >= self.batch_size:
+            self._batch_full.set()
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    def _query(
+        self,
+        guild_id: int,
+        filters: typing.Dict[str, typing.Any],
+        since: float | None,
+        before_id: int | None,
+        after_id: int | None,
+        limit: int,
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+        connection = self._connect()
+        conditions = ["guild_id = ?"]
+        parameters: typing.List[typing.Any] = [guild_id]
+        for column, value in filters.items():
+            if value is not None:
+                conditions.append(f"{column} = ?")  # Column names come from query()
+                parameters.append(value)
+        if since is not None:
+            first = connection.execute(
+                "SELECT id FROM actions WHERE guild_id = ? AND created_at >= ? ORDER BY created_at LIMIT 1",
+                (guild_id, since),
+            ).fetchone()
+            if first is None:
+                return []
+            conditions.append("id >= ?")
+            parameters.append(first[0])
+            # ^^ Rows are inserted in time order, so the time filter becomes a row ID bound.
+            # Filtering on created_at here would read and sort the whole time range by ID.
+        if before_id is not None:
+            conditions.append("id < ?")
+            parameters.append(before_id)
+        if after_id is not None:
+            conditions.append("id > ?")
+            parameters.append(after_id)
+
+        order = "ASC" if after_id is not None else "DESC"
+        # ^^ Paging towards newer rows reads upwards from the cursor, the page is flipped back below
+        rows = connection.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM actions WHERE {' AND '.join(conditions)} ORDER BY id {order} LIMIT ?",
+            (*parameters, limit),
+        ).fetchall()
+        if after_id is not None:
+            rows.reverse()
+
+        return [dict(zip(self.COLUMNS, row)) for row in rows]
+
+    async def query(
+        self,
+        guild_id: int,
+        target_id: int | None = None,
+        actor_id: int | None = None,
+        action: str | None = None,
+        since: float | None = None,
+        before_id: int | None = None,
+        after_id: int | None = None,
+        limit: int = 10,
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+        """Returns a page of a guild's moderation actions, newest first, including queued ones
+
+        Args:
+            guild_id (int): The guild
+            target_id (int | None, optional): Only actions done to this user. Defaults to None.
+            actor_id (int | None, optional): Only actions done by this user. Defaults to None.
+            action (str | None, optional): Only this kind of action. Defaults to None.
+            since (float | None, optional): Only actions from this UNIX timestamp on. Defaults to None.
+            before_id (int | None, optional): The page older than this row ID. Defaults to None.
+            after_id (int | None, optional): The page newer than this row ID. Defaults to None.
+            limit (int, optional): The page size. Defaults to 10.
+
+        Returns:
+            typing.List[typing.Dict[str, typing.Any]]: The rows as {column: value}, empty if the log is disabled or can't be read
+        """
+        if not self.enabled:
+            return []
+
+        await self.flush()  # Runs before the query on the worker thread, so queued records are included
+        try:
+            rows = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                self._query,
+                guild_id,
+                {"target_id": target_id, "actor_id": actor_id, "action": action},
+                since,
+                before_id,
+                after_id,
+                limit,
+            )
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.display_error("[AuditLog.query()] failed to read: %s", e)
+            return []
+
+        self.queries += 1
+        return rows
+
+    async def _flush_later(self) -> None:
+        assert self._batch_full is not None
+        try:
+            await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+        except asyncio.TimeoutError:
+            pass
+
+        self._batch_full.clear()
+        self._flush_task = None  # Records queued from now on start the next batch
+        await self.flush()
+        if self._pending and self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+            # ^^ The insert failed and the batch was queued again, retry it after the next interval
+
+    async def flush(self) -> None:
+        """Inserts every queued record now. A batch that fails to insert, like when another
+        cluster holds the database lock, is queued again in front of newer records and retried
+        by the next flush, up to MAX_FLUSH_RETRIES times in a row before it is given up on.
+        """
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._write, batch
+            )
+            self.recorded += len(batch)
+            self.flushes += 1
+            self._failed_flushes = 0
+        except sqlite3.Error as e:
+            self.errors += 1
+            self._failed_flushes += 1
+            if self._failed_flushes > self.MAX_FLUSH_RETRIES:
+                self.dropped += len(batch)
+                self._failed_flushes = 0
+                logger.display_error(
+                    "[AuditLog.flush()] gave up on %s records after %s retries: %s",
+                    len(batch),
+                    self.MAX_FLUSH_RETRIES,
+                    e,
+                )
+                return
+
+            self._pending = batch + self._pending
+            # ^^ Back in front, so records keep their order when the retry succeeds
+            logger.display_warning(
+                "[AuditLog.flush()] failed to insert %s records, will retry: %s",
+                len(batch),
+                e,
+            )
+
+    async def close(self) -> None:
+        """Inserts the queued records and closes the database"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._batch_full = None  # Bound to this event loop
+
+        await self.flush()
+        if self._flush_task is not None:
+            self._flush_task.cancel()  # A retry scheduled by a failed flush
+            self._flush_task = None
+        if self._connection is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._connection.close
+            )
+            self._connection = None
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Returns the log counters
+
+        Returns:
+            typing.Dict[str, int]: {"pending", "recorded", "queries", "flushes", "errors", "dropped"}
+        """
+        return {
+            "pending": len(self._pending),
+            "recorded": self.recorded,
+            "queries": self.queries,
+            "flushes": self.flushes,
+            "errors": self.errors,
+            "dropped": self.dropped,
+        }
+
+
+audit_log = AuditLog(config.AUDIT_LOG_LOCATION)
+# ^^ Process wide log, shared by the Moderation and AntiSpam cogs
+command_metrics.register_gauges("audit_log", audit_log.stats)
@@ -0,0 +1,123 @@
+import re
+import time
+import typing
+import asyncio
+import discord
+
+MENTION_OR_ID = re.compile(r"^(?:<@!?)?([0-9]{15,20})>?$")
+# ^^ A user mention like <@123> or <@!123>, or a bare user ID
+
+ProgressCallback = typing.Callable[["BulkAction"], typing.Awaitable[typing.Any]]
+# ^^ Awaited with the action while it runs, at most once per progress interval, and once when it finishes
+
+
+def parse_targets(text: str) -> typing.Tuple[typing.List[int], typing.List[str]]:
+    """Reads user mentions and IDs separated by spaces or commas
+
+    Args:
+        text (str): The command option. Ex: "<@123...> 456..., 789..."
+
+    Returns:
+        typing.Tuple[typing.List[int], typing.List[str]]: (user IDs in order without duplicates, tokens that are neither)
+    """
+    targets: typing.List[int] = []
+    invalid: typing.List[str] = []
+    for token in re.split(r"[\s,]+", text.strip()):
+        if not token:
+            continue
+
+        match = MENTION_OR_ID.match(token)
+        if match is None:
+            invalid.append(token)
+        elif int(match[1]) not in targets:
+            targets.append(int(match[1]))
+
+    return targets, invalid
+
+
+def describe_error(error: Exception) -> str:
+    """Turns the error of a failed moderation request into a short reason for the summary"""
+    if isinstance(error, discord.Forbidden):
+        return "missing permissions, or their top role is above mine"
+    if isinstance(error, discord.NotFound):
+        return "not found in this server"
+    if isinstance(error, discord.HTTPException):
+        return f"discord error {error.status}"
+
+    return type(error).__name__
+
+
+class BulkAction:
+    """Runs one moderation action against many users concurrently, and keeps track of the outcome.
+
+    At most `concurrency` requests are in flight at once. discord.py already queues requests that
+    share a rate limit bucket and retries them after a 429, so the semaphore only has to keep a mass
+    action from piling hundreds of waiting requests onto the bucket, where they would also delay
+    every other moderation request of the guild.
+    """
+
+    def __init__(
+        self,
+        targets: typing.Sequence[int],
+        action: typing.Callable[[int], typing.Awaitable[typing.Any]],
+        concurrency: int,
+    ) -> None:
+        """
+        Args:
+            targets (typing.Sequence[int]): The user IDs to act on
+            action (typing.Callable[[int], typing.Awaitable[typing.Any]]): Acts on one user ID, raising on failure
+            concurrency (int): Most requests in flight at once
+        """
+        self.targets: typing.Sequence[int] = targets
+        self.action = action
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        self.succeeded: typing.List[int] = []
+        self.failed: typing.Dict[int, str] = {}  # ^^ User ID -> reason
+        self.started_at: float = time.monotonic()
+        self.finished: bool = False
+
+    def skip(self, target: int, reason: str) -> None:
+        """Records a target as failed without acting on it, call before run()"""
+        self.failed[target] = reason
+
+    @property
+    def done(self) -> int:
+        """Amount of targets acted on or skipped so far"""
+        return len(self.succeeded) + len(self.failed)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the action started"""
+        return time.monotonic() - self.started_at
+
+    async def _act(self, target: int) -> None:
+        async with self.semaphore:
+            try:
+                await self.action(target)
+            except Exception as e:
+                # ^^ Every failure ends up in the summary instead of stopping the rest
+                self.failed[target] = describe_error(e)
+            else:
+                self.succeeded.append(target)
+
+    async def run(self, on_progress: ProgressCallback, interval: float) -> None:
+        """Acts on every target that wasn't skipped, reporting progress while it runs
+
+        Args:
+            on_progress (ProgressCallback): Reports the progress, not awaited more than once per interval
+            interval (float): Seconds between progress reports
+        """
+        self.started_at = time.monotonic()
+        work = asyncio.gather(
+            *(self._act(target) for target in self.targets if target not in self.failed)
+        )
+        while True:
+            try:
+                await asyncio.wait_for(asyncio.shield(work), interval)
+                break
+            except asyncio.TimeoutError:
+                await on_progress(self)
+
+        self.finished = True
+        await on_progress(self)
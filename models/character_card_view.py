@@ -1,59 +1,113 @@
-import typing
+import re
 import discord
-from pythondebuglogger.Logger import Logger
-from logger_help import defer_with_logs, send_followup_message_with_logs
+from models.persistent_view import PersistentView
+from logger_help import QueuedLogger, defer_with_logs, send_followup_message_with_logs
 
-logger: Logger = Logger(enable_timestamps=True)
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
 
 
-class CharacterCardView(discord.ui.View):
-    def __init__(
-        self,
-        user_id: int,
-        character: str,
-        parsed_data: (
-            typing.Dict[str, discord.Embed]
-            | typing.Dict[str, typing.Dict[str, discord.Embed]]
-        ),
-    ):
-        logger.display_notice(
-            f"[User {user_id}/hsr] creating character card view for `{character}`"
-        )
+class LightconeButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"koi:hsr:lightcone:(?P<uid>[0-9]+):(?P<character>.+)",
+):
+    """Sends the lightcone card of the character shown on the message.
+    The UID and character name are kept in its custom_id, the profile is loaded from the HSR cog's caches.
+    """
 
-        self.user_id = user_id
+    def __init__(self, uid: int, character: str):
+        """
+        Args:
+            uid (int): The UID of the Honkai: Star Rail player the character belongs to
+            character (str): The name of the character
+        """
+        self.uid = uid
         self.character = character
-        self.parsed_data = parsed_data
-        super().__init__(timeout=None)
+        super().__init__(
+            discord.ui.Button(
+                label="Lightcone",
+                style=discord.ButtonStyle.blurple,
+                emoji="🃏",
+                custom_id=f"koi:hsr:lightcone:{uid}:{character}",
+            )
+        )
 
-    @discord.ui.button(label="Lightcone", style=discord.ButtonStyle.blurple, emoji="🃏")
-    async def lightcone_button(
-        self, interaction: discord.Interaction, button: discord.ui.Button
-    ):
+    @classmethod
+    async def from_custom_id(
+        cls,
+        interaction: discord.Interaction,
+        item: discord.ui.Button,
+        match: re.Match[str],
+    ) -> "LightconeButton":
+        """Rebuilds the button from a message's component when it is clicked"""
+        return cls(int(match["uid"]), match["character"])
+
+    async def callback(self, interaction: discord.Interaction):
         await defer_with_logs(interaction, logger)
-        button.disabled = True
+        self.item.disabled = True
+        self.view.stop()  # type: ignore
+        # ^^ The view rebuilt from the message, stopped so editing the message doesn't store it
 
         try:
-            await interaction.followup.edit_message(interaction.message.id, view=self)  # type: ignore
+            await interaction.followup.edit_message(interaction.message.id, view=self.view)  # type: ignore
         except discord.HTTPException:
             logger.display_error(
-                f"[User {self.user_id}/hsr] command failed due to an HTTPException"
+                "[User %s/hsr] command failed due to an HTTPException",
+                interaction.user.id,
             )
         except discord.Forbidden:  # type: ignore
             logger.display_error(
-                f"[User {self.user_id}/hsr] cannot edit a message you did not send"
+                "[User %s/hsr] cannot edit a message you did not send",
+                interaction.user.id,
             )
         except TypeError:
             logger.display_error(
-                f"[User {self.user_id}/hsr] you specified both embed and embeds"
+                "[User %s/hsr] you specified both embed and embeds",
+                interaction.user.id,
             )
         except ValueError:
             logger.display_error(
-                f"[User {self.user_id}/hsr] invalid length of embeds parameter"
+                "[User %s/hsr] invalid length of embeds parameter",
+                interaction.user.id,
+            )
+
+        hsr_cog = interaction.client.get_cog("HSR")  # type: ignore
+        parsed_data = (
+            await hsr_cog.get_parsed_profile(self.uid) if hsr_cog is not None else None
+        )
+        if parsed_data is None or self.character not in parsed_data.character_names:
+            await send_followup_message_with_logs(
+                interaction,
+                logger,
+                "hsr/lightcone_button",
+                "This profile could not be loaded again, run /hsr for a new one",
             )
+            return
 
         await send_followup_message_with_logs(
             interaction,
             logger,
             "hsr/lightcone_button",
-            embed=self.parsed_data["lightcone_cards"][self.character],  # type: ignore
+            embed=parsed_data.lightcone_card(self.character),
+        )
+
+
+class CharacterCardView(PersistentView):
+    def __init__(
+        self,
+        user_id: int,
+        uid: int,
+        character: str,
+    ):
+        """The view sent with a character card, holding the lightcone button
+
+        Args:
+            user_id (int): The ID of the user who selected the character, used in logs
+            uid (int): The UID of the Honkai: Star Rail player the character belongs to
+            character (str): The name of the character
+        """
+        logger.display_notice(
+            "[User %s/hsr] creating character card view for `%s`",
+            user_id,
+            character,
         )
+        super().__init__(LightconeButton(uid, character))
@@ -1,63 +1,85 @@
+import re
+import typing
 import discord
 from models.character_card_view import CharacterCardView
-from typing import Dict
-from pythondebuglogger.Logger import Logger
+from models.embed_template import requester_footer
 from logger_help import (
+    QueuedLogger,
     send_followup_message_with_logs,
     defer_with_logs,
     send_response_message_with_logs,
 )
 
-logger: Logger = Logger(enable_timestamps=True)
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
 
 
-class CharacterDropdown(discord.ui.Select):
+class CharacterDropdown(
+    discord.ui.DynamicItem[discord.ui.Select],
+    template=r"koi:hsr:character:(?P<uid>[0-9]+):(?P<user_id>[0-9]+)",
+):
     """Character Dropdown Menu.
     Allows the user to select one of the characters on the profile of the Honkai: Star Rail player
+
+    The UID and the user allowed to use the menu are kept in its custom_id,
+    the profile itself is loaded from the HSR cog's caches when a character is selected.
     """
 
     def __init__(
         self,
+        uid: int,
         user_id: int,
-        parsed_data: Dict[str, discord.Embed] | Dict[str, Dict[str, discord.Embed]],
+        options: typing.List[discord.SelectOption],
     ):
+        """
+        Args:
+            uid (int): The UID of the Honkai: Star Rail player whose characters are listed
+            user_id (int): The ID of the user allowed to select a character
+            options (typing.List[discord.SelectOption]): One option per character
+        """
         logger.display_notice(
-            f"[User {user_id}/hsr] started creating character dropdown"
+            "[User %s/hsr] started creating character dropdown",
+            user_id,
         )
+        self.uid = uid
         self.user_id = user_id
-        self.parsed_data = parsed_data
 
-        options = self.make_options(parsed_data)
         super().__init__(
-            placeholder="Select a character",
-            max_values=1,
-            min_values=1,
-            options=options,
+            discord.ui.Select(
+                custom_id=f"koi:hsr:character:{uid}:{user_id}",
+                placeholder="Select a character",
+                max_values=1,
+                min_values=1,
+                options=options,
+            )
         )
 
+    @classmethod
+    async def from_custom_id(
+        cls,
+        interaction: discord.Interaction,
+        item: discord.ui.Select,
+        match: re.Match[str],
+    ) -> "CharacterDropdown":
+        """Rebuilds the dropdown from a message's component when someone selects a character"""
+        return cls(int(match["uid"]), int(match["user_id"]), item.options)
+
+    @staticmethod
     def make_options(
-        self,
-        parsed_data: Dict[str, discord.Embed] | Dict[str, Dict[str, discord.Embed]],
-    ) -> list[discord.SelectOption]:
-        """Converts the parsed data given into a list of discord select options to be added to the view
+        character_names: typing.List[str],
+    ) -> typing.List[discord.SelectOption]:
+        """Converts the character names given into a list of discord select options to be added to the view
 
         Args:
-            parsed_data (Dict[str, discord.Embed]): Information Retrieved from the Mihomo API and parsed by my parsing function in hsr.py
+            character_names (typing.List[str]): The names of the characters on the profile, in profile order
 
         Returns:
-            list[discord.SelectOption]: A list of discord.SelectOption objects. Both the label and value attributes are set to the character name
+            typing.List[discord.SelectOption]: A list of discord.SelectOption objects. Both the label and value attributes are set to the character name
         """
-        logger.display_notice(f"[User {self.user_id}/hsr] calling make_options()")
-        options = [
+        return [
             discord.SelectOption(label=character, value=character)
-            for character in parsed_data["characters"].title.split(", ")  # type: ignore
+            for character in character_names
         ]
 
-        logger.display_notice(
-            f"[User {self.user_id}/hsr] finished calling make_options()"
-        )
-        return options
-
     async def callback(self, interaction: discord.Interaction):
         if interaction.user.id != self.user_id:
             await send_response_message_with_logs(
@@ -71,22 +93,30 @@ class CharacterDropdown(discord.ui.Select):
 
         await defer_with_logs(interaction, logger)
 
-        character_embed = self.parsed_data["character_cards"][self.values[0]]  # type: ignore
-
-        user_profile_picture = ""
-        if interaction.user.avatar:
-            user_profile_picture = interaction.user.avatar.url
-
-        character_embed.set_footer(
-            text=f"Requested by: {interaction.user.name}", icon_url=user_profile_picture
+        character = self.item.values[0]
+        hsr_cog = interaction.client.get_cog("HSR")  # type: ignore
+        parsed_data = (
+            await hsr_cog.get_parsed_profile(self.uid) if hsr_cog is not None else None
         )
+        if parsed_data is None or character not in parsed_data.character_names:
+            # ^^ The API is unreachable, or the character left the profile's showcase since /hsr was run
+            await send_followup_message_with_logs(
+                interaction,
+                logger,
+                "hsr",
+                "This profile could not be loaded again, run /hsr for a new one",
+            )
+            return
+
+        character_embed = parsed_data.character_card(
+            character, footer=requester_footer(interaction.user)
+        )  # ^^ Rendered the first time anyone selects this character,
+        # each requester gets a copy with their own footer
 
         await send_followup_message_with_logs(
             interaction,
             logger,
             "hsr",
             embed=character_embed,
-            view=CharacterCardView(
-                interaction.user.id, self.values[0], self.parsed_data
-            ),
+            view=CharacterCardView(interaction.user.id, self.uid, character),
         )
@@ -0,0 +1,145 @@
+import os
+import typing
+import discord
+from models.Config import Config
+
+config = Config()
+
+CLUSTER_ID_VARIABLE = "KOI_CLUSTER_ID"
+SHARD_IDS_VARIABLE = "KOI_SHARD_IDS"
+SHARD_COUNT_VARIABLE = "KOI_SHARD_COUNT"
+# ^^ Environment variables launcher.py passes to each cluster process
+
+
+def make_intents(names: typing.Iterable[str]) -> discord.Intents:
+    """Builds gateway intents from their names
+
+    Args:
+        names (typing.Iterable[str]): Intent names as named on discord.Intents,
+        or the shorthands "default" and "all". Ex: ["guilds", "guild_messages"]
+
+    Returns:
+        discord.Intents: Only the named intents enabled
+
+    Raises:
+        ValueError: If a name is not a discord.Intents flag
+    """
+
+    intents = discord.Intents.none()
+    for name in names:
+        if name == "all":
+            intents = intents | discord.Intents.all()
+        elif name == "default":
+            intents = intents | discord.Intents.default()
+        elif name in discord.Intents.VALID_FLAGS:
+            setattr(intents, name, True)
+        else:
+            raise ValueError(f"Unknown intent `{name}`")
+
+    return intents
+
+
+def make_member_cache_flags(
+    names: typing.Iterable[str] | None, intents: discord.Intents
+) -> discord.MemberCacheFlags:
+    """Builds member cache flags from their names
+
+    Args:
+        names (typing.Iterable[str] | None): Flag names as named on discord.MemberCacheFlags. Ex: ["voice"]
+        None derives the flags from the intents, like discord.py does by default.
+        intents (discord.Intents): The intents the flags will be used with
+
+    Returns:
+        discord.MemberCacheFlags: Only the named flags enabled
+
+    Raises:
+        ValueError: If a name is not a discord.MemberCacheFlags flag,
+        or a flag needs an intent that is not enabled (voice needs voice_states, joined needs members)
+    """
+
+    if names is None:
+        return discord.MemberCacheFlags.from_intents(intents)
+
+    flags = discord.MemberCacheFlags.none()
+    for name in names:
+        if name not in discord.MemberCacheFlags.VALID_FLAGS:
+            raise ValueError(f"Unknown member cache flag `{name}`")
+        setattr(flags, name, True)
+
+    if flags.voice and not intents.voice_states:
+        raise ValueError(
+            "The `voice` member cache flag needs the `voice_states` intent"
+        )
+    if flags.joined and not intents.members:
+        raise ValueError("The `joined` member cache flag needs the `members` intent")
+
+    return flags
+
+
+def client_options() -> typing.Dict[str, typing.Any]:
+    """Reads the gateway and cache settings from config.json
+
+    Returns:
+        typing.Dict[str, typing.Any]: Keyword arguments for commands.Bot.
+        {"intents", "member_cache_flags", "max_messages", "chunk_guilds_at_startup"}
+
+    Raises:
+        ValueError: If an intent or member cache flag in config.json is invalid
+    """
+
+    intents = make_intents(config.INTENTS)
+    return {
+        "intents": intents,  # What the bot intends to use
+        "member_cache_flags": make_member_cache_flags(
+            config.MEMBER_CACHE_FLAGS, intents
+        ),  # Which members are kept in memory
+        "max_messages": config.MAX_MESSAGES,  # Message cache size, None disables it
+        "chunk_guilds_at_startup": config.CHUNK_GUILDS_AT_STARTUP,
+        # ^^ Whether to download every guild's member list on connect
+    }
+
+
+def cluster_id() -> int | None:
+    """Returns the cluster this process was started as by launcher.py
+
+    Returns:
+        int | None: The cluster ID, None when the bot was started directly with main.py
+    """
+    value = os.environ.get(CLUSTER_ID_VARIABLE)
+    return int(value) if value else None
+
+
+def shard_options() -> typing.Dict[str, typing.Any]:
+    """Reads which shards this process connects. launcher.py passes each cluster its
+    shard range through environment variables, otherwise every shard runs in this process.
+
+    Returns:
+        typing.Dict[str, typing.Any]: Keyword arguments for commands.AutoShardedBot. {"shard_count", "shard_ids"}
+        A shard_count of None lets discord recommend one.
+    """
+    shard_ids = os.environ.get(SHARD_IDS_VARIABLE)
+    if shard_ids:
+        return {
+            "shard_count": int(os.environ[SHARD_COUNT_VARIABLE]),
+            "shard_ids": [int(shard_id) for shard_id in shard_ids.split(",")],
+        }
+
+    return {"shard_count": config.SHARD_COUNT, "shard_ids": None}
+
+
+def owns_guild(guild_id: int) -> bool:
+    """Returns whether a guild is on one of this process's shards. Data kept per guild,
+    like leaderboard registrations, is only loaded by the cluster that receives its events.
+
+    Args:
+        guild_id (int): The guild
+
+    Returns:
+        bool: True when every shard runs in this process, or the guild's shard is one of its shard_ids
+    """
+    options = shard_options()
+    if options["shard_ids"] is None:
+        return True
+
+    return (guild_id >> 22) % options["shard_count"] in options["shard_ids"]
+    # ^^ Discord's shard formula
@@ -0,0 +1,235 @@
+import io
+import zlib
+import typing
+import base64
+import binascii
+
+# Inputs are walked in CHUNK_SIZE slices of a memoryview, so no step copies the whole input.
+# Each codec is a chain of stages that turn one chunk into output bytes, carrying over the few
+# bytes that don't fill a whole block until the next chunk.
+
+CHUNK_SIZE: int = 64 * 1024
+
+CODECS: typing.Dict[str, typing.Tuple[str, str]] = {
+    "base64": ("Base64", "b64"),
+    "base64-url": ("URL-safe Base64", "b64"),
+    "base32": ("Base32", "b32"),
+    "hex": ("Hex", "hex"),
+    "gzip-base64": ("Gzip + Base64", "gz.b64"),
+}  # ^^ Codec -> (display name, file extension added when encoding)
+
+WHITESPACE: bytes = b" \t\r\n"
+# ^^ Ignored when decoding, so wrapped output from other tools decodes too
+URLSAFE_TO_STANDARD: bytes = bytes.maketrans(b"-_", b"+/")
+
+
+class CodecError(Exception):
+    """Raised when an input can't be decoded, or the result would be too large"""
+
+
+class BlockStage:
+    """Runs a block codec over a stream, like base64 which turns every 3 bytes into 4 characters.
+
+    Only whole blocks are converted, the leftover bytes wait for the next chunk, and the last
+    partial block is converted by finish().
+    """
+
+    def __init__(
+        self,
+        convert: typing.Callable[[typing.Any], bytes],
+        block: int,
+        pad: bytes = b"",
+        strip: bytes = b"",
+    ) -> None:
+        """
+        Args:
+            convert (typing.Callable[[typing.Any], bytes]): Converts a whole number of blocks. Ex: base64.b64encode
+            block (int): Input bytes per block. Ex: 3 when encoding base64, 4 when decoding it
+            pad (bytes, optional): Fills the last partial block, so unpadded input decodes. Defaults to b"".
+            strip (bytes, optional): Bytes dropped from the input. Defaults to b"".
+        """
+        self.convert = convert
+        self.block: int = block
+        self.pad: bytes = pad
+        self.strip: bytes = strip
+        self.carry: bytes = b""
+
+    def feed(self, chunk: typing.Any) -> bytes:
+        if self.strip:
+            chunk = memoryview(bytes(chunk).translate(None, self.strip))
+        else:
+            chunk = memoryview(chunk)
+
+        output = b""
+        if self.carry:
+            needed = self.block - len(self.carry)
+            self.carry += chunk[:needed]
+            chunk = chunk[needed:]
+            if len(self.carry) < self.block:
+                return output
+            output, self.carry = self.convert(self.carry), b""
+
+        whole = len(chunk) - len(chunk) % self.block
+        self.carry = bytes(chunk[whole:])
+        if whole:
+            output += self.convert(chunk[:whole])  # Slicing a memoryview doesn't copy
+
+        return output
+
+    def finish(self) -> bytes:
+        if not self.carry:
+            return b""
+
+        carry, self.carry = self.carry, b""
+        if self.pad:
+            carry += self.pad * (-len(carry) % self.block)
+
+        return self.convert(carry)
+
+
+class GzipStage:
+    """Compresses or decompresses a gzip stream, limiting how much a decompression can produce"""
+
+    def __init__(self, decompress: bool, max_output: int) -> None:
+        """
+        Args:
+            decompress (bool): Whether to decompress instead of compress
+            max_output (int): Most bytes a decompression may produce, so a small bomb can't fill the memory
+        """
+        self.decompress: bool = decompress
+        self.remaining: int = max_output
+        self.stream: typing.Any = (
+            zlib.decompressobj(wbits=31)
+            if decompress
+            else zlib.compressobj(wbits=31)  # ^^ wbits=31 reads and writes gzip headers
+        )
+
+    def feed(self, chunk: typing.Any) -> bytes:
+        if not self.decompress:
+            return self.stream.compress(chunk)
+
+        output = self.stream.decompress(chunk, self.remaining + 1)
+        self.remaining -= len(output)
+        if self.remaining < 0 or self.stream.unconsumed_tail:
+            raise CodecError("The decompressed result is too large to upload.")
+
+        return output
+
+    def finish(self) -> bytes:
+        if not self.decompress:
+            return self.stream.flush()
+        if not self.stream.eof:
+            raise CodecError("The gzip data is incomplete.")
+
+        return b""
+
+
+def make_stages(codec: str, decode: bool, max_output: int) -> typing.List[typing.Any]:
+    """Builds the stages a codec's data goes through, in order
+
+    Args:
+        codec (str): One of CODECS
+        decode (bool): Whether to decode instead of encode
+        max_output (int): Most bytes the result may have
+
+    Returns:
+        typing.List[typing.Any]: The BlockStage and GzipStage chain
+    """
+    if codec == "hex":
+        if decode:
+            return [BlockStage(binascii.unhexlify, 2, strip=WHITESPACE)]
+        return [BlockStage(binascii.hexlify, 1)]
+
+    if codec == "base32":
+        if decode:
+            return [
+                BlockStage(
+                    lambda data: base64.b32decode(data, casefold=True),
+                    8,
+                    pad=b"=",
+                    strip=WHITESPACE,
+                )
+            ]
+        return [BlockStage(base64.b32encode, 5)]
+
+    if codec == "base64-url":
+        if decode:
+            return [
+                BlockStage(
+                    lambda data: base64.b64decode(
+                        bytes(data).translate(URLSAFE_TO_STANDARD), validate=True
+                    ),
+                    4,
+                    pad=b"=",
+                    strip=WHITESPACE,
+                )
+            ]
+        return [BlockStage(base64.urlsafe_b64encode, 3)]
+
+    if decode:
+        stages: typing.List[typing.Any] = [
+            BlockStage(
+                lambda data: base64.b64decode(data, validate=True),
+                4,
+                pad=b"=",
+                strip=WHITESPACE,
+            )
+        ]
+    else:
+        stages = [BlockStage(base64.b64encode, 3)]
+
+    if codec == "gzip-base64":
+        gzip = GzipStage(decode, max_output)
+        stages = stages + [gzip] if decode else [gzip] + stages
+
+    return stages
+
+
+def transcode(
+    data: typing.Any,
+    codec: str,
+    decode: bool,
+    max_output: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> io.BytesIO:
+    """Encodes or decodes data chunk by chunk. Blocking, run it in a worker thread.
+
+    Args:
+        data (typing.Any): The input, any bytes-like object
+        codec (str): One of CODECS
+        decode (bool): Whether to decode instead of encode
+        max_output (int): Most bytes the result may have. Ex: the upload limit
+        chunk_size (int, optional): Input bytes converted at a time. Defaults to CHUNK_SIZE.
+
+    Raises:
+        CodecError: The input isn't valid for the codec, or the result has more than max_output bytes
+
+    Returns:
+        io.BytesIO: The result, positioned at the start
+    """
+    stages = make_stages(codec, decode, max_output)
+    output = io.BytesIO()
+
+    def push(chunk: typing.Any, first_stage: int) -> None:
+        for stage in stages[first_stage:]:
+            if not chunk:
+                return
+            chunk = stage.feed(chunk)
+
+        if chunk:
+            output.write(chunk)
+            if output.tell() > max_output:
+                raise CodecError("The result is too large to upload.")
+
+    view = memoryview(data)
+    try:
+        for start in range(0, len(view), chunk_size):
+            push(view[start : start + chunk_size], 0)
+        for index, stage in enumerate(stages):
+            push(stage.finish(), index + 1)
+            # ^^ Flushes each stage into the ones after it, in order
+    except (binascii.Error, zlib.error) as e:
+        raise CodecError(f"The input is not valid {CODECS[codec][0]}.") from e
+
+    output.seek(0)
+    return output
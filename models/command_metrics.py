@@ -0,0 +1,190 @@
+import math
+import time
+import typing
+import contextlib
+from collections import defaultdict
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram.
+
+    Every bucket is `GROWTH` times wider than the previous one, so percentiles are accurate
+    to within a few percent while memory stays constant no matter how many samples are recorded.
+    """
+
+    MIN_SECONDS: float = 0.0001  # Anything faster lands in the first bucket
+    GROWTH: float = 1.05
+
+    def __init__(self) -> None:
+        self.buckets: typing.Dict[int, int] = defaultdict(int)
+        # ^^ bucket index -> amount of samples in it
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Adds a sample to the histogram
+
+        Args:
+            seconds (float): The measured duration
+        """
+        index = 0
+        if seconds > self.MIN_SECONDS:
+            index = int(math.log(seconds / self.MIN_SECONDS, self.GROWTH)) + 1
+
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """Returns the upper bound of the bucket containing the given percentile
+
+        Args:
+            percent (float): The percentile to look up. Ex: 95 for p95
+
+        Returns:
+            float: The percentile in seconds, 0 if nothing has been recorded
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.MIN_SECONDS * self.GROWTH**index, self.max)
+
+        return self.max
+
+
+class CommandMetrics:
+    """Per-command latency histograms, error counters and gauges.
+
+    Timings are grouped by command and phase, where the phase is a step of the command
+    like "defer", "fetch", "parse", "followup" or "total".
+    """
+
+    PERCENTILES: typing.Tuple[int, ...] = (50, 95, 99)
+
+    def __init__(self) -> None:
+        self.histograms: typing.Dict[str, typing.Dict[str, LatencyHistogram]] = (
+            defaultdict(lambda: defaultdict(LatencyHistogram))
+        )  # ^^ command -> phase -> histogram
+        self.errors: typing.Dict[str, int] = defaultdict(int)
+        # ^^ command -> amount of failed runs
+        self.gauges: typing.Dict[str, typing.Callable[[], typing.Dict[str, float]]] = {}
+        # ^^ gauge name -> function returning the current values, ex: cache counters
+
+    def record(self, command: str, phase: str, seconds: float) -> None:
+        """Records how long a phase of a command took
+
+        Args:
+            command (str): The command name. Ex: "hsr"
+            phase (str): The phase name. Ex: "fetch"
+            seconds (float): The measured duration
+        """
+        self.histograms[command][phase].record(seconds)
+
+    def record_error(self, command: str) -> None:
+        """Counts a failed run of a command
+
+        Args:
+            command (str): The command name. Ex: "hsr"
+        """
+        self.errors[command] += 1
+
+    @contextlib.contextmanager
+    def timer(self, command: str, phase: str) -> typing.Iterator[None]:
+        """Context manager that records how long its body took.
+        Errors are not counted here, call record_error() where a failure is handled.
+
+        Args:
+            command (str): The command name. Ex: "hsr"
+            phase (str): The phase name. Ex: "fetch"
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(command, phase, time.perf_counter() - start)
+
+    def register_gauges(
+        self, name: str, source: typing.Callable[[], typing.Dict[str, float]]
+    ) -> None:
+        """Registers a function whose values are reported alongside the latencies.
+        Registering the same name again replaces the previous function.
+
+        Args:
+            name (str): The gauge name. Ex: "hsr_profile_cache"
+            source (typing.Callable[[], typing.Dict[str, float]]): Returns the current values. Ex: ProfileCache.stats
+        """
+        self.gauges[name] = source
+
+    def snapshot(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """Returns the current latency percentiles and error counts
+
+        Returns:
+            typing.Dict[str, typing.Dict[str, typing.Any]]:
+            {command: {"errors": int, "phases": {phase: {"count": int, "p50": float, "p95": float, "p99": float, "max": float}}}}
+        """
+        snapshot: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        for command in sorted(set(self.histograms) | set(self.errors)):
+            phases = {}
+            for phase, histogram in sorted(self.histograms.get(command, {}).items()):
+                phases[phase] = {
+                    "count": histogram.count,
+                    **{
+                        f"p{percent}": histogram.percentile(percent)
+                        for percent in self.PERCENTILES
+                    },
+                    "max": histogram.max,
+                }
+
+            snapshot[command] = {
+                "errors": self.errors.get(command, 0),
+                "phases": phases,
+            }
+
+        return snapshot
+
+    def to_prometheus(self) -> str:
+        """Renders every metric in the Prometheus text exposition format
+
+        Returns:
+            str: The metrics, ready to be written to a .prom file
+        """
+        lines = [
+            "# HELP koi_command_latency_seconds Latency of each command phase",
+            "# TYPE koi_command_latency_seconds summary",
+        ]
+        for command, phases in sorted(self.histograms.items()):
+            for phase, histogram in sorted(phases.items()):
+                labels = f'command="{command}",phase="{phase}"'
+                for percent in self.PERCENTILES:
+                    lines.append(
+                        f'koi_command_latency_seconds{{{labels},quantile="{percent / 100}"}} {histogram.percentile(percent)}'
+                    )
+                lines.append(
+                    f"koi_command_latency_seconds_sum{{{labels}}} {histogram.total}"
+                )
+                lines.append(
+                    f"koi_command_latency_seconds_count{{{labels}}} {histogram.count}"
+                )
+
+        lines.append("# HELP koi_command_errors_total Failed runs of each command")
+        lines.append("# TYPE koi_command_errors_total counter")
+        for command, errors in sorted(self.errors.items()):
+            lines.append(f'koi_command_errors_total{{command="{command}"}} {errors}')
+
+        for name, source in sorted(self.gauges.items()):
+            lines.append(f"# TYPE koi_{name} gauge")
+            for key, value in source().items():
+                lines.append(f'koi_{name}{{key="{key}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+
+command_metrics = CommandMetrics()
+# ^^ Process wide metrics, shared by every cog and helper
@@ -0,0 +1,331 @@
+import sys
+import json
+import typing
+
+if typing.TYPE_CHECKING:
+    from mihomo.models import Attribute, Character, LightCone, StarrailInfoParsed
+
+# Compact, read-only copies of Mihomo's pydantic models, holding only what the card builders read.
+# Attribute names match the pydantic models, so the builders take either one.
+# Names, stat names and icon URLs repeat across profiles, so they are interned and stored once per process.
+
+
+class CompactStat:
+    """A character or light cone stat"""
+
+    __slots__ = ("name", "value", "is_percent", "displayed_value")
+
+    def __init__(
+        self, name: str, value: float, is_percent: bool, displayed_value: str
+    ) -> None:
+        self.name: str = sys.intern(name)
+        self.value: float = value
+        self.is_percent: bool = is_percent
+        self.displayed_value: str = displayed_value
+
+    @classmethod
+    def from_model(cls, attribute: "Attribute") -> "CompactStat":
+        return cls(
+            attribute.name,
+            attribute.value,
+            attribute.is_percent,
+            attribute.displayed_value,
+        )
+
+    def to_list(self) -> typing.List[typing.Any]:
+        return [self.name, self.value, self.is_percent, self.displayed_value]
+
+
+class CompactElement:
+    """A character's element, one instance per color"""
+
+    __slots__ = ("color",)
+    _instances: typing.Dict[str, "CompactElement"] = {}
+
+    def __new__(cls, color: str) -> "CompactElement":
+        element = cls._instances.get(color)
+        if element is None:
+            element = super().__new__(cls)
+            element.color = sys.intern(color)
+            cls._instances[color] = element
+
+        return element
+
+
+class CompactAvatar:
+    """A player's profile picture, one instance per icon"""
+
+    __slots__ = ("icon",)
+    _instances: typing.Dict[str, "CompactAvatar"] = {}
+
+    def __new__(cls, icon: str) -> "CompactAvatar":
+        avatar = cls._instances.get(icon)
+        if avatar is None:
+            avatar = super().__new__(cls)
+            avatar.icon = sys.intern(icon)
+            cls._instances[icon] = avatar
+
+        return avatar
+
+
+class CompactLightCone:
+    """The light cone a character has equipped"""
+
+    __slots__ = ("name", "level", "max_level", "portrait", "attributes", "properties")
+
+    def __init__(
+        self,
+        name: str,
+        level: int,
+        max_level: int,
+        portrait: str,
+        attributes: typing.Tuple[CompactStat, ...],
+        properties: typing.Tuple[CompactStat, ...],
+    ) -> None:
+        self.name: str = sys.intern(name)
+        self.level: int = level
+        self.max_level: int = max_level
+        self.portrait: str = sys.intern(portrait)
+        self.attributes: typing.Tuple[CompactStat, ...] = attributes
+        self.properties: typing.Tuple[CompactStat, ...] = properties
+
+    @classmethod
+    def from_model(cls, light_cone: "LightCone") -> "CompactLightCone":
+        return cls(
+            light_cone.name,
+            light_cone.level,
+            light_cone.max_level,
+            light_cone.portrait,
+            tuple(map(CompactStat.from_model, light_cone.attributes)),
+            tuple(map(CompactStat.from_model, light_cone.properties)),
+        )
+
+    @classmethod
+    def from_dict(cls, data: typing.Dict[str, typing.Any]) -> "CompactLightCone":
+        return cls(
+            data["name"],
+            data["level"],
+            data["max_level"],
+            data["portrait"],
+            tuple(CompactStat(*stat) for stat in data["attributes"]),
+            tuple(CompactStat(*stat) for stat in data["properties"]),
+        )
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "name": self.name,
+            "level": self.level,
+            "max_level": self.max_level,
+            "portrait": self.portrait,
+            "attributes": [stat.to_list() for stat in self.attributes],
+            "properties": [stat.to_list() for stat in self.properties],
+        }
+
+
+class CompactCharacter:
+    """A character on a player's profile"""
+
+    __slots__ = (
+        "name",
+        "level",
+        "max_level",
+        "eidolon",
+        "icon",
+        "preview",
+        "element",
+        "attributes",
+        "additions",
+        "light_cone",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        level: int,
+        max_level: int,
+        eidolon: int,
+        icon: str,
+        preview: str,
+        element: CompactElement,
+        attributes: typing.Tuple[CompactStat, ...],
+        additions: typing.Tuple[CompactStat, ...],
+        light_cone: CompactLightCone | None,
+    ) -> None:
+        self.name: str = sys.intern(name)
+        self.level: int = level
+        self.max_level: int = max_level
+        self.eidolon: int = eidolon
+        self.icon: str = sys.intern(icon)
+        self.preview: str = sys.intern(preview)
+        self.element: CompactElement = element
+        self.attributes: typing.Tuple[CompactStat, ...] = attributes
+        self.additions: typing.Tuple[CompactStat, ...] = additions
+        self.light_cone: CompactLightCone | None = light_cone
+
+    @classmethod
+    def from_model(cls, character: "Character") -> "CompactCharacter":
+        return cls(
+            character.name,
+            character.level,
+            character.max_level,
+            character.eidolon,
+            character.icon,
+            character.preview,
+            CompactElement(character.element.color),
+            tuple(map(CompactStat.from_model, character.attributes)),
+            tuple(map(CompactStat.from_model, character.additions)),
+            (
+                None
+                if character.light_cone is None
+                else CompactLightCone.from_model(character.light_cone)
+            ),
+        )
+
+    @classmethod
+    def from_dict(cls, data: typing.Dict[str, typing.Any]) -> "CompactCharacter":
+        return cls(
+            data["name"],
+            data["level"],
+            data["max_level"],
+            data["eidolon"],
+            data["icon"],
+            data["preview"],
+            CompactElement(data["element"]),
+            tuple(CompactStat(*stat) for stat in data["attributes"]),
+            tuple(CompactStat(*stat) for stat in data["additions"]),
+            (
+                None
+                if data["light_cone"] is None
+                else CompactLightCone.from_dict(data["light_cone"])
+            ),
+        )
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "name": self.name,
+            "level": self.level,
+            "max_level": self.max_level,
+            "eidolon": self.eidolon,
+            "icon": self.icon,
+            "preview": self.preview,
+            "element": self.element.color,
+            "attributes": [stat.to_list() for stat in self.attributes],
+            "additions": [stat.to_list() for stat in self.additions],
+            "light_cone": (
+                None if self.light_cone is None else self.light_cone.to_dict()
+            ),
+        }
+
+
+class CompactPlayer:
+    """The general information on a player's profile"""
+
+    __slots__ = (
+        "uid",
+        "name",
+        "level",
+        "world_level",
+        "friend_count",
+        "achievements",
+        "characters",
+        "light_cones",
+        "avatar",
+    )
+
+    FIELDS: typing.Tuple[str, ...] = __slots__[:-1]  # Everything but the avatar
+
+    def __init__(
+        self,
+        uid: int,
+        name: str,
+        level: int,
+        world_level: int,
+        friend_count: int,
+        achievements: int,
+        characters: int,
+        light_cones: int,
+        avatar: CompactAvatar,
+    ) -> None:
+        self.uid: int = uid
+        self.name: str = name  # Not interned, player names rarely repeat
+        self.level: int = level
+        self.world_level: int = world_level
+        self.friend_count: int = friend_count
+        self.achievements: int = achievements
+        self.characters: int = characters
+        self.light_cones: int = light_cones
+        self.avatar: CompactAvatar = avatar
+
+
+class CompactProfile:
+    """A player's profile with only the fields the player, character and light cone cards read.
+    Takes a fraction of the memory of the StarrailInfoParsed it is built from, see benchmarks/memory_benchmark.py.
+    """
+
+    __slots__ = ("player", "characters")
+
+    def __init__(
+        self, player: CompactPlayer, characters: typing.Tuple[CompactCharacter, ...]
+    ) -> None:
+        self.player: CompactPlayer = player
+        self.characters: typing.Tuple[CompactCharacter, ...] = characters
+
+    @classmethod
+    def from_model(cls, hsr_info: "StarrailInfoParsed") -> "CompactProfile":
+        """Copies what the cards need out of a profile parsed by mihomo
+
+        Args:
+            hsr_info (StarrailInfoParsed): The information retrieved from Mihomo's API
+
+        Returns:
+            CompactProfile: The compact copy
+        """
+        player = hsr_info.player
+        return cls(
+            CompactPlayer(
+                *(getattr(player, field) for field in CompactPlayer.FIELDS),
+                CompactAvatar(player.avatar.icon),
+            ),
+            tuple(map(CompactCharacter.from_model, hsr_info.characters)),
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "CompactProfile":
+        """Reads a profile written by to_json, used to load profiles from the profile store
+
+        Args:
+            text (str): The JSON text
+
+        Returns:
+            CompactProfile: The profile
+
+        Raises:
+            ValueError: If the text isn't a profile written by to_json
+        """
+        try:
+            data = json.loads(text)
+            return cls(
+                CompactPlayer(
+                    *(data["player"][field] for field in CompactPlayer.FIELDS),
+                    CompactAvatar(data["player"]["avatar"]),
+                ),
+                tuple(map(CompactCharacter.from_dict, data["characters"])),
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Not a compact profile: {e!r}") from e
+
+    def to_json(self) -> str:
+        """Writes the profile as JSON text, read back by from_json
+
+        Returns:
+            str: The JSON text
+        """
+        player = {field: getattr(self.player, field) for field in CompactPlayer.FIELDS}
+        player["avatar"] = self.player.avatar.icon
+        return json.dumps(
+            {
+                "player": player,
+                "characters": [character.to_dict() for character in self.characters],
+            },
+            ensure_ascii=False,
+        )
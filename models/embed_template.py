@@ -0,0 +1,77 @@
+import types
+import typing
+import discord
+
+
+def _freeze(value: typing.Any) -> typing.Any:
+    """Turns the dicts and lists of an embed dict into read-only mappings and tuples"""
+    if isinstance(value, dict):
+        return types.MappingProxyType(
+            {key: _freeze(item) for key, item in value.items()}
+        )
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+
+    return value
+
+
+def _thaw(value: typing.Any) -> typing.Any:
+    """Copies a frozen value back into the dicts and lists discord.py sends"""
+    if isinstance(value, types.MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+
+    return value
+
+
+class EmbedTemplate:
+    """An embed rendered once and kept as an immutable dict, safe to share between users.
+
+    discord.Embed.copy() is shallow, so fields added or edited on a copy change the original too.
+    render() instead builds a new embed whose nested dicts and lists are its own, and overlays
+    like a "Requested by" footer are applied to that copy only. The cached body is never touched.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, embed: discord.Embed) -> None:
+        """
+        Args:
+            embed (discord.Embed): The fully built embed, it is not referenced afterwards
+        """
+        self._data: types.MappingProxyType = _freeze(embed.to_dict())
+
+    def render(self, **overlays: typing.Any) -> discord.Embed:
+        """Returns a new embed with the template's content and the overlays applied
+
+        Args:
+            **overlays (typing.Any): Top level embed keys to replace, in discord's embed format.
+            Ex: footer={"text": "Requested by: koi", "icon_url": "https://..."}
+
+        Returns:
+            discord.Embed: A new embed, changing it doesn't change the template
+        """
+        data = {key: _thaw(value) for key, value in self._data.items()}
+        data.update(overlays)
+        return discord.Embed.from_dict(data)
+
+    def to_dict(self) -> typing.Mapping[str, typing.Any]:
+        """Returns the template's read-only embed dict"""
+        return self._data
+
+
+def requester_footer(user: discord.abc.User) -> typing.Dict[str, str]:
+    """Builds the "Requested by" footer overlay for a user
+
+    Args:
+        user (discord.abc.User): The user who asked for the card
+
+    Returns:
+        typing.Dict[str, str]: The footer, in discord's embed format
+    """
+    footer = {"text": f"Requested by: {user.name}"}
+    if user.avatar:
+        footer["icon_url"] = user.avatar.url
+
+    return footer
@@ -0,0 +1,76 @@
+import math
+import time
+import typing
+from collections import deque
+from discord.ext import commands
+
+
+class GatewayMonitor:
+    """Gateway latency and event rate of the shards running in this process.
+
+    Events are counted in one second buckets, and only the last `WINDOW` seconds are kept,
+    so the reported rate follows the current load instead of the average since startup.
+    """
+
+    WINDOW: int = 60  # Seconds the event rate is averaged over
+
+    def __init__(self, client: commands.AutoShardedBot, cluster_id: int | None) -> None:
+        """
+        Args:
+            client (commands.AutoShardedBot): The bot whose shards are monitored
+            cluster_id (int | None): The cluster this process runs as, None when not started by launcher.py
+        """
+        self.client: commands.AutoShardedBot = client
+        self.cluster_id: int | None = cluster_id
+        self.events_total: int = 0
+        self.started_at: float = time.monotonic()
+        self._buckets: typing.Deque[typing.List[int]] = deque()
+        # ^^ [second, amount of events], oldest first
+
+    def record_event(self) -> None:
+        """Counts one gateway event, called for every event the shards receive"""
+        second = int(time.monotonic())
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += 1
+        else:
+            self._buckets.append([second, 1])
+            while self._buckets[0][0] <= second - self.WINDOW:
+                self._buckets.popleft()
+
+        self.events_total += 1
+
+    def events_per_second(self) -> float:
+        """Returns the average gateway event rate over the last `WINDOW` seconds
+
+        Returns:
+            float: Events per second
+        """
+        now = time.monotonic()
+        oldest_counted = int(now) - self.WINDOW
+        events = sum(
+            count for second, count in self._buckets if second > oldest_counted
+        )
+        return events / max(1.0, min(self.WINDOW, now - self.started_at))
+
+    def stats(self) -> typing.Dict[str, float]:
+        """Returns the gauges reported by /stats and the Prometheus export
+
+        Returns:
+            typing.Dict[str, float]: {"cluster", "shards", "latency_ms", "latency_max_ms", "events_total", "events_per_s"}
+        """
+        latencies = [
+            latency
+            for _, latency in self.client.latencies
+            if not math.isnan(latency) and not math.isinf(latency)
+        ]  # ^^ Shards that haven't received a heartbeat acknowledgement yet have no latency
+
+        return {
+            "cluster": self.cluster_id if self.cluster_id is not None else 0,
+            "shards": len(self.client.shards),
+            "latency_ms": (
+                round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0
+            ),
+            "latency_max_ms": round(max(latencies) * 1000, 1) if latencies else 0.0,
+            "events_total": self.events_total,
+            "events_per_s": round(self.events_per_second(), 2),
+        }
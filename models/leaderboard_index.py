@@ -0,0 +1,168 @@
+import bisect
+import typing
+
+METRICS: typing.Dict[str, str] = {
+    "achievements": "Achievements",
+    "level": "Trailblaze Level",
+    "characters": "Characters Owned",
+}  # ^^ Metric key, as stored on entries -> display name
+
+
+class LeaderboardIndex:
+    """Registered Honkai: Star Rail players of every guild, ranked per metric.
+
+    Every guild keeps one sorted list per metric of (-value, user ID), so the top k
+    players are the first k items and nothing is sorted when a leaderboard is read.
+    Entries are plain dicts, so they can be stored as they are in the profile store:
+    {"uid": int, "name": str | None, "achievements": int, "level": int, "characters": int, "refreshed_at": float}
+    The metrics and name are missing until the player's profile was fetched once.
+    """
+
+    def __init__(self) -> None:
+        self.entries: typing.Dict[
+            int, typing.Dict[int, typing.Dict[str, typing.Any]]
+        ] = {}
+        # ^^ guild ID -> user ID -> entry
+        self._indexes: typing.Dict[
+            typing.Tuple[int, str], typing.List[typing.Tuple[int, int]]
+        ] = {}  # ^^ (guild ID, metric) -> [(-value, user ID)], sorted
+        self._members_by_uid: typing.Dict[int, typing.Set[typing.Tuple[int, int]]] = {}
+        # ^^ UID -> every (guild ID, user ID) registered with it
+
+    def _unindex(self, guild_id: int, user_id: int) -> None:
+        entry = self.entries.get(guild_id, {}).get(user_id)
+        if entry is None or "refreshed_at" not in entry:
+            return
+
+        for metric in METRICS:
+            index = self._indexes[(guild_id, metric)]
+            position = bisect.bisect_left(index, (-entry[metric], user_id))
+            if position < len(index) and index[position] == (-entry[metric], user_id):
+                del index[position]
+
+    def _index(self, guild_id: int, user_id: int) -> None:
+        entry = self.entries[guild_id][user_id]
+        if "refreshed_at" not in entry:
+            return  # Not fetched yet, nothing to rank by
+
+        for metric in METRICS:
+            bisect.insort(
+                self._indexes.setdefault((guild_id, metric), []),
+                (-entry[metric], user_id),
+            )
+
+    def register(
+        self, guild_id: int, user_id: int, entry: typing.Dict[str, typing.Any]
+    ) -> None:
+        """Adds or replaces a member's registration
+
+        Args:
+            guild_id (int): The guild the member registered in
+            user_id (int): The member's user ID
+            entry (typing.Dict[str, typing.Any]): The registration, at least {"uid": int}
+        """
+        self.unregister(guild_id, user_id)
+        self.entries.setdefault(guild_id, {})[user_id] = entry
+        self._members_by_uid.setdefault(entry["uid"], set()).add((guild_id, user_id))
+        self._index(guild_id, user_id)
+
+    def unregister(
+        self, guild_id: int, user_id: int
+    ) -> typing.Dict[str, typing.Any] | None:
+        """Removes a member's registration
+
+        Args:
+            guild_id (int): The guild the member registered in
+            user_id (int): The member's user ID
+
+        Returns:
+            typing.Dict[str, typing.Any] | None: The removed registration, None if there was none
+        """
+        self._unindex(guild_id, user_id)
+        entry = self.entries.get(guild_id, {}).pop(user_id, None)
+        if entry is not None:
+            members = self._members_by_uid[entry["uid"]]
+            members.discard((guild_id, user_id))
+            if not members:
+                del self._members_by_uid[entry["uid"]]
+
+        return entry
+
+    def update_player(
+        self, uid: int, values: typing.Dict[str, typing.Any]
+    ) -> typing.List[typing.Tuple[int, int]]:
+        """Updates the name and metrics of every registration of a UID
+
+        Args:
+            uid (int): The player's UID
+            values (typing.Dict[str, typing.Any]): {"name", "achievements", "level", "characters", "refreshed_at"}
+
+        Returns:
+            typing.List[typing.Tuple[int, int]]: The (guild ID, user ID) of every updated registration
+        """
+        members = list(self._members_by_uid.get(uid, ()))
+        for guild_id, user_id in members:
+            self._unindex(guild_id, user_id)
+            self.entries[guild_id][user_id].update(values)
+            self._index(guild_id, user_id)
+
+        return members
+
+    def refreshed_at(self, uid: int) -> float:
+        """Returns when a registered UID was last fetched, as a unix timestamp. 0 if it never was"""
+        guild_id, user_id = next(iter(self._members_by_uid[uid]))
+        return self.entries[guild_id][user_id].get("refreshed_at", 0.0)
+        # ^^ Every registration of a UID is updated together, so any of them will do
+
+    def uids(self) -> typing.List[int]:
+        """Returns every registered UID once, least recently refreshed first
+
+        Returns:
+            typing.List[int]: The UIDs, never refreshed ones first
+        """
+        return sorted(self._members_by_uid, key=self.refreshed_at)
+
+    def top(
+        self, guild_id: int, metric: str, k: int
+    ) -> typing.List[typing.Tuple[int, typing.Dict[str, typing.Any]]]:
+        """Returns the k best ranked members of a guild for a metric
+
+        Args:
+            guild_id (int): The guild
+            metric (str): A key of METRICS. Ex: "achievements"
+            k (int): The amount of members to return
+
+        Returns:
+            typing.List[typing.Tuple[int, typing.Dict[str, typing.Any]]]: [(user ID, entry)], best first
+        """
+        guild_entries = self.entries.get(guild_id, {})
+        return [
+            (user_id, guild_entries[user_id])
+            for _, user_id in self._indexes.get((guild_id, metric), [])[:k]
+        ]
+
+    def rank(self, guild_id: int, metric: str, user_id: int) -> int | None:
+        """Returns a member's place on a guild's leaderboard
+
+        Args:
+            guild_id (int): The guild
+            metric (str): A key of METRICS. Ex: "achievements"
+            user_id (int): The member's user ID
+
+        Returns:
+            int | None: The place, starting at 1. None if the member isn't ranked yet
+        """
+        entry = self.entries.get(guild_id, {}).get(user_id)
+        if entry is None or "refreshed_at" not in entry:
+            return None
+
+        return (
+            bisect.bisect_left(
+                self._indexes[(guild_id, metric)], (-entry[metric], user_id)
+            )
+            + 1
+        )
+
+    def ranked_count(self, guild_id: int) -> int:
+        """Returns how many members of a guild are ranked"""
+        return len(self._indexes.get((guild_id, next(iter(METRICS))), []))
@@ -0,0 +1,185 @@
+import re
+import typing
+import discord
+from models.audit_log import audit_log
+from models.persistent_view import PersistentView
+from logger_help import (
+    QueuedLogger,
+    defer_with_logs,
+    edit_followup_message_with_logs,
+    send_response_message_with_logs,
+)
+
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
+
+MODLOG_HEX = 0x73BCF8
+PAGE_SIZE = 10
+
+
+class ModlogFilters(typing.NamedTuple):
+    """What /modlog was asked for, kept in the page buttons' custom_id. 0 and "" mean no filter."""
+
+    target_id: int
+    actor_id: int
+    action: str
+    since: int  # ^^ UNIX timestamp, fixed when the command runs so every page covers the same span
+
+    def encode(self) -> str:
+        return f"{self.target_id}:{self.actor_id}:{self.action}:{self.since}"
+
+    def describe(self) -> str:
+        parts = []
+        if self.action:
+            parts.append(f"{self.action}s")
+        if self.target_id:
+            parts.append(f"on <@{self.target_id}>")
+        if self.actor_id:
+            parts.append(f"by <@{self.actor_id}>")
+        if self.since:
+            parts.append(f"since <t:{self.since}:d>")
+
+        return " ".join(parts) or "every action"
+
+
+async def build_modlog_page(
+    guild_id: int,
+    filters: ModlogFilters,
+    before_id: int | None = None,
+    after_id: int | None = None,
+) -> typing.Tuple[discord.Embed, PersistentView]:
+    """Loads one page of the audit log and builds its embed and page buttons
+
+    Args:
+        guild_id (int): The guild whose actions are listed
+        filters (ModlogFilters): The filters given to /modlog
+        before_id (int | None, optional): Show the page older than this row ID. Defaults to None.
+        after_id (int | None, optional): Show the page newer than this row ID. Defaults to None, the newest page.
+
+    Returns:
+        typing.Tuple[discord.Embed, PersistentView]: The page and its Newer and Older buttons
+    """
+    rows = await audit_log.query(
+        guild_id,
+        target_id=filters.target_id or None,
+        actor_id=filters.actor_id or None,
+        action=filters.action or None,
+        since=filters.since or None,
+        before_id=before_id,
+        after_id=after_id,
+        limit=PAGE_SIZE + 1,
+    )  # ^^ One extra row tells whether there is another page past this one
+
+    if after_id is not None:
+        has_newer, has_older = len(rows) > PAGE_SIZE, True
+        rows = rows[-PAGE_SIZE:]
+    else:
+        has_newer, has_older = before_id is not None, len(rows) > PAGE_SIZE
+        rows = rows[:PAGE_SIZE]
+
+    lines = []
+    for row in rows:
+        line = (
+            f"`#{row['id']}` <t:{int(row['created_at'])}:R> **{row['action']}** "
+            f"<@{row['target_id']}> by <@{row['actor_id']}>"
+        )
+        if row["details"]:
+            line += f" ({row['details']})"
+        if row["reason"]:
+            line += f": {discord.utils.escape_markdown(row['reason'][:100])}"
+        lines.append(line)
+
+    embed = discord.Embed(
+        color=MODLOG_HEX,
+        title="Moderation Log",
+        description="\n".join(lines) or "No moderation actions recorded.",
+    )
+    embed.set_footer(text=f"Newest first · {PAGE_SIZE} per page")
+    embed.add_field(name="Showing", value=filters.describe())
+
+    first_id, last_id = (rows[0]["id"], rows[-1]["id"]) if rows else (0, 0)
+    view = PersistentView(
+        ModlogPageButton("newer", first_id, filters, disabled=not (rows and has_newer)),
+        ModlogPageButton("older", last_id, filters, disabled=not (rows and has_older)),
+    )
+    return embed, view
+
+
+class ModlogPageButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"koi:modlog:(?P<direction>newer|older):(?P<cursor>[0-9]+):(?P<target_id>[0-9]+):(?P<actor_id>[0-9]+):(?P<action>[a-z]*):(?P<since>[0-9]+)",
+):
+    """Turns a /modlog page. The row ID to page from and the filters are kept in its custom_id,
+    so the buttons keep working after a restart. Anyone who can view the audit log can use them.
+    """
+
+    def __init__(
+        self,
+        direction: str,
+        cursor: int,
+        filters: ModlogFilters,
+        disabled: bool = False,
+    ):
+        """
+        Args:
+            direction (str): "newer" or "older"
+            cursor (int): The row ID the next page starts after, in the given direction
+            filters (ModlogFilters): The filters given to /modlog
+            disabled (bool, optional): Whether there is no page in that direction. Defaults to False.
+        """
+        self.direction = direction
+        self.cursor = cursor
+        self.filters = filters
+        super().__init__(
+            discord.ui.Button(
+                label="Newer" if direction == "newer" else "Older",
+                style=discord.ButtonStyle.gray,
+                emoji="◀️" if direction == "newer" else "▶️",
+                custom_id=f"koi:modlog:{direction}:{cursor}:{filters.encode()}",
+                disabled=disabled,
+            )
+        )
+
+    @classmethod
+    async def from_custom_id(
+        cls,
+        interaction: discord.Interaction,
+        item: discord.ui.Button,
+        match: re.Match[str],
+    ) -> "ModlogPageButton":
+        """Rebuilds the button from a message's component when it is clicked"""
+        filters = ModlogFilters(
+            int(match["target_id"]),
+            int(match["actor_id"]),
+            match["action"],
+            int(match["since"]),
+        )
+        return cls(match["direction"], int(match["cursor"]), filters)
+
+    async def callback(self, interaction: discord.Interaction):
+        if not interaction.permissions.view_audit_log:
+            await send_response_message_with_logs(
+                interaction,
+                logger,
+                "modlog/button-callback",
+                "You need the View Audit Log permission to browse the moderation log.",
+                ephemeral=True,
+            )
+            return
+
+        message_id: int = interaction.message.id  # type: ignore
+        await defer_with_logs(interaction, logger)
+
+        embed, view = await build_modlog_page(
+            interaction.guild_id,  # type: ignore
+            self.filters,
+            before_id=self.cursor if self.direction == "older" else None,
+            after_id=self.cursor if self.direction == "newer" else None,
+        )
+        await edit_followup_message_with_logs(
+            interaction,
+            logger,
+            "modlog/button-callback",
+            message_id,
+            embed=embed,
+            view=view,
+        )
@@ -0,0 +1,103 @@
+import typing
+import discord
+from discord.ext import commands
+from models.embed_template import EmbedTemplate
+
+if typing.TYPE_CHECKING:
+    from models.compact_profile import CompactCharacter, CompactProfile
+
+
+class ParsedProfile:
+    """Lazily rendered Honkai: Star Rail profile.
+
+    Holds the data retrieved from Mihomo's API and the HSR cog's card builders.
+    Each card is rendered the first time it is asked for and kept as an EmbedTemplate,
+    so characters nobody opens are never rendered. Every request gets its own copy of the card,
+    with its overlays like the requester footer, and the kept card is never changed.
+    """
+
+    def __init__(self, hsr_info: "CompactProfile", hsr_cog: commands.Cog) -> None:
+        """
+        Args:
+            hsr_info (CompactProfile): The information retrieved from Mihomo's API
+            hsr_cog (commands.Cog): The HSR cog, which owns the card builders
+        """
+        self.hsr_info: "CompactProfile" = hsr_info
+        self.hsr_cog = hsr_cog
+
+        self._characters: typing.Dict[str, "CompactCharacter"] = {
+            character.name: character for character in hsr_info.characters
+        }  # ^^ Character name -> character, used to look up which character to render
+
+        self._player_card: EmbedTemplate | None = None
+        self._character_cards: typing.Dict[str, EmbedTemplate] = {}
+        self._lightcone_cards: typing.Dict[str, EmbedTemplate] = {}
+        # ^^ Pre-rendered cards, filled in as they are requested
+
+    @property
+    def uid(self) -> int:
+        """The UID of the player this profile belongs to"""
+        return self.hsr_info.player.uid
+
+    @property
+    def character_names(self) -> typing.List[str]:
+        """The names of the characters on the player's profile, in profile order"""
+        return list(self._characters)
+
+    @property
+    def player_card(self) -> discord.Embed:
+        """A copy of the player card, rendered on first access"""
+        if self._player_card is None:
+            self._player_card = EmbedTemplate(
+                self.hsr_cog.make_player_card(self.hsr_info)  # type: ignore
+            )
+
+        return self._player_card.render()
+
+    def character_card(
+        self, character_name: str, **overlays: typing.Any
+    ) -> discord.Embed:
+        """Returns a copy of the character card for a character, rendering it on first access
+
+        Args:
+            character_name (str): The name of a character on the profile
+            **overlays (typing.Any): Embed keys to replace on this copy only, see EmbedTemplate.render
+
+        Returns:
+            discord.Embed: The character card
+
+        Raises:
+            KeyError: If the character is not on the profile
+        """
+        card = self._character_cards.get(character_name)
+        if card is None:
+            card = EmbedTemplate(
+                self.hsr_cog.make_character_card(self._characters[character_name])  # type: ignore
+            )
+            self._character_cards[character_name] = card
+
+        return card.render(**overlays)
+
+    def lightcone_card(
+        self, character_name: str, **overlays: typing.Any
+    ) -> discord.Embed:
+        """Returns a copy of the lightcone card for a character, rendering it on first access
+
+        Args:
+            character_name (str): The name of a character on the profile
+            **overlays (typing.Any): Embed keys to replace on this copy only, see EmbedTemplate.render
+
+        Returns:
+            discord.Embed: The lightcone card
+
+        Raises:
+            KeyError: If the character is not on the profile
+        """
+        card = self._lightcone_cards.get(character_name)
+        if card is None:
+            card = EmbedTemplate(
+                self.hsr_cog.make_lightcone_card(self._characters[character_name])  # type: ignore
+            )
+            self._lightcone_cards[character_name] = card
+
+        return card.render(**overlays)
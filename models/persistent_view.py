@@ -0,0 +1,22 @@
+import discord
+
+
+class PersistentView(discord.ui.View):
+    """A view made only of DynamicItems.
+
+    The bot dispatches DynamicItems by matching their custom_id against the templates registered
+    with client.add_dynamic_items, so nothing about the message has to be kept in memory for its
+    components to work, including after a restart. The view is stopped as soon as it is built:
+    discord.py does not store finished views, so sending one pins neither the view nor its data.
+    """
+
+    def __init__(self, *items: discord.ui.DynamicItem) -> None:
+        """
+        Args:
+            *items (discord.ui.DynamicItem): The components of the view, in display order
+        """
+        super().__init__(timeout=None)
+        for item in items:
+            self.add_item(item)
+
+        self.stop()
@@ -0,0 +1,141 @@
+import time
+import typing
+import asyncio
+from collections import OrderedDict
+
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
+
+
+class ProfileCache(typing.Generic[K, V]):
+    """In-process cache for fetched profiles.
+
+    Entries are evicted least recently used first once `max_size` is reached,
+    and expire `ttl` seconds after they were stored.
+    Concurrent lookups for the same key share a single in-flight fetch.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 300.0) -> None:
+        """
+        Args:
+            max_size (int, optional): Maximum amount of entries kept in the cache. Defaults to 256.
+            ttl (float, optional): Amount of seconds an entry stays valid for. Defaults to 300.0.
+        """
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+
+        self._entries: OrderedDict[K, typing.Tuple[float, V]] = OrderedDict()
+        # ^^ key -> (expiry timestamp, value), ordered from least to most recently used
+        self._in_flight: typing.Dict[K, asyncio.Task] = {}
+        # ^^ key -> task currently fetching the value for that key
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+        self.evictions: int = 0
+        # ^^ Counters exposed through stats()
+
+    def get(self, key: K) -> V | None:
+        """Returns the cached value for a key if it exists and has not expired
+
+        Args:
+            key (K): The cache key
+
+        Returns:
+            V | None: The cached value, or None if there is no valid entry
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():  # The entry is stale
+            del self._entries[key]
+            self.evictions += 1
+            return None
+
+        self._entries.move_to_end(key)  # Mark as most recently used
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        """Stores a value in the cache, evicting the least recently used entries if the cache is full
+
+        Args:
+            key (K): The cache key
+            value (V): The value to store
+        """
+
+        if self.max_size <= 0:
+            return  # Caching is disabled
+
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """Removes a key from the cache if it is present
+
+        Args:
+            key (K): The cache key
+        """
+        self._entries.pop(key, None)
+
+    async def get_or_fetch(
+        self, key: K, fetcher: typing.Callable[[K], typing.Awaitable[V]]
+    ) -> V:
+        """Returns the cached value for a key, calling `fetcher` on a miss.
+        If a fetch for the same key is already running, waits for that one instead of starting another.
+        Exceptions raised by `fetcher` are propagated to every waiting caller and nothing is cached.
+
+        Args:
+            key (K): The cache key
+            fetcher (typing.Callable[[K], typing.Awaitable[V]]): Coroutine function used to fetch a missing value
+
+        Returns:
+            V: The cached or freshly fetched value
+        """
+
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._in_flight.get(key)
+        if task is not None:  # Someone else is already fetching this key
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fetch(key, fetcher))
+            self._in_flight[key] = task
+
+        return await asyncio.shield(task)
+        # ^^ Shielded so a cancelled caller does not cancel the fetch for everyone else
+
+    async def _fetch(
+        self, key: K, fetcher: typing.Callable[[K], typing.Awaitable[V]]
+    ) -> V:
+        try:
+            value = await fetcher(key)
+            self.put(key, value)
+            return value
+        finally:
+            self._in_flight.pop(key, None)
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Returns the cache counters, useful for tuning the size and TTL
+
+        Returns:
+            typing.Dict[str, int]: {"size", "in_flight", "hits", "misses", "coalesced", "evictions"}
+        """
+        return {
+            "size": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,410 @@
+import json
+import math
+import time
+import typing
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from models.Config import Config
+from models.command_metrics import command_metrics
+from logger_help import QueuedLogger
+
+config = Config()
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
+
+DELETED = object()  # Queued in place of a payload to delete it with the next batch
+
+
+class ProfileStore:
+    """On-disk SQLite store for payloads fetched from the APIs, so a restart doesn't start with cold caches.
+    The same class keeps guild settings in a separate file, see settings_store below.
+
+    Every payload is stored under a namespace and key with the time it was fetched and when it expires.
+    The database runs in WAL mode, so clusters sharing the file can read while another one writes.
+    All queries run on one worker thread that owns the connection. Writes are queued and
+    committed in batches, every `flush_interval` seconds or once `batch_size` payloads are queued.
+    """
+
+    MAX_FLUSH_RETRIES: int = 10
+    # ^^ A batch that fails to commit is retried this many times in a row before it is given up on
+    SCHEMA: typing.Tuple[str, ...] = (
+        """
+        CREATE TABLE IF NOT EXISTS payloads (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS payloads_expires_at ON payloads (expires_at)",
+    )
+
+    def __init__(
+        self, path: str, flush_interval: float = 1.0, batch_size: int = 128
+    ) -> None:
+        """
+        Args:
+            path (str): The database file. An empty string disables the store.
+            flush_interval (float, optional): Longest a queued write waits before it is committed, in seconds. Defaults to 1.0.
+            batch_size (int, optional): Amount of queued writes that triggers a commit right away. Defaults to 128.
+        """
+        self.path: str = path
+        self.flush_interval: float = flush_interval
+        self.batch_size: int = batch_size
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="profile-store"
+        )  # ^^ The only thread that touches the connection, so queries never run concurrently
+        self._connection: sqlite3.Connection | None = None
+        # ^^ Opened by the worker thread on first use
+        self._pending: typing.Dict[
+            typing.Tuple[str, str], typing.Tuple[typing.Any, float, typing.Callable]
+        ] = {}
+        # ^^ (namespace, key) -> (value, expiry timestamp, encoder), waiting to be written
+        self._flush_task: asyncio.Task | None = None
+        self._batch_full: asyncio.Event | None = None
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.writes: int = 0
+        self.flushes: int = 0
+        self.errors: int = 0
+        self.dropped: int = 0
+        # ^^ Counters exposed through stats()
+        self._failed_flushes: int = 0
+        # ^^ Failed commits in a row, of the writes queued again after the last failure
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens the database on the worker thread, creating the table and dropping expired rows"""
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            # ^^ With WAL, NORMAL only risks the last commits on power loss, never corruption
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+            connection.execute(
+                "DELETE FROM payloads WHERE expires_at <= ?", (time.time(),)
+            )
+            connection.commit()
+            self._connection = connection
+
+        return self._connection
+
+    def _read(
+        self, namespace: str, key: str, decode: typing.Callable[[str], typing.Any]
+    ) -> typing.Any:
+        row = (
+            self._connect()
+            .execute(
+                "SELECT payload FROM payloads WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time()),
+            )
+            .fetchone()
+        )
+        return None if row is None else decode(row[0])
+
+    def _write(
+        self,
+        batch: typing.Dict[
+            typing.Tuple[str, str], typing.Tuple[typing.Any, float, typing.Callable]
+        ],
+    ) -> None:
+        now = time.time()
+        rows = [
+            (namespace, key, encode(value), now, expires_at)
+            for (namespace, key), (value, expires_at, encode) in batch.items()
+            if value is not DELETED
+        ]  # ^^ Encoded here, so serializing large profiles doesn't block the event loop
+        deleted = [
+            (namespace, key)
+            for (namespace, key), (value, _, _) in batch.items()
+            if value is DELETED
+        ]
+
+        connection = self._connect()
+        with connection:  # One transaction for the whole batch
+            connection.executemany(
+                "INSERT OR REPLACE INTO payloads (namespace, key, payload, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            connection.executemany(
+                "DELETE FROM payloads WHERE namespace = ? AND key = ?", deleted
+            )
+            connection.execute("DELETE FROM payloads WHERE expires_at <= ?", (now,))
+
+    async def get(
+        self,
+        namespace: str,
+        key: typing.Any,
+        decode: typing.Callable[[str], typing.Any] = json.loads,
+    ) -> typing.Any:
+        """Returns a stored payload if it exists and has not expired
+
+        Args:
+            namespace (str): What kind of payload it is. Ex: "hsr"
+            key (typing.Any): The payload's key within the namespace, converted to a string. Ex: 613792348
+            decode (typing.Callable[[str], typing.Any], optional): Turns the stored text back into the payload,
+            called on the worker thread. Defaults to json.loads.
+
+        Returns:
+            typing.Any: The payload, or None if there is no valid stored payload
+        """
+        if not self.enabled:
+            return None
+
+        pending = self._pending.get((namespace, str(key)))
+        if pending is not None and pending[0] is DELETED:
+            self.misses += 1
+            return None  # Deleted, but not written yet
+        if pending is not None and pending[1] > time.time():
+            self.hits += 1
+            return pending[0]  # Not written yet, but already known
+
+        try:
+            value = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._read, namespace, str(key), decode
+            )
+        except (sqlite3.Error, ValueError) as e:
+            # ^^ ValueError covers payloads that no longer decode, like a profile from an older mihomo
+            self.errors += 1
+            logger.display_error(
+                "[ProfileStore.get()] failed to read `%s/%s`: %s", namespace, key, e
+            )
+            return None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return value
+
+    def put(
+        self,
+        namespace: str,
+        key: typing.Any,
+        value: typing.Any,
+        ttl: float,
+        encode: typing.Callable[[typing.Any], str] = json.dumps,
+    ) -> None:
+        """Queues a payload to be stored, it is committed with the next batch
+
+        Args:
+            namespace (str): What kind of payload it is. Ex: "hsr"
+            key (typing.Any): The payload's key within the namespace, converted to a string. Ex: 613792348
+            value (typing.Any): The payload
+            ttl (float): Amount of seconds the payload stays valid for, math.inf keeps it until it is deleted
+            encode (typing.Callable[[typing.Any], str], optional): Turns the payload into text,
+            called on the worker thread. Defaults to json.dumps.
+        """
+        if not self.enabled or ttl <= 0:
+            return
+
+        self._pending[(namespace, str(key))] = (value, time.time() + ttl, encode)
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._batch_full is None:
+            self._batch_full = asyncio.Event()
+        if len(self._pending) >= self.batch_size:
+            self._batch_full.set()
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    def delete(self, namespace: str, key: typing.Any) -> None:
+        """Queues a payload to be deleted, it is deleted with the next batch
+
+        Args:
+            namespace (str): What kind of payload it is. Ex: "hsr-leaderboard"
+            key (typing.Any): The payload's key within the namespace, converted to a string
+        """
+        if not self.enabled:
+            return
+
+        self._pending[(namespace, str(key))] = (DELETED, 0.0, json.dumps)
+        self._schedule_flush()
+
+    def _read_namespace(
+        self, namespace: str, decode: typing.Callable[[str], typing.Any]
+    ) -> typing.Dict[str, typing.Any]:
+        rows = (
+            self._connect()
+            .execute(
+                "SELECT key, payload FROM payloads WHERE namespace = ? AND expires_at > ?",
+                (namespace, time.time()),
+            )
+            .fetchall()
+        )
+        return {key: decode(payload) for key, payload in rows}
+
+    async def load_namespace(
+        self,
+        namespace: str,
+        decode: typing.Callable[[str], typing.Any] = json.loads,
+    ) -> typing.Dict[str, typing.Any]:
+        """Returns every valid payload of a namespace, including queued writes and deletes
+
+        Args:
+            namespace (str): What kind of payloads to load. Ex: "hsr-leaderboard"
+            decode (typing.Callable[[str], typing.Any], optional): Turns the stored text back into a payload,
+            called on the worker thread. Defaults to json.loads.
+
+        Returns:
+            typing.Dict[str, typing.Any]: {key: payload}, empty if the store is disabled or can't be read
+        """
+        if not self.enabled:
+            return {}
+
+        try:
+            payloads = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._read_namespace, namespace, decode
+            )
+        except (sqlite3.Error, ValueError) as e:
+            self.errors += 1
+            logger.display_error(
+                "[ProfileStore.load_namespace()] failed to read `%s`: %s", namespace, e
+            )
+            return {}
+
+        for (pending_namespace, key), (value, expires_at, _) in list(
+            self._pending.items()
+        ):
+            if pending_namespace != namespace:
+                continue
+            if value is DELETED or expires_at <= time.time():
+                payloads.pop(key, None)
+            else:
+                payloads[key] = value
+
+        return payloads
+
+    async def _flush_later(self) -> None:
+        assert self._batch_full is not None
+        try:
+            await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+        except asyncio.TimeoutError:
+            pass
+
+        self._batch_full.clear()
+        self._flush_task = None  # Writes queued from now on start the next batch
+        await self.flush()
+        if self._pending and self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+            # ^^ The commit failed and the batch was queued again, retry it after the next interval
+
+    async def flush(self) -> None:
+        """Commits every queued write now. A batch that fails to commit, like when another
+        cluster holds the database lock, is queued again under any newer writes to the same keys
+        and retried by the next flush, up to MAX_FLUSH_RETRIES times in a row.
+        """
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._write, batch
+            )
+            self.writes += len(batch)
+            self.flushes += 1
+            self._failed_flushes = 0
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            # ^^ Type and value errors come from encoders
+            self.errors += 1
+            self._failed_flushes += 1
+            if self._failed_flushes > self.MAX_FLUSH_RETRIES:
+                self.dropped += len(batch)
+                self._failed_flushes = 0
+                logger.display_error(
+                    "[ProfileStore.flush()] gave up on %s payloads after %s retries: %s",
+                    len(batch),
+                    self.MAX_FLUSH_RETRIES,
+                    e,
+                )
+                return
+
+            self._pending = {**batch, **self._pending}
+            # ^^ Writes queued while this batch was committing are newer, they win
+            logger.display_warning(
+                "[ProfileStore.flush()] failed to write %s payloads, will retry: %s",
+                len(batch),
+                e,
+            )
+
+    async def move_namespace(self, source: "ProfileStore", namespace: str) -> None:
+        """Moves every payload of a namespace from another store into this one,
+        used to move settings saved by older versions out of the profile cache
+
+        Args:
+            source (ProfileStore): The store to move them out of
+            namespace (str): What kind of payloads to move. Ex: "automod"
+        """
+        payloads = await source.load_namespace(namespace)
+        if not payloads:
+            return
+
+        for key, payload in payloads.items():
+            self.put(namespace, key, payload, math.inf)
+        await self.flush()
+        if any(
+            pending_namespace == namespace for pending_namespace, _ in self._pending
+        ):
+            return  # Not committed, the originals stay until the next start tries again
+
+        for key in payloads:
+            source.delete(namespace, key)
+        await source.flush()
+        logger.display_notice(
+            "[ProfileStore.move_namespace()] moved %s `%s` entries",
+            len(payloads),
+            namespace,
+        )
+
+    async def close(self) -> None:
+        """Commits the queued writes and closes the database"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._batch_full = None  # Bound to this event loop
+
+        await self.flush()
+        if self._flush_task is not None:
+            self._flush_task.cancel()  # A retry scheduled by a failed flush
+            self._flush_task = None
+        if self._connection is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._connection.close
+            )
+            self._connection = None
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Returns the store counters
+
+        Returns:
+            typing.Dict[str, int]: {"pending", "hits", "misses", "writes", "flushes", "errors", "dropped"}
+        """
+        return {
+            "pending": len(self._pending),
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "errors": self.errors,
+            "dropped": self.dropped,
+        }
+
+
+profile_store = ProfileStore(config.PROFILE_STORE_LOCATION)
+# ^^ Process wide store, shared by the HSR and Retroachievements cogs
+command_metrics.register_gauges("profile_store", profile_store.stats)
+
+settings_store = ProfileStore(config.SETTINGS_STORE_LOCATION)
+# ^^ Guild settings and registrations, kept out of the profile cache so turning the cache off never loses them
+command_metrics.register_gauges("settings_store", settings_store.stats)
@@ -0,0 +1,184 @@
+import enum
+import heapq
+import time
+import typing
+import asyncio
+import itertools
+
+
+class Priority(enum.IntEnum):
+    """Order in which queued requests are let through, lowest value first"""
+
+    INTERACTIVE = 0  # Someone is waiting on a command or a component
+    BACKGROUND = 1  # Refreshes nobody is waiting on
+
+
+class Ticket:
+    """A place in a RateLimiter's queue. Await wait() before making the request."""
+
+    def __init__(
+        self,
+        limiter: "RateLimiter",
+        priority: Priority,
+        sequence: int,
+        future: asyncio.Future,
+    ) -> None:
+        self.limiter: "RateLimiter" = limiter
+        self.priority: Priority = priority
+        self.sequence: int = sequence
+        self.future: asyncio.Future = future
+        self.queued_at: float = time.monotonic()
+
+    def __lt__(self, other: "Ticket") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+    @property
+    def position(self) -> int:
+        """Amount of requests that will be let through before this one, 0 once it is let through"""
+        if self.future.done():
+            return 0
+
+        return sum(
+            1
+            for ticket in self.limiter._queue
+            if ticket < self and not ticket.future.done()
+        )
+
+    @property
+    def estimated_wait(self) -> float:
+        """Seconds until this request is let through, if no higher priority request arrives"""
+        if self.future.done():
+            return 0.0
+
+        return self.limiter.wait_for_tokens(self.position + 1)
+
+    async def wait(self) -> None:
+        """Waits until the request is let through. Cancelling the wait gives up the place in the queue."""
+        await self.future
+
+
+class RateLimiter:
+    """Token bucket rate limiter with a priority queue of waiting requests.
+
+    The bucket holds up to `burst` tokens and gains `rate` tokens per second, every request takes one.
+    Requests that find the bucket empty are queued, and let through by priority, then in arrival order,
+    as tokens come back. A request only skips the queue when nobody is queued.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """
+        Args:
+            rate (float): Requests let through per second, on average
+            burst (int): Requests that can be let through at once after a quiet period
+        """
+        self.rate: float = rate
+        self.burst: int = max(1, burst)
+
+        self._tokens: float = float(self.burst)
+        self._updated_at: float = time.monotonic()
+        self._queue: typing.List[Ticket] = []  # ^^ Heap of waiting tickets
+        self._sequence = itertools.count()
+        self._dispatcher: asyncio.Task | None = None
+
+        self.granted: int = 0
+        self.queued: int = 0
+        self.longest_wait: float = 0.0
+        # ^^ Counters exposed through stats()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def wait_for_tokens(self, amount: int) -> float:
+        """Returns how long until `amount` tokens will have been available, in seconds
+
+        Args:
+            amount (int): The amount of tokens
+
+        Returns:
+            float: Seconds, 0 if they are available now
+        """
+        self._refill()
+        return max(0.0, (amount - self._tokens) / self.rate)
+
+    def reserve(self, priority: Priority = Priority.INTERACTIVE) -> Ticket:
+        """Takes a place in the queue, or a token right away if nobody is queued
+
+        Args:
+            priority (Priority, optional): The request's priority. Defaults to Priority.INTERACTIVE.
+
+        Returns:
+            Ticket: The request's place, with its queue position and estimated wait
+        """
+        ticket = Ticket(
+            self,
+            priority,
+            next(self._sequence),
+            asyncio.get_running_loop().create_future(),
+        )
+
+        self._refill()
+        if not self._pending() and self._tokens >= 1:
+            self._tokens -= 1
+            self.granted += 1
+            ticket.future.set_result(None)
+            return ticket
+
+        heapq.heappush(self._queue, ticket)
+        self.queued += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+        return ticket
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Waits until a request may be made
+
+        Args:
+            priority (Priority, optional): The request's priority. Defaults to Priority.INTERACTIVE.
+        """
+        await self.reserve(priority).wait()
+
+    def _pending(self) -> bool:
+        """Drops cancelled tickets from the front of the queue, then returns whether anyone is still queued"""
+        while self._queue and self._queue[0].future.done():
+            heapq.heappop(self._queue)
+
+        return bool(self._queue)
+
+    async def _dispatch(self) -> None:
+        """Lets queued tickets through as tokens come back, until the queue is empty"""
+        while self._pending():
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+
+            ticket = heapq.heappop(self._queue)
+            if ticket.future.done():  # Cancelled while the dispatcher slept
+                continue
+
+            self._tokens -= 1
+            self.granted += 1
+            self.longest_wait = max(
+                self.longest_wait, time.monotonic() - ticket.queued_at
+            )
+            ticket.future.set_result(None)
+
+    def stats(self) -> typing.Dict[str, float]:
+        """Returns the limiter counters
+
+        Returns:
+            typing.Dict[str, float]: {"tokens", "waiting", "granted", "queued", "longest_wait_s"}
+        """
+        self._refill()
+        return {
+            "tokens": round(self._tokens, 2),
+            "waiting": sum(1 for ticket in self._queue if not ticket.future.done()),
+            "granted": self.granted,
+            "queued": self.queued,
+            "longest_wait_s": round(self.longest_wait, 3),
+        }
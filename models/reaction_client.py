@@ -0,0 +1,137 @@
+import time
+import typing
+import asyncio
+import aiohttp
+from collections import deque
+from logger_help import QueuedLogger
+
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
+
+
+class ReactionClient:
+    """Async client for otakugifs reaction gifs.
+
+    Shares one keep-alive aiohttp session, and keeps a buffer of ready gif URLs for each
+    reaction type it has been asked for. A background task tops the buffers up, so most
+    lookups are answered from memory without waiting on the API.
+    """
+
+    BASE_URL: str = "https://api.otakugifs.xyz/gif"
+
+    def __init__(
+        self,
+        buffer_size: int = 5,
+        refill_interval: float = 2.0,
+        max_age: float = 600.0,
+        timeout: float = 10.0,
+    ) -> None:
+        """
+        Args:
+            buffer_size (int, optional): Amount of ready URLs kept per reaction type. Defaults to 5.
+            refill_interval (float, optional): Seconds between background refill passes. Defaults to 2.0.
+            max_age (float, optional): Seconds a buffered URL stays usable before it is evicted. Defaults to 600.0.
+            timeout (float, optional): Total timeout for a single request, in seconds. Defaults to 10.0.
+        """
+        self.buffer_size: int = buffer_size
+        self.refill_interval: float = refill_interval
+        self.max_age: float = max_age
+        self.timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(total=timeout)
+
+        self._buffers: typing.Dict[str, typing.Deque[typing.Tuple[float, str]]] = {}
+        # ^^ reaction -> (fetched at, url), oldest first
+        self._session: aiohttp.ClientSession | None = None
+        self._refill_task: asyncio.Task | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Returns the shared session, creating it on first use so it is bound to the running event loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+
+        return self._session
+
+    def start(self, reactions: typing.Iterable[str] = ()) -> None:
+        """Starts the background refill task
+
+        Args:
+            reactions (typing.Iterable[str], optional): Reaction types to start buffering right away. Ex: ("hug", "pat")
+        """
+        for reaction in reactions:
+            self._buffers.setdefault(reaction, deque())
+
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill_loop())
+
+    async def close(self) -> None:
+        """Stops the refill task and closes the shared session"""
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            self._refill_task = None
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def fetch_gif(self, reaction: str) -> str | None:
+        """Requests a single gif URL straight from the API
+
+        Args:
+            reaction (str): The otakugifs reaction type. Ex: "hug"
+
+        Returns:
+            str | None: The gif URL, or None if the request failed
+        """
+
+        try:
+            async with self._get_session().get(
+                self.BASE_URL, params={"reaction": reaction}
+            ) as response:
+                data = await response.json(content_type=None)
+
+            return data.get("url")
+        except Exception as e:
+            logger.display_error(
+                "[ReactionClient.fetch_gif()] failed to retrieve a `%s` gif: %s",
+                reaction,
+                e,
+            )
+            return None
+
+    async def get_gif(self, reaction: str) -> str | None:
+        """Returns a gif URL for a reaction type, from the buffer when possible.
+        The reaction type starts being buffered the first time it is asked for.
+
+        Args:
+            reaction (str): The otakugifs reaction type. Ex: "hug"
+
+        Returns:
+            str | None: The gif URL, or None if the buffer was empty and the request failed
+        """
+
+        buffer = self._buffers.setdefault(reaction, deque())
+        self._evict_stale(buffer)
+
+        if buffer:
+            return buffer.popleft()[1]
+
+        logger.display_debug(
+            "[ReactionClient.get_gif()] `%s` buffer is empty, requesting directly",
+            reaction,
+        )
+        return await self.fetch_gif(reaction)
+
+    def _evict_stale(self, buffer: typing.Deque[typing.Tuple[float, str]]) -> None:
+        oldest_allowed = time.monotonic() - self.max_age
+        while buffer and buffer[0][0] < oldest_allowed:
+            buffer.popleft()
+
+    async def _refill_loop(self) -> None:
+        while True:
+            for reaction, buffer in list(self._buffers.items()):
+                self._evict_stale(buffer)
+                if len(buffer) >= self.buffer_size:
+                    continue
+
+                url = await self.fetch_gif(reaction)
+                if url is not None:
+                    buffer.append((time.monotonic(), url))
+
+            await asyncio.sleep(self.refill_interval)
@@ -1,86 +1,130 @@
+import re
 import discord
-from discord.ext import commands
-from pythondebuglogger.Logger import Logger
+from models.persistent_view import PersistentView
 from logger_help import (
+    QueuedLogger,
     send_followup_message_with_logs,
     defer_with_logs,
     edit_followup_message_with_logs,
 )
 
-
 blue = 0x73BCF8  # Hex color blue stored for embed usage
-logger: Logger = Logger(enable_timestamps=True)
+logger: QueuedLogger = QueuedLogger(enable_timestamps=True)
 
 
-class RetroGameInfoView(discord.ui.View):
-    def __init__(self, dict_game_info_and_progress_stdout: dict, timeout=None):
-        self.dict_game_info_and_progress_stdout = dict_game_info_and_progress_stdout
-        super().__init__(timeout=timeout)
+def make_game_info_embed(game_info: dict) -> discord.Embed:
+    """Builds the game information embed from the game info and user progress data
 
-    @discord.ui.button(
-        label="Game Information", style=discord.ButtonStyle.blurple, emoji="🎮"
-    )  # type: ignore
-    async def callback(self, interaction: discord.Interaction, button: discord.Button):
-        message_id: int = interaction.message.id  # type: ignore
-        await defer_with_logs(interaction, logger)
+    Args:
+        game_info (dict): The response of RetroAchievementsClient.get_game_info_and_user_progress
 
-        # Setup Variables
-        game_title: str = self.dict_game_info_and_progress_stdout.get(
-            "title", "GET-FAILED"
-        )
-        game_icon: str = (
-            "https://media.retroachievements.org"
-            + self.dict_game_info_and_progress_stdout.get("imageIcon", "GET-FAILED")
-        )
-        game_developer: str = self.dict_game_info_and_progress_stdout.get(
-            "developer", "GET-FAILED"
-        )
-        game_publisher: str = self.dict_game_info_and_progress_stdout.get(
-            "publisher", "GET-FAILED"
-        )
-        game_genre: str = self.dict_game_info_and_progress_stdout.get(
-            "genre", "GET-FAILED"
-        )
-        game_release_date: str = self.dict_game_info_and_progress_stdout.get(
-            "released", "GET-FAILED"
-        )
-        game_console: str = self.dict_game_info_and_progress_stdout.get(
-            "consoleName", "GET-FAILED"
-        )
+    Returns:
+        discord.Embed: The game information embed
+    """
 
-        game_achievement_count: int = self.dict_game_info_and_progress_stdout.get(
-            "numAchievements", "GET-FAILED"
-        )
-        user_unlocked_softcore: int = self.dict_game_info_and_progress_stdout.get(
-            "numAwardedToUser", "GET-FAILED"
-        )
-        user_unlocked_hardcore: int = self.dict_game_info_and_progress_stdout.get(
-            "numAwardedToUserHardcore", "GET-FAILED"
-        )
+    # Setup Variables
+    game_title: str = game_info.get("title", "GET-FAILED")
+    game_icon: str = "https://media.retroachievements.org" + game_info.get(
+        "imageIcon", "GET-FAILED"
+    )
+    game_developer: str = game_info.get("developer", "GET-FAILED")
+    game_publisher: str = game_info.get("publisher", "GET-FAILED")
+    game_genre: str = game_info.get("genre", "GET-FAILED")
+    game_release_date: str = game_info.get("released", "GET-FAILED")
+    game_console: str = game_info.get("consoleName", "GET-FAILED")
 
-        user_completion_softcore: str = self.dict_game_info_and_progress_stdout.get(
-            "userCompletion", "GET-FAILED"
-        )
-        user_completion_hardcore: str = self.dict_game_info_and_progress_stdout.get(
-            "userCompletionHardcore", "GET-FAILED"
+    game_achievement_count: int = game_info.get("numAchievements", "GET-FAILED")
+    user_unlocked_softcore: int = game_info.get("numAwardedToUser", "GET-FAILED")
+    user_unlocked_hardcore: int = game_info.get(
+        "numAwardedToUserHardcore", "GET-FAILED"
+    )
+
+    user_completion_softcore: str = game_info.get("userCompletion", "GET-FAILED")
+    user_completion_hardcore: str = game_info.get(
+        "userCompletionHardcore", "GET-FAILED"
+    )
+
+    # Construct Embed
+    description = (
+        f"**Developer: {game_developer}**\n"
+        f"**Publisher: {game_publisher}**\n"
+        f"**Genre: {game_genre}**\n"
+        f"**Released: {game_release_date}**\n"
+        f"**Console: {game_console}**\n"
+        "\n**Achievement Stats:**\n"
+        f"**Softcore: {user_unlocked_softcore}/{game_achievement_count} ({user_completion_softcore})**\n"
+        f"**Hardcore: {user_unlocked_hardcore}/{game_achievement_count} ({user_completion_hardcore})**\n"
+    )  # ^^ Built in one expression instead of growing the embed's description
+
+    output_embed: discord.Embed = discord.Embed(
+        title=game_title, color=blue, description=description
+    )
+    output_embed.set_thumbnail(url=game_icon)
+
+    return output_embed
+
+
+class GameInfoButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"koi:retro:game:(?P<game_id>[0-9]+):(?P<username>.+)",
+):
+    """Sends the game information of the last game a RetroAchievements user played.
+    The game ID and username are kept in its custom_id, the game information is loaded
+    from the Retroachievements cog's cache when it is clicked.
+    """
+
+    def __init__(self, game_id: int, username: str):
+        """
+        Args:
+            game_id (int): The RetroAchievements game ID
+            username (str): The RetroAchievements username whose progress is shown
+        """
+        self.game_id = game_id
+        self.username = username
+        super().__init__(
+            discord.ui.Button(
+                label="Game Information",
+                style=discord.ButtonStyle.blurple,
+                emoji="🎮",
+                custom_id=f"koi:retro:game:{game_id}:{username}",
+            )
         )
 
-        # Construct Embed
-        output_embed: discord.Embed = discord.Embed(
-            title=game_title, color=blue, description=""
+    @classmethod
+    async def from_custom_id(
+        cls,
+        interaction: discord.Interaction,
+        item: discord.ui.Button,
+        match: re.Match[str],
+    ) -> "GameInfoButton":
+        """Rebuilds the button from a message's component when it is clicked"""
+        return cls(int(match["game_id"]), match["username"])
+
+    async def callback(self, interaction: discord.Interaction):
+        message_id: int = interaction.message.id  # type: ignore
+        await defer_with_logs(interaction, logger)
+
+        retro_cog = interaction.client.get_cog("Retroachievements")  # type: ignore
+        game_card = (
+            await retro_cog.get_game_card(self.username, self.game_id)
+            if retro_cog is not None
+            else None
         )
-        output_embed.set_thumbnail(url=game_icon)
-        output_embed.description += f"**Developer: {game_developer}**\n"  # type: ignore
-        output_embed.description += f"**Publisher: {game_publisher}**\n"
-        output_embed.description += f"**Genre: {game_genre}**\n"
-        output_embed.description += f"**Released: {game_release_date}**\n"
-        output_embed.description += f"**Console: {game_console}**\n"
+        if game_card is None:
+            await send_followup_message_with_logs(
+                interaction,
+                logger,
+                "retro-profile/button-callback",
+                message="⚠️ Could not load the game information, please try again later.",
+            )
+            return
 
-        output_embed.description += "\n**Achievement Stats:**\n"
-        output_embed.description += f"**Softcore: {user_unlocked_softcore}/{game_achievement_count} ({user_completion_softcore})**\n"
-        output_embed.description += f"**Hardcore: {user_unlocked_hardcore}/{game_achievement_count} ({user_completion_hardcore})**\n"
+        output_embed: discord.Embed = game_card.render()
+        # ^^ A copy of the card rendered when anyone first opened this game
 
-        button.disabled = True  # Disable the button after it is clicked
+        self.item.disabled = True  # Disable the button after it is clicked
+        self.view.stop()  # type: ignore
+        # ^^ The view rebuilt from the message, stopped so editing the message doesn't store it
 
         # Respond To User
         await send_followup_message_with_logs(
@@ -91,5 +135,16 @@ class RetroGameInfoView(discord.ui.View):
             logger,
             "retro-profile/button-callback-edit",
             message_id,
-            view=self,
+            view=self.view,  # type: ignore
         )
+
+
+class RetroGameInfoView(PersistentView):
+    def __init__(self, game_id: int, username: str):
+        """The view sent with /retro-profile, holding the game information button
+
+        Args:
+            game_id (int): The ID of the last game the user played
+            username (str): The RetroAchievements username
+        """
+        super().__init__(GameInfoButton(game_id, username))
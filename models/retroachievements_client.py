@@ -0,0 +1,155 @@
+import typing
+import aiohttp
+
+
+class RetroAchievementsError(Exception):
+    """Raised when the RetroAchievements API returns something unusable"""
+
+
+def camel_case_key(key: str) -> str:
+    """Converts a RetroAchievements API key to camelCase,
+    the same way the @retroachievements/api javascript package does.
+
+    Args:
+        key (str): The original key. Ex: "LastGameID", "UserPic", "ID"
+
+    Returns:
+        str: The camelCase key. Ex: "lastGameId", "userPic", "id"
+    """
+
+    if key.upper() == key:  # "ID" -> "id", "URL" -> "url"
+        return key.lower()
+
+    camel_cased = key[:1].lower() + key[1:]  # "GameID" -> "gameID"
+    camel_cased = camel_cased.replace("ID", "Id", 1)  # "gameID" -> "gameId"
+    camel_cased = camel_cased.replace("URL", "Url", 1)  # "badgeURL" -> "badgeUrl"
+    camel_cased = camel_cased.replace("rA", "ra", 1)  # "rAPoints" -> "raPoints"
+    return camel_cased
+
+
+def serialize_properties(data: typing.Any) -> typing.Any:
+    """Recursively converts every key of an API response to camelCase
+
+    Args:
+        data (typing.Any): The decoded JSON response
+
+    Returns:
+        typing.Any: The same data with camelCase keys
+    """
+
+    if isinstance(data, dict):
+        return {
+            camel_case_key(str(key)): serialize_properties(value)
+            for key, value in data.items()
+        }
+
+    if isinstance(data, list):
+        return [serialize_properties(value) for value in data]
+
+    return data
+
+
+class RetroAchievementsClient:
+    """In-process asyncio client for the RetroAchievements web API.
+
+    Uses one pooled aiohttp session for every request,
+    and returns the same JSON shape as the @retroachievements/api javascript package.
+    """
+
+    BASE_URL: str = "https://retroachievements.org/API"
+
+    def __init__(
+        self,
+        username: str,
+        api_key: str,
+        timeout: float = 10.0,
+        max_connections: int = 10,
+    ) -> None:
+        """
+        Args:
+            username (str): The RetroAchievements username the API key belongs to
+            api_key (str): The RetroAchievements web API key
+            timeout (float, optional): Total timeout for a single request, in seconds. Defaults to 10.0.
+            max_connections (int, optional): Maximum amount of pooled connections. Defaults to 10.
+        """
+        self.username: str = username
+        self.api_key: str = api_key
+        self.timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_connections: int = max_connections
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Returns the pooled session, creating it on first use so it is bound to the running event loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+            )
+
+        return self._session
+
+    async def close(self) -> None:
+        """Closes the pooled session, should be called when the owning cog is unloaded"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def request(
+        self, endpoint: str, params: typing.Dict[str, str | int]
+    ) -> typing.Dict[str, typing.Any]:
+        """Calls a RetroAchievements API endpoint with authorization attached
+
+        Args:
+            endpoint (str): The endpoint name. Ex: "API_GetUserProfile.php"
+            params (typing.Dict[str, str | int]): Query parameters for the endpoint
+
+        Returns:
+            typing.Dict[str, typing.Any]: The response with camelCase keys
+
+        Raises:
+            RetroAchievementsError: If the API responds with an error status or a non-object body
+            aiohttp.ClientError, asyncio.TimeoutError: If the request itself fails
+        """
+
+        query = {"z": self.username, "y": self.api_key, **params}
+        async with self._get_session().get(
+            f"{self.BASE_URL}/{endpoint}", params=query
+        ) as response:
+            if response.status != 200:
+                raise RetroAchievementsError(
+                    f"{endpoint} responded with status {response.status}"
+                )
+
+            data = await response.json(content_type=None)
+
+        if not isinstance(data, dict) or not data:
+            raise RetroAchievementsError(f"{endpoint} returned no data")
+
+        return serialize_properties(data)
+
+    async def get_user_profile(self, username: str) -> typing.Dict[str, typing.Any]:
+        """Gets a user's profile. Equivalent to getUserProfile() in @retroachievements/api
+
+        Args:
+            username (str): The username to look up
+
+        Returns:
+            typing.Dict[str, typing.Any]: The profile. Ex: {"user": ..., "userPic": ..., "lastGameId": ..., ...}
+        """
+        return await self.request("API_GetUserProfile.php", {"u": username})
+
+    async def get_game_info_and_user_progress(
+        self, username: str, game_id: int
+    ) -> typing.Dict[str, typing.Any]:
+        """Gets a game's information and a user's progress in it.
+        Equivalent to getGameInfoAndUserProgress() in @retroachievements/api
+
+        Args:
+            username (str): The username to look up
+            game_id (int): The ID of the game
+
+        Returns:
+            typing.Dict[str, typing.Any]: The game info. Ex: {"title": ..., "numAchievements": ..., "userCompletion": ..., ...}
+        """
+        return await self.request(
+            "API_GetGameInfoAndUserProgress.php", {"u": username, "g": game_id}
+        )
@@ -0,0 +1,23 @@
+import typing
+from models.Config import Config
+from models.profile_cache import ProfileCache
+from models.rate_limiter import RateLimiter
+
+if typing.TYPE_CHECKING:
+    from models.compact_profile import CompactProfile
+
+config = Config()
+
+# Caches and rate limits that outlive the cogs using them. /reload replaces a cog's module and instance,
+# but models are not reloaded, so data fetched before a reload is still cached after it.
+
+hsr_profiles: "ProfileCache[int, CompactProfile]" = ProfileCache(
+    max_size=config.HSR_CACHE_SIZE, ttl=config.HSR_CACHE_TTL
+)  # ^^ Honkai: Star Rail profiles keyed by UID
+
+retro_game_infos: ProfileCache[typing.Tuple[str, int], dict] = ProfileCache(
+    max_size=config.VIEW_CACHE_SIZE, ttl=config.VIEW_CACHE_TTL
+)  # ^^ RetroAchievements game info and progress keyed by (username, game ID)
+
+mihomo_limiter: RateLimiter = RateLimiter(config.MIHOMO_RATE, config.MIHOMO_BURST)
+# ^^ Requests to Mihomo's API, kept across /reload so a reload doesn't refill the bucket
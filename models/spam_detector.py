@@ -0,0 +1,282 @@
+import array
+import typing
+
+# Every tracked member costs one small fixed-size record, however many messages they send,
+# and members who go quiet are dropped by evict(), so memory follows the active members only.
+
+
+class WindowCounter:
+    """Counts events over a sliding window, split into a fixed amount of buckets.
+
+    A bucket covers bucket_seconds, and buckets that fall out of the window are zeroed as time
+    moves on, so the count is exact to one bucket and the memory never grows.
+    """
+
+    __slots__ = ("counts", "bucket_seconds", "last_bucket")
+
+    def __init__(self, bucket_seconds: float, buckets: int, now: float) -> None:
+        """
+        Args:
+            bucket_seconds (float): Seconds covered by one bucket, the window is bucket_seconds * buckets
+            buckets (int): Amount of buckets the window is split into
+            now (float): The current time, in seconds
+        """
+        self.counts: array.array = array.array("H", bytes(2 * buckets))
+        self.bucket_seconds: float = bucket_seconds
+        self.last_bucket: int = int(now / bucket_seconds)
+
+    def _advance(self, now: float) -> None:
+        bucket = int(now / self.bucket_seconds)
+        size = len(self.counts)
+        if bucket - self.last_bucket >= size:
+            self.counts = array.array("H", bytes(2 * size))
+        else:
+            for skipped in range(self.last_bucket + 1, bucket + 1):
+                self.counts[skipped % size] = 0
+
+        self.last_bucket = max(bucket, self.last_bucket)
+
+    def add(self, now: float) -> int:
+        """Counts an event and returns the amount of events in the window, this one included"""
+        self._advance(now)
+        slot = self.last_bucket % len(self.counts)
+        self.counts[slot] = min(self.counts[slot] + 1, 0xFFFF)
+        return sum(self.counts)
+
+    def total(self, now: float) -> int:
+        """Returns the amount of events in the window"""
+        self._advance(now)
+        return sum(self.counts)
+
+
+class MemberActivity(WindowCounter):
+    """A member's message rate, plus the streak of identical messages they are on"""
+
+    __slots__ = ("last_hash", "streak", "streak_started", "last_seen")
+
+    def __init__(self, bucket_seconds: float, buckets: int, now: float) -> None:
+        super().__init__(bucket_seconds, buckets, now)
+        self.last_hash: int = 0
+        self.streak: int = 0
+        self.streak_started: float = now
+        self.last_seen: float = now
+
+    def repeat(self, content_hash: int, now: float, window: float) -> int:
+        """Records a message's content hash
+
+        Returns:
+            int: Amount of identical messages in a row, this one included, that were sent within the window
+        """
+        if content_hash != self.last_hash or now - self.streak_started > window:
+            self.last_hash, self.streak, self.streak_started = content_hash, 0, now
+
+        self.streak += 1
+        return self.streak
+
+
+class GuildJoins(WindowCounter):
+    """A guild's join rate, plus a ring buffer of who joined last"""
+
+    __slots__ = ("members", "times", "next_slot", "last_seen")
+
+    def __init__(
+        self, bucket_seconds: float, buckets: int, ring_size: int, now: float
+    ) -> None:
+        super().__init__(bucket_seconds, buckets, now)
+        self.members: array.array = array.array("Q", bytes(8 * ring_size))
+        self.times: array.array = array.array("d", bytes(8 * ring_size))
+        # ^^ Times of 0 are empty slots
+        self.next_slot: int = 0
+        self.last_seen: float = now
+
+    def join(self, user_id: int, now: float) -> int:
+        """Records a join and returns the amount of joins in the window, this one included"""
+        self.members[self.next_slot] = user_id
+        self.times[self.next_slot] = now
+        self.next_slot = (self.next_slot + 1) % len(self.members)
+        self.last_seen = now
+        return self.add(now)
+
+    def recent(self, now: float, window: float) -> typing.List[int]:
+        """Returns who joined within the window, as far back as the ring goes"""
+        return [
+            user_id
+            for user_id, joined_at in zip(self.members, self.times)
+            if joined_at > 0 and now - joined_at <= window
+        ]
+
+
+class SpamDetector:
+    """Flags members who send messages too fast or repeat the same message, and guilds being raided.
+
+    The thresholds are shared by every guild. record_message() and record_join() are O(1) per event,
+    and evict() drops the members and guilds that have been quiet for `idle_seconds`.
+    """
+
+    BUCKETS: int = 10  # ^^ Buckets per sliding window
+
+    def __init__(
+        self,
+        message_limit: int,
+        message_window: float,
+        duplicate_limit: int,
+        duplicate_window: float,
+        join_limit: int,
+        join_window: float,
+        idle_seconds: float,
+    ) -> None:
+        """
+        Args:
+            message_limit (int): Messages within message_window that flag a member
+            message_window (float): Seconds the message rate is measured over
+            duplicate_limit (int): Identical messages in a row within duplicate_window that flag a member
+            duplicate_window (float): Seconds the identical messages have to be sent within
+            join_limit (int): Joins within join_window that flag a raid
+            join_window (float): Seconds the join rate is measured over
+            idle_seconds (float): Seconds without activity after which a member or guild is forgotten
+        """
+        self.message_limit: int = message_limit
+        self.message_window: float = message_window
+        self.duplicate_limit: int = max(2, duplicate_limit)
+        self.duplicate_window: float = duplicate_window
+        self.join_limit: int = max(2, join_limit)
+        self.join_window: float = join_window
+        self.idle_seconds: float = idle_seconds
+        self._message_bucket: float = message_window / self.BUCKETS
+        self._join_bucket: float = join_window / self.BUCKETS
+        # ^^ One float shared by every counter, instead of one per counter
+
+        self.members: typing.Dict[int, typing.Dict[int, MemberActivity]] = {}
+        # ^^ Guild ID -> user ID -> their recent messages
+        self.guilds: typing.Dict[int, GuildJoins] = {}
+        # ^^ Guild ID -> its recent joins
+        self.flagged_messages: int = 0
+        self.flagged_raids: int = 0
+        self.evicted: int = 0
+        # ^^ Counters exposed through stats()
+
+    def record_message(
+        self, guild_id: int, user_id: int, content: str, now: float
+    ) -> str | None:
+        """Records a member's message and checks their recent messages
+
+        Args:
+            guild_id (int): The guild the message was sent in
+            user_id (int): The author
+            content (str): The message content, compared case-insensitively
+            now (float): The current time, in seconds. Ex: time.monotonic()
+
+        Returns:
+            str | None: Why the member was flagged, or None. Their history is cleared once flagged,
+            so a member is flagged once per burst.
+        """
+        members = self.members.get(guild_id)
+        if members is None:
+            members = self.members[guild_id] = {}
+
+        activity = members.get(user_id)
+        if activity is None:
+            activity = members[user_id] = MemberActivity(
+                self._message_bucket, self.BUCKETS, now
+            )
+
+        activity.last_seen = now
+        reason = None
+        if activity.add(now) >= self.message_limit:
+            reason = (
+                f"sending {self.message_limit} messages within {self.message_window:g}s"
+            )
+        elif (
+            content
+            and activity.repeat(
+                hash(content.strip().casefold()), now, self.duplicate_window
+            )
+            >= self.duplicate_limit
+        ):
+            reason = f"sending the same message {self.duplicate_limit} times"
+
+        if reason is not None:
+            self.flagged_messages += 1
+            del members[user_id]
+
+        return reason
+
+    def record_join(self, guild_id: int, user_id: int, now: float) -> typing.List[int]:
+        """Records a member joining a guild and checks the guild's recent joins
+
+        Args:
+            guild_id (int): The guild joined
+            user_id (int): The member who joined
+            now (float): The current time, in seconds. Ex: time.monotonic()
+
+        Returns:
+            typing.List[int]: The members to act on. Every recent joiner when the join rate first
+            reaches the limit, then each new joiner for as long as it stays above it. Empty otherwise.
+        """
+        joins = self.guilds.get(guild_id)
+        if joins is None:
+            joins = self.guilds[guild_id] = GuildJoins(
+                self._join_bucket, self.BUCKETS, self.join_limit, now
+            )
+
+        count = joins.join(user_id, now)
+        if count < self.join_limit:
+            return []
+        if count == self.join_limit:
+            self.flagged_raids += 1
+            return joins.recent(now, self.join_window)
+
+        return [user_id]
+
+    def evict(self, now: float) -> int:
+        """Forgets the members and guilds without activity for idle_seconds
+
+        Args:
+            now (float): The current time, in seconds
+
+        Returns:
+            int: Amount of members and guilds dropped
+        """
+        cutoff = now - self.idle_seconds
+        evicted = 0
+        for guild_id, members in list(self.members.items()):
+            idle = [
+                user_id
+                for user_id, activity in members.items()
+                if activity.last_seen < cutoff
+            ]
+            for user_id in idle:
+                del members[user_id]
+            if not members:
+                del self.members[guild_id]
+            evicted += len(idle)
+
+        idle_guilds = [
+            guild_id
+            for guild_id, joins in self.guilds.items()
+            if joins.last_seen < cutoff
+        ]
+        for guild_id in idle_guilds:
+            del self.guilds[guild_id]
+
+        self.evicted += evicted + len(idle_guilds)
+        return evicted + len(idle_guilds)
+
+    def forget_guild(self, guild_id: int) -> None:
+        """Drops everything tracked for a guild, used when its detection is turned off"""
+        self.members.pop(guild_id, None)
+        self.guilds.pop(guild_id, None)
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Returns the detector counters
+
+        Returns:
+            typing.Dict[str, int]: {"members", "guilds", "flagged_messages", "flagged_raids", "evicted"}
+        """
+        return {
+            "members": sum(map(len, self.members.values())),
+            "guilds": len(self.guilds),
+            "flagged_messages": self.flagged_messages,
+            "flagged_raids": self.flagged_raids,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,208 @@
+import typing
+import numpy as np
+from models.command_metrics import command_metrics
+
+
+class CharacterBuilds:
+    """Total stats of every build seen for one character, stored as NumPy columns.
+
+    `builds` holds one row per player and one column per stat, NaN where a build doesn't have the stat.
+    `sorted_columns` holds the same values with every column sorted on its own, NaN last,
+    so ranking a value is a binary search instead of a scan over every build.
+    Both arrays grow by doubling, and a new or changed build is inserted into the sorted columns in place.
+    """
+
+    INITIAL_CAPACITY: int = 16
+
+    def __init__(self) -> None:
+        self.stat_index: typing.Dict[str, int] = {}  # ^^ Stat name -> column
+        self.rows: typing.Dict[int, int] = {}  # ^^ UID -> row in builds
+        self.builds: np.ndarray = np.full((self.INITIAL_CAPACITY, 0), np.nan)
+        self.sorted_columns: np.ndarray = np.full((self.INITIAL_CAPACITY, 0), np.nan)
+        self.counts: np.ndarray = np.zeros(0, dtype=np.int64)
+        # ^^ Amount of builds with a value in each column, the sorted values come first
+
+    def _add_stats(self, stats: typing.Iterable[str]) -> None:
+        new_stats = [stat for stat in stats if stat not in self.stat_index]
+        if not new_stats:
+            return
+
+        for stat in new_stats:
+            self.stat_index[stat] = len(self.stat_index)
+
+        padding = np.full((self.builds.shape[0], len(new_stats)), np.nan)
+        self.builds = np.hstack((self.builds, padding))
+        self.sorted_columns = np.hstack((self.sorted_columns, padding))
+        self.counts = np.concatenate(
+            (self.counts, np.zeros(len(new_stats), dtype=np.int64))
+        )
+
+    def _grow(self) -> None:
+        padding = np.full(self.builds.shape, np.nan)
+        self.builds = np.vstack((self.builds, padding))
+        self.sorted_columns = np.vstack((self.sorted_columns, padding))
+
+    def _vector(self, stats: typing.Mapping[str, float]) -> np.ndarray:
+        """Returns the stats as a row of the columns, NaN for stats that are missing or unknown"""
+        vector = np.full(len(self.stat_index), np.nan)
+        for stat, value in stats.items():
+            column = self.stat_index.get(stat)
+            if column is not None:
+                vector[column] = value
+
+        return vector
+
+    def _insert_sorted(self, vector: np.ndarray) -> None:
+        for column in np.flatnonzero(~np.isnan(vector)):
+            count = self.counts[column]
+            values = self.sorted_columns[:, column]
+            position = np.searchsorted(values[:count], vector[column])
+            values[position + 1 : count + 1] = values[position:count].copy()
+            values[position] = vector[column]
+            self.counts[column] += 1
+
+    def _remove_sorted(self, vector: np.ndarray) -> None:
+        for column in np.flatnonzero(~np.isnan(vector)):
+            count = self.counts[column]
+            values = self.sorted_columns[:, column]
+            position = np.searchsorted(values[:count], vector[column])
+            values[position : count - 1] = values[position + 1 : count].copy()
+            values[count - 1] = np.nan
+            self.counts[column] -= 1
+
+    def upsert(self, uid: int, stats: typing.Mapping[str, float]) -> None:
+        """Adds a player's build, or replaces the build seen for them before
+
+        Args:
+            uid (int): The player's UID, every player counts once per character
+            stats (typing.Mapping[str, float]): Stat name -> total value. Ex: {"CRIT DMG": 1.54, ...}
+        """
+        self._add_stats(stats)
+        vector = self._vector(stats)
+
+        row = self.rows.get(uid)
+        if row is not None:
+            previous = self.builds[row]
+            if np.array_equal(previous, vector, equal_nan=True):
+                return  # Same build as last time, nothing to re-sort
+
+            self._remove_sorted(previous)
+        else:
+            row = len(self.rows)
+            if row == self.builds.shape[0]:
+                self._grow()
+            self.rows[uid] = row
+
+        self.builds[row] = vector
+        self._insert_sorted(vector)
+
+    def rank(
+        self, stats: typing.Mapping[str, float]
+    ) -> typing.Dict[str, typing.Tuple[int, int, float]]:
+        """Ranks a build against every build seen, one binary search per stat
+
+        Args:
+            stats (typing.Mapping[str, float]): Stat name -> total value
+
+        Returns:
+            typing.Dict[str, typing.Tuple[int, int, float]]: Stat name -> (rank, builds with the stat, top percent).
+            Rank 1 is the highest value. Stats no build has are left out.
+        """
+        vector = self._vector(stats)
+        columns = np.flatnonzero(~np.isnan(vector) & (self.counts > 0))
+
+        ranks: typing.Dict[str, typing.Tuple[int, int, float]] = {}
+        names = list(self.stat_index)
+        for column in columns:
+            count = int(self.counts[column])
+            values = self.sorted_columns[:count, column]
+            rank = (
+                count - int(np.searchsorted(values, vector[column], side="right")) + 1
+            )
+            # ^^ Tied builds share the best rank
+            ranks[names[column]] = (rank, count, 100.0 * rank / count)
+
+        return ranks
+
+    def percentiles(self, stat: str, values: typing.Sequence[float]) -> np.ndarray:
+        """Returns the share of builds below each value, for many values at once
+
+        Args:
+            stat (str): The stat name. Ex: "CRIT DMG"
+            values (typing.Sequence[float]): The values to place
+
+        Returns:
+            np.ndarray: Percentiles from 0 to 100, NaN if no build has the stat
+        """
+        values = np.asarray(values, dtype=float)
+        column = self.stat_index.get(stat)
+        if column is None or self.counts[column] == 0:
+            return np.full(values.shape, np.nan)
+
+        count = self.counts[column]
+        below = np.searchsorted(
+            self.sorted_columns[:count, column], values, side="left"
+        )
+        return 100.0 * below / count
+
+
+class StatPercentiles:
+    """Where a build stands among every build of the same character the bot has fetched.
+
+    Builds are grouped by character name, see CharacterBuilds for how they are stored.
+    Every player counts once per character, a refetched profile replaces its earlier builds.
+    """
+
+    def __init__(self) -> None:
+        self.characters: typing.Dict[str, CharacterBuilds] = {}
+        self.updates: int = 0  # ^^ Counter exposed through stats()
+
+    def update(
+        self, character: str, uid: int, stats: typing.Mapping[str, float]
+    ) -> None:
+        """Adds or replaces a player's build of a character
+
+        Args:
+            character (str): The character name. Ex: "Kafka"
+            uid (int): The player's UID
+            stats (typing.Mapping[str, float]): Stat name -> total value
+        """
+        builds = self.characters.get(character)
+        if builds is None:
+            builds = self.characters[character] = CharacterBuilds()
+
+        builds.upsert(uid, stats)
+        self.updates += 1
+
+    def rank(
+        self, character: str, stats: typing.Mapping[str, float]
+    ) -> typing.Dict[str, typing.Tuple[int, int, float]]:
+        """Ranks a build against every build seen of the same character
+
+        Args:
+            character (str): The character name. Ex: "Kafka"
+            stats (typing.Mapping[str, float]): Stat name -> total value
+
+        Returns:
+            typing.Dict[str, typing.Tuple[int, int, float]]: Stat name -> (rank, builds with the stat, top percent).
+            Empty if the character was never seen.
+        """
+        builds = self.characters.get(character)
+        return {} if builds is None else builds.rank(stats)
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Returns the engine counters
+
+        Returns:
+            typing.Dict[str, int]: {"characters", "builds", "updates"}
+        """
+        return {
+            "characters": len(self.characters),
+            "builds": sum(len(builds.rows) for builds in self.characters.values()),
+            "updates": self.updates,
+        }
+
+
+stat_percentiles = StatPercentiles()
+# ^^ Process wide, so builds collected before a /reload are still ranked against after it
+command_metrics.register_gauges("stat_percentiles", stat_percentiles.stats)
@@ -0,0 +1,233 @@
+import typing
+import asyncio
+
+# Blocklist patterns are matched case-insensitively. A plain term like "spam" only matches the whole word,
+# a `*` at either end lets it match inside longer words: "spam*" matches "spammer", "*spam*" matches "antispammer".
+
+
+def parse_pattern(pattern: str) -> typing.Tuple[str, bool, bool]:
+    """Splits a blocklist pattern into the text to find and its wildcards
+
+    Args:
+        pattern (str): The pattern. Ex: "spam*"
+
+    Returns:
+        typing.Tuple[str, bool, bool]: (casefolded text, may have text before it, may have text after it)
+    """
+    pattern = pattern.strip()
+    prefix, suffix = pattern.startswith("*"), pattern.endswith("*")
+    return pattern.strip("*").strip().casefold(), prefix, suffix
+
+
+class Automaton:
+    """An Aho-Corasick automaton over a fixed set of blocklist patterns.
+
+    Scanning a message is a single pass over its characters, following goto and failure links,
+    so the cost per message depends on the message length and the matches found, not on the
+    amount of patterns. Built once and never changed, so it can be built on a worker thread and
+    shared freely. Blocklist handles edits by layering small automatons over a large one.
+    """
+
+    __slots__ = ("patterns", "_goto", "_fail", "_output")
+
+    def __init__(self, patterns: typing.Iterable[str]) -> None:
+        """
+        Args:
+            patterns (typing.Iterable[str]): The patterns to match, see parse_pattern
+        """
+        self.patterns: typing.Tuple[str, ...] = tuple(patterns)
+        self._goto: typing.List[typing.Dict[str, int]] = [{}]
+        # ^^ State -> character -> next state, state 0 is the root
+        self._output: typing.List[
+            typing.Tuple[typing.Tuple[int, int, bool, bool], ...]
+        ] = [()]
+        # ^^ State -> (pattern index, text length, prefix wildcard, suffix wildcard) of every pattern ending there
+
+        for index, pattern in enumerate(self.patterns):
+            text, prefix, suffix = parse_pattern(pattern)
+            if not text:
+                continue
+
+            state = 0
+            for character in text:
+                next_state = self._goto[state].get(character)
+                if next_state is None:
+                    next_state = self._goto[state][character] = len(self._goto)
+                    self._goto.append({})
+                    self._output.append(())
+                state = next_state
+
+            self._output[state] += ((index, len(text), prefix, suffix),)
+
+        self._fail: typing.List[int] = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        # ^^ Breadth first, so a state's failure link, which is always shallower, is done before it
+        for state in queue:
+            for character, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and character not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+
+                target = self._goto[fallback].get(character, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def find(self, text: str) -> typing.Iterator[str]:
+        """Yields every pattern found in a text, in the order they end, a pattern once per place it is found
+
+        Args:
+            text (str): The text to scan, casefolded. Ex: message.content.casefold()
+
+        Yields:
+            str: The pattern as it was added. Ex: "spam*"
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for end, character in enumerate(text, start=1):
+            while state and character not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(character, 0)
+
+            for index, length, prefix, suffix in output[state]:
+                start = end - length
+                if not prefix and start > 0 and text[start - 1].isalnum():
+                    continue  # Part of a longer word
+                if not suffix and end < len(text) and text[end].isalnum():
+                    continue
+
+                yield self.patterns[index]
+
+
+class Blocklist:
+    """A guild's blocklist, which can be edited without rebuilding the automaton of every pattern.
+
+    The patterns are kept in a large automaton built from a snapshot (`base`), plus a small one
+    of the patterns added since (`recent`). Removed patterns are filtered out of the base's matches.
+    An edit only rebuilds the small automaton. Once the edits outgrow a fraction of the base,
+    compact() rebuilds the base from every pattern on a worker thread.
+    """
+
+    COMPACT_MIN_EDITS: int = 64
+    COMPACT_RATIO: float = 0.125
+    # ^^ Compact once the edits reach this share of the base
+
+    def __init__(self, patterns: typing.Iterable[str] = ()) -> None:
+        """
+        Args:
+            patterns (typing.Iterable[str], optional): The starting patterns. Defaults to none.
+        """
+        self.patterns: typing.Set[str] = set()
+        self.base: Automaton = Automaton(())
+        self._base_patterns: typing.FrozenSet[str] = frozenset()
+        self.recent: Automaton = Automaton(())
+        self._removed: typing.Set[str] = set()
+        # ^^ In the base automaton, but no longer in the list
+        self._compacting: bool = False
+        self.compactions: int = 0
+
+        self.patterns.update(
+            pattern for pattern in map(str.strip, patterns) if parse_pattern(pattern)[0]
+        )
+        self._install(frozenset(self.patterns), Automaton(self.patterns))
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    @property
+    def edits(self) -> int:
+        """Amount of patterns the base automaton is out of date by"""
+        return len(self.recent) + len(self._removed)
+
+    @property
+    def needs_compaction(self) -> bool:
+        return not self._compacting and self.edits >= max(
+            self.COMPACT_MIN_EDITS, len(self._base_patterns) * self.COMPACT_RATIO
+        )
+
+    def _install(self, snapshot: typing.FrozenSet[str], base: Automaton) -> None:
+        """Swaps in a base built from a snapshot, keeping the edits made since the snapshot was taken"""
+        self.base, self._base_patterns = base, snapshot
+        self._removed = set(snapshot - self.patterns)
+        self.recent = Automaton(self.patterns - snapshot)
+
+    def add(self, patterns: typing.Iterable[str]) -> typing.List[str]:
+        """Adds patterns to the list, rebuilding only the automaton of recent additions
+
+        Args:
+            patterns (typing.Iterable[str]): The patterns, see parse_pattern
+
+        Returns:
+            typing.List[str]: The patterns that weren't in the list yet
+        """
+        added = [
+            pattern
+            for pattern in dict.fromkeys(map(str.strip, patterns))
+            if parse_pattern(pattern)[0] and pattern not in self.patterns
+        ]
+        if not added:
+            return added
+
+        self.patterns.update(added)
+        self._removed.difference_update(added)
+        self.recent = Automaton(self.patterns - self._base_patterns)
+        return added
+
+    def remove(self, patterns: typing.Iterable[str]) -> typing.List[str]:
+        """Removes patterns from the list, without rebuilding the base automaton
+
+        Args:
+            patterns (typing.Iterable[str]): The patterns, as they were added
+
+        Returns:
+            typing.List[str]: The patterns that were in the list
+        """
+        removed = [
+            pattern
+            for pattern in dict.fromkeys(map(str.strip, patterns))
+            if pattern in self.patterns
+        ]
+        if not removed:
+            return removed
+
+        self.patterns.difference_update(removed)
+        self._removed.update(
+            pattern for pattern in removed if pattern in self._base_patterns
+        )
+        if any(pattern not in self._base_patterns for pattern in removed):
+            self.recent = Automaton(self.patterns - self._base_patterns)
+
+        return removed
+
+    async def compact(self) -> None:
+        """Rebuilds the base automaton from every pattern on a worker thread, edits made meanwhile are kept"""
+        if self._compacting:
+            return
+
+        self._compacting = True
+        try:
+            snapshot = frozenset(self.patterns)
+            base = await asyncio.to_thread(Automaton, snapshot)
+            self._install(snapshot, base)
+            self.compactions += 1
+        finally:
+            self._compacting = False
+
+    def find(self, text: str) -> typing.Optional[str]:
+        """Returns the first pattern found in a text
+
+        Args:
+            text (str): The text to scan. Ex: message.content
+
+        Returns:
+            str | None: The pattern as it was added, or None if the text is clean
+        """
+        text = text.casefold()
+        for pattern in self.base.find(text):
+            if pattern not in self._removed:
+                return pattern
+
+        return next(self.recent.find(text), None)